@@ -4,7 +4,9 @@ Implementations of several activation functions.
 
 import math
 
-from settings import get_settings
+import numpy as np
+
+from settings import Settings
 
 
 def log_activation(x):
@@ -42,22 +44,83 @@ def threshold_activation(x, threshold):
     return int(x > threshold)
 
 
+def log_activation_array(x, out):
+    """
+    Stores the log of each element of x in out.
+    """
+    return np.log(x, out=out)
+
+
+def relu_activation_array(x, out):
+    """
+    Stores each element of x in out if positive, 0 otherwise.
+    """
+    return np.maximum(x, 0.0, out=out)
+
+
+def sigmoid_activation_array(x, out):
+    """
+    Stores the sigmoid output of each element of x in out.
+    """
+    np.negative(x, out=out)
+    np.exp(out, out=out)
+    out += 1.0
+    return np.reciprocal(out, out=out)
+
+
+def softplus_activation_array(x, out):
+    """
+    Stores a smooth approximation of ReLU of each element of x in out.
+    """
+    np.exp(x, out=out)
+    out += 1.0
+    return np.log(out, out=out)
+
+
+def threshold_activation_array(x, threshold, out):
+    """
+    Stores whether each element of x is above threshold in out
+    (or a new boolean array, if out is None).
+    """
+    return np.greater(x, threshold, out=out)
+
+
 def get_activation_function(function_id):
     """
     Returns the function specified by the
     provided function ID, as defined in settings
     """
-    settings = get_settings()
-    if function_id == settings.LOG:
+    if function_id == Settings.LOG:
         return log_activation
-    elif function_id == settings.RELU:
+    elif function_id == Settings.RELU:
         return relu_activation
-    elif function_id == settings.SIGMOID:
+    elif function_id == Settings.SIGMOID:
         return sigmoid_activation
-    elif function_id == settings.SOFTPLUS:
+    elif function_id == Settings.SOFTPLUS:
         return softplus_activation
     else:
         raise RuntimeError(
             "Programmer Error: Invalid activation "
             + "function id '%d'" % function_id
         )
+
+
+def get_array_activation_function(function_id):
+    """
+    Returns the NumPy ufunc based version of the function
+    specified by the provided function ID, which applies it
+    to each element of an array, as defined in settings
+    """
+    if function_id == Settings.LOG:
+        return log_activation_array
+    elif function_id == Settings.RELU:
+        return relu_activation_array
+    elif function_id == Settings.SIGMOID:
+        return sigmoid_activation_array
+    elif function_id == Settings.SOFTPLUS:
+        return softplus_activation_array
+    else:
+        raise RuntimeError(
+            "Programmer Error: Invalid activation "
+            + "function id '%d'" % function_id
+        )
@@ -1,6 +1,9 @@
+import time
+
 from ai.ai_player import AI_Player
+from ai.replay import Replay
 from asteroids.app import App
-from asteroids.utils import WHITE, render_on
+from asteroids.array_world import Array_World
 from settings import get_settings
 
 
@@ -10,6 +13,9 @@ class AI_App(App):
     when the player is an AI controller.
     """
 
+    # Maximum number of game steps simulated per rendered frame
+    MAX_SPECTATOR_SPEED = 64
+
     def _spawn_player(self):
         """
         Creates and returns a new AI_Player in the center of the screen.
@@ -19,27 +25,44 @@ class AI_App(App):
             settings.WIDTH / 2, settings.HEIGHT / 2, self._ai_brain
         )
 
+    def _setup(self, seed=None):
+        """
+        Performs initial setup for all game components, including
+        the AI Spectator mode labels if use_ui is True.
+        """
+        super(AI_App, self)._setup(seed=seed)
+        self.truncated = False
+        if self._use_ui:
+            from asteroids.render import Text_Label
+
+            self._run_time_label = Text_Label(self._small_font)
+            self._accuracy_label = Text_Label(self._small_font)
+            self._fitness_label = Text_Label(self._small_font)
+            self._speed_label = Text_Label(self._small_font)
+
     def _update_player(self):
         """
         Reads the current game state + has the player respond accordingly.
         """
-        sensor_data = self.player.sense(self.asteroids, self.bullets)
-        self.player.update(self.bullets, sensor_data)
+        sensor_data = self.player.sense(
+            self.asteroids, self.bullets, self._config
+        )
+        self.player.update(self.bullets, sensor_data, self._config)
 
     def _render_ai_spectator_overlay(self):
         """
         Renders overlay components used in AI Spectator mode.
         Returns a list of rectangles to be re-rendered.
         """
+        from asteroids.render import render_on
+
         settings = get_settings()
         render_rects = []
 
         # Show fitness stats in top-left, under Score, if necessary
         if settings.SHOW_SCORE:
-            run_time_text = self._small_font.render(
-                "Runtime: %ds (%d)" % (self.run_time / 60, self.run_time),
-                True,
-                WHITE,
+            run_time_text = self._run_time_label.render(
+                "Runtime: %ds (%d)" % (self.run_time / 60, self.run_time)
             )
             run_time_rect = render_on(
                 run_time_text,
@@ -49,8 +72,8 @@ class AI_App(App):
             )
             render_rects.append(run_time_rect)
 
-            accuracy_text = self._small_font.render(
-                "Accuracy: %.2f" % self._get_accuracy(), True, WHITE
+            accuracy_text = self._accuracy_label.render(
+                "Accuracy: %.2f" % self._get_accuracy()
             )
             accuracy_rect = render_on(
                 accuracy_text,
@@ -60,8 +83,8 @@ class AI_App(App):
             )
             render_rects.append(accuracy_rect)
 
-            fitness_text = self._small_font.render(
-                "Fitness: %d" % self._get_fitness(), True, WHITE
+            fitness_text = self._fitness_label.render(
+                "Fitness: %d" % self._get_fitness()
             )
             fitness_rect = render_on(
                 fitness_text,
@@ -71,6 +94,19 @@ class AI_App(App):
             )
             render_rects.append(fitness_rect)
 
+        # Show the simulation speed in top-right, if sped up
+        if settings.SHOW_SCORE and settings.SPECTATOR_SPEED > 1:
+            speed_text = self._speed_label.render(
+                "Speed: %dx" % settings.SPECTATOR_SPEED
+            )
+            speed_rect = render_on(
+                speed_text,
+                self.screen,
+                settings.WIDTH - speed_text.get_width() / 2,
+                speed_text.get_height() / 2,
+            )
+            render_rects.append(speed_rect)
+
         # Return the rects to be re-rendered
         return render_rects
 
@@ -78,8 +114,31 @@ class AI_App(App):
         """
         Checks whether event was an AI Spectator mode
         specific control, and handles it if so.
+
+        The game steps are the same at any speed (only fewer of them are
+        rendered), so the game plays out exactly as run_simulation would.
         """
-        pass
+        import pygame
+
+        settings = get_settings()
+
+        # +: Doubles the simulation speed
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_EQUALS:
+            settings.SPECTATOR_SPEED = min(
+                settings.SPECTATOR_SPEED * 2, AI_App.MAX_SPECTATOR_SPEED
+            )
+        # -: Halves the simulation speed
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_MINUS:
+            settings.SPECTATOR_SPEED = max(settings.SPECTATOR_SPEED // 2, 1)
+        # 0: Resets the simulation speed
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_0:
+            settings.SPECTATOR_SPEED = 1
+
+    def _get_steps_per_frame(self):
+        """
+        Returns the number of game steps to simulate per rendered frame.
+        """
+        return get_settings().SPECTATOR_SPEED
 
     def _get_accuracy(self):
         """
@@ -113,10 +172,53 @@ class AI_App(App):
         """
         Runs the game to completion in non-graphical mode using
         the provided AI controller, and returns the fitness score.
+
+        If the simulation runs out of frames or time (see
+        _start_budget), it is stopped early and truncated is set.
         """
+        settings = get_settings()
         self._ai_brain = ai_brain
 
         # Prepare the simulation
+        if not self._has_started:
+            self._setup(seed=seed)
+        else:
+            self._seed = seed
+            self._running = True
+
+        # Run it until the player dies, using the configured engine
+        self._start_budget()
+        if settings.SIMULATION_ENGINE == settings.OBJECT:
+            self._load_level()
+            self._run_within_budget()
+        else:
+            world = Array_World()
+            world.load_level([self._spawn_player()], [self._seed])
+            num_frames = 0
+            truncated_games = []
+            while world.running:
+                if self._is_over_budget(num_frames):
+                    truncated_games = world.stop()
+                    break
+                world.update()
+                num_frames += 1
+            self._load_array_world_results(
+                world, 0, self._seed, 0 in truncated_games
+            )
+
+        # Return the fitness score
+        return self._get_fitness()
+
+    def render_simulation(self, ai_brain, save_frame, seed=None):
+        """
+        Runs the game to completion using the provided AI controller,
+        rendering every frame as fast as possible (without waiting on
+        the clock or input), and passing the screen to save_frame after
+        each one. Returns the fitness score. Requires use_ui to be True.
+        """
+        self._ai_brain = ai_brain
+
+        # Prepare the game
         if not self._has_started:
             self._setup(seed=seed)
         else:
@@ -124,13 +226,137 @@ class AI_App(App):
             self._running = True
         self._load_level()
 
-        # Run it until the player dies
-        while self._running:
+        # Run it until the Game Over screen is shown
+        while self._state == App.RUNNING:
             self._update()
+            self._render()
+            save_frame(self.screen)
 
         # Return the fitness score
         return self._get_fitness()
 
+    def run_simulations(self, ai_brains, seeds):
+        """
+        Runs a game to completion for each pair of the provided AI
+        controllers and seeds in lockstep, sharing one Array_World.
+        Returns a list of the (fitness score, truncated) pairs for each
+        controller's games, listed in the same order as the seeds.
+
+        The games share a frame budget, and a time budget
+        of the time allowed per simulation for each game.
+        """
+        if not self._has_started:
+            self._setup()
+
+        # Create a player for each game, each brain's seeds in order
+        players = []
+        for ai_brain in ai_brains:
+            self._ai_brain = ai_brain
+            players.extend(self._spawn_player() for seed in seeds)
+
+        # Run all of the games until every player dies
+        game_seeds = list(seeds) * len(ai_brains)
+        world = Array_World()
+        world.load_level(players, game_seeds)
+        self._start_budget(len(players))
+        num_frames = 0
+        truncated_games = []
+        while world.running:
+            if self._is_over_budget(num_frames):
+                truncated_games = world.stop()
+                break
+            world.update()
+            num_frames += 1
+
+        # Return the results of each brain's games
+        results = []
+        for game in range(len(players)):
+            self._load_array_world_results(
+                world, game, game_seeds[game], game in truncated_games
+            )
+            results.append((self._get_fitness(), self.truncated))
+        return [
+            results[i : i + len(seeds)]
+            for i in range(0, len(results), len(seeds))
+        ]
+
+    def run_simulation_from_snapshot(self, ai_brain, snapshot):
+        """
+        Restores the game from the provided App_Snapshot, then runs it to
+        completion in non-graphical mode using the provided AI controller
+        (in place of the one playing when the snapshot was taken), and
+        returns the fitness score. Always uses the object engine.
+        """
+        if not self._has_started:
+            self._setup()
+        self.restore(snapshot)
+        self._ai_brain = ai_brain
+        self.player.set_brain(ai_brain)
+        self._start_budget()
+        self._run_within_budget()
+        return self._get_fitness()
+
+    def get_replay(self):
+        """
+        Returns a Replay of the last (or current) game, which must
+        have been played with a seed. Only the last game run by
+        run_simulations can be replayed.
+        """
+        return Replay(self._seed, self.player.get_decisions())
+
+    def _start_budget(self, num_simulations=1):
+        """
+        Starts a simulation's budget: it may run for at most
+        MAX_SIMULATION_FRAMES frames, and MAX_SIMULATION_TIME
+        seconds per simulation (where 0 means no limit).
+        """
+        settings = get_settings()
+        self.truncated = False
+        self._max_frames = settings.MAX_SIMULATION_FRAMES
+        if settings.MAX_SIMULATION_TIME:
+            self._end_time = time.time() + (
+                settings.MAX_SIMULATION_TIME * num_simulations
+            )
+        else:
+            self._end_time = None
+
+    def _is_over_budget(self, num_frames):
+        """
+        Returns whether a simulation that has run for
+        num_frames frames has used up its budget.
+        """
+        if self._max_frames and num_frames >= self._max_frames:
+            return True
+        return self._end_time is not None and time.time() >= self._end_time
+
+    def _run_within_budget(self):
+        """
+        Runs the loaded game until the player dies, or until it uses up its
+        budget, in which case it is stopped early and truncated is set.
+        """
+        while self._running:
+            if not self.player.destroyed and self._is_over_budget(
+                self.run_time
+            ):
+                self.truncated = True
+                self._running = False
+                break
+            self._update()
+
+    def _load_array_world_results(self, world, game, seed, truncated=False):
+        """
+        Copies the results of a game run in an Array_World with the seed
+        into this app's seed, player, performance trackers and truncated
+        flag (which should be set if the game was stopped early).
+        """
+        self._seed = seed
+        self.truncated = truncated
+        self.player = world.players[game]
+        self.score = world.scores[game]
+        self.asteroids_hit = world.asteroids_hits[game]
+        self.run_time = world.run_times[game]
+        self._running = False
+
     def cleanup_simulation(self):
         """
         Cleans up the app after all simulations are run.
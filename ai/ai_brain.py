@@ -6,7 +6,7 @@ class AI_Brain(object):
     def __init__(self):
         self.fitness = 0
 
-    def sense(self, player, asteroids, bullets):
+    def sense(self, player, asteroids, bullets, config):
         """
         Checks the state of the world, and returns a feature
         matrix to be used as input to the AI decide function.
@@ -15,7 +15,20 @@ class AI_Brain(object):
             "'sense' should be implemented by AI_Brain subclasses."
         )
 
-    def think(self, player, bullets, sensor_data):
+    @classmethod
+    def sense_all(cls, ai_brains, players, asteroids, bullets, config):
+        """
+        Checks the state of each of the AI brains' (all of this class)
+        players' games, with the corresponding asteroids and bullets,
+        and returns a list of their feature matrices. Subclasses can
+        override this to sense for all of them at once more efficiently.
+        """
+        return [
+            ai_brain.sense(players[i], asteroids[i], bullets[i], config)
+            for i, ai_brain in enumerate(ai_brains)
+        ]
+
+    def think(self, player, bullets, sensor_data, config):
         """
         Runs the AI algorithm on sensor_data and
         outputs a decision vector in response.
@@ -24,19 +37,35 @@ class AI_Brain(object):
             "'think' should be implemented by AI_Brain subclasses."
         )
 
-    def crossover(self, other_brain):
+    @classmethod
+    def think_all(cls, ai_brains, players, bullets, sensor_data, config):
+        """
+        Runs the AI algorithm of each of the AI brains (all of this class)
+        on the corresponding sensor data, and returns a list of their
+        decision vectors. Subclasses can override this to think for
+        all of them at once more efficiently.
+        """
+        return [
+            ai_brain.think(players[i], bullets[i], sensor_data[i], config)
+            for i, ai_brain in enumerate(ai_brains)
+        ]
+
+    def crossover(self, other_brain, rng=None):
         """
         Combines the network of this AI brain with that of the
         other, exchanging network weights and or structure, and
         returns a new AI brain with the resultant combined network.
+        Random choices are drawn from rng (a NumPy Generator) if
+        provided.
         """
         raise NotImplementedError(
             "'crossover' should be implemented by AI_Brain subclasses."
         )
 
-    def mutate(self, mutation_rate):
+    def mutate(self, mutation_rate, rng=None):
         """
-        Mutates the network at the specified rate.
+        Mutates the network at the specified rate. Random
+        values are drawn from rng (a NumPy Generator) if provided.
         """
         raise NotImplementedError(
             "'mutate' should be implemented by AI_Brain subclasses."
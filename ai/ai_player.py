@@ -6,31 +6,104 @@ class AI_Player(Player):
     Defines the player ship, controlled by an AI.
     """
 
+    __slots__ = ("_brain", "_decisions")
+
     # Size of the decision vector
     DECISION_VECTOR_SIZE = 4
 
     def __init__(self, x, y, ai_brain):
         super(AI_Player, self).__init__(x, y)
         self._brain = ai_brain
+        self._decisions = bytearray()
+
+    def set_brain(self, ai_brain):
+        """
+        Sets the AI brain controlling the player ship.
+        """
+        self._brain = ai_brain
+
+    def get_decisions(self):
+        """
+        Returns the decisions made on each frame so far, as a bytearray
+        with each decision vector packed into a 4-bit value.
+        """
+        return self._decisions
+
+    def _copy_mutable_state(self):
+        """
+        Replaces the decisions made so far with a copy.
+        """
+        self._decisions = bytearray(self._decisions)
 
-    def sense(self, asteroids, bullets):
+    def sense(self, asteroids, bullets, config):
         """
         Checks the state of the world, and returns a feature
         matrix to be used as input to the AI update function.
         """
-        return self._brain.sense(self, asteroids, bullets)
+        return self._brain.sense(self, asteroids, bullets, config)
 
-    def update(self, bullets, sensor_data):
+    @classmethod
+    def sense_all(cls, players, asteroids, bullets, config):
+        """
+        Checks the state of each of the AI players' games, as sense does,
+        but with all of their brains of the same class sensing at once.
+        """
+        groups = {}
+        for i, player in enumerate(players):
+            groups.setdefault(type(player._brain), []).append(i)
+
+        sensor_data = [None] * len(players)
+        for ai_brain_class, indices in groups.items():
+            group_sensor_data = ai_brain_class.sense_all(
+                [players[i]._brain for i in indices],
+                [players[i] for i in indices],
+                [asteroids[i] for i in indices],
+                [bullets[i] for i in indices],
+                config,
+            )
+            for i, data in zip(indices, group_sensor_data):
+                sensor_data[i] = data
+        return sensor_data
+
+    def update(self, bullets, sensor_data, config):
         """
         Updates any time dependent player state, then runs
         the AI algorithm on sensor_data, and performs the
         appropiate actions in response.
         """
-        super(AI_Player, self).update(bullets, sensor_data)
-        decision_vector = self._brain.think(self, bullets, sensor_data)
-        self._perform_decisions(decision_vector, bullets)
+        super(AI_Player, self).update(bullets, sensor_data, config)
+        decision_vector = self._brain.think(self, bullets, sensor_data, config)
+        self._perform_decisions(decision_vector, bullets, config)
 
-    def _perform_decisions(self, decision_vector, bullets):
+    @classmethod
+    def update_all(cls, players, bullets, sensor_data, config):
+        """
+        Updates each of the AI players, as update does, but with all of
+        their brains of the same class thinking at once.
+        """
+        for i, player in enumerate(players):
+            Player.update(player, bullets[i], sensor_data[i], config)
+
+        # Group the players by the class of their brain
+        groups = {}
+        for i, player in enumerate(players):
+            groups.setdefault(type(player._brain), []).append(i)
+
+        decision_vectors = [None] * len(players)
+        for ai_brain_class, indices in groups.items():
+            group_decision_vectors = ai_brain_class.think_all(
+                [players[i]._brain for i in indices],
+                [players[i] for i in indices],
+                [bullets[i] for i in indices],
+                [sensor_data[i] for i in indices],
+                config,
+            )
+            for i, decision_vector in zip(indices, group_decision_vectors):
+                decision_vectors[i] = decision_vector
+        for i, player in enumerate(players):
+            player._perform_decisions(decision_vectors[i], bullets[i], config)
+
+    def _perform_decisions(self, decision_vector, bullets, config):
         """
         Accepts a boolean vector containing the following decisions:
           0: Whether to shoot
@@ -49,13 +122,21 @@ class AI_Player(Player):
                 )
             )
 
+        # Record the decisions, packed into 4 bits, for replays
+        self._decisions.append(
+            bool(decision_vector[0])
+            | bool(decision_vector[1]) << 1
+            | bool(decision_vector[2]) << 2
+            | bool(decision_vector[3]) << 3
+        )
+
         if decision_vector[0]:
-            self.shoot(bullets)
+            self.shoot(bullets, config)
 
         if decision_vector[1]:
-            self.start_boosting()
+            self.start_boosting(config)
         else:
-            self.stop_boosting()
+            self.stop_boosting(config)
 
         # Spin in the decided upon direction, or stop spinning entirely
         # Note: if both spin decisions are True, arbitrarily spin clockwise
@@ -0,0 +1,166 @@
+"""
+Defines functions for benchmarking the game simulations.
+"""
+
+from __future__ import print_function
+
+import os
+import time
+
+import numpy as np
+
+from ai.ai_app import AI_App
+from ai.utils import algorithm_id_to_ai_brain_class
+from settings import get_settings
+
+# Number of times to repeat the benchmark (the fastest run is reported)
+NUM_BENCHMARK_REPEATS = 3
+
+# Hidden layer sizes to time the breeding operators with
+BREEDING_BENCHMARK_HIDDEN_LAYER_SIZES = [10, 20, 50, 100, 200]
+
+# Number of times to call each breeding operator for each size
+NUM_BREEDING_BENCHMARK_CALLS = 200
+
+
+def run_benchmark():
+    """
+    Times headless simulations of the game AI brain (or a new brain, if
+    the brain file doesn't exist) with the current settings, and prints
+    the average time taken to simulate each frame. With a timestep other
+    than 1, also reports how much the fitnesses differ from those of the
+    same games simulated one frame per step.
+    """
+    settings = get_settings()
+    settings.SOUNDS_ENABLED = False
+    ai_brain = _load_benchmark_brain()
+
+    # Always use seeds, so that each run simulates the same frames
+    if settings.USE_PREDETERMINED_SEEDS:
+        seeds = settings.PREDETERMINED_SEEDS
+    else:
+        seeds = list(range(settings.NUM_EVALUATION_SIMULATIONS))
+
+    # Run the simulations, keeping the fastest time
+    best_time = None
+    for i in range(NUM_BENCHMARK_REPEATS):
+        (num_frames, run_time, fitnesses) = time_simulations(ai_brain, seeds)
+        if best_time is None or run_time < best_time:
+            best_time = run_time
+
+    print(
+        "Simulated %d games (%d frames) with the '%s' engine."
+        % (len(seeds), num_frames, settings.SIMULATION_ENGINE)
+    )
+    print(
+        "Best of %d: %.3fs total, %.1f us per frame"
+        % (NUM_BENCHMARK_REPEATS, best_time, best_time * 1e6 / num_frames)
+    )
+
+    # Compare bigger timesteps against simulating one frame per step
+    if settings.SIMULATION_TIMESTEP != 1:
+        timestep = settings.SIMULATION_TIMESTEP
+        settings.SIMULATION_TIMESTEP = 1
+        (exact_frames, exact_time, exact_fitnesses) = time_simulations(
+            ai_brain, seeds
+        )
+        settings.SIMULATION_TIMESTEP = timestep
+        errors = [
+            abs(fitness - exact_fitness)
+            for fitness, exact_fitness in zip(fitnesses, exact_fitnesses)
+        ]
+        mean_exact_fitness = sum(exact_fitnesses) / len(exact_fitnesses)
+        mean_error = sum(errors) / len(errors)
+        print(
+            "With a timestep of 1: %d frames, %.1f us per frame"
+            % (exact_frames, exact_time * 1e6 / exact_frames)
+        )
+        print(
+            "Mean fitness %.2f (vs %.2f), mean absolute error %.2f (%.1f%%)"
+            % (
+                sum(fitnesses) / len(fitnesses),
+                mean_exact_fitness,
+                mean_error,
+                100.0 * mean_error / max(mean_exact_fitness, 1e-9),
+            )
+        )
+
+
+def time_simulations(ai_brain, seeds):
+    """
+    Runs a simulation with the AI brain for each seed, and returns the
+    total number of frames simulated, the time taken (in s), and the
+    fitness of each simulation.
+    """
+    app = AI_App(use_ui=False)
+    num_frames = 0
+    fitnesses = []
+    start_time = time.time()
+    for seed in seeds:
+        fitnesses.append(app.run_simulation(ai_brain, seed=seed))
+        num_frames += app.run_time
+    run_time = time.time() - start_time
+    return (num_frames, run_time, fitnesses)
+
+
+def run_breeding_benchmark():
+    """
+    Times the breeding operators (crossover and mutation) of new
+    brains of the current algorithm with the current settings, on
+    increasing hidden layer sizes. Prints the average time taken per
+    call of each operator.
+    """
+    settings = get_settings()
+    ai_brain_class = algorithm_id_to_ai_brain_class(settings.ALGORITHM_ID)
+    hidden_layer_size = settings.HIDDEN_LAYER_SIZE
+    rng = np.random.default_rng(0)
+
+    print(
+        "Timing the '%s' crossover mechanism, and mutation at a rate of "
+        "%g, over %d calls."
+        % (
+            settings.CROSSOVER_MECHANISM,
+            settings.MUTATION_RATE,
+            NUM_BREEDING_BENCHMARK_CALLS,
+        )
+    )
+    print("Hidden Size    Crossover (us)    Mutation (us)")
+    for size in BREEDING_BENCHMARK_HIDDEN_LAYER_SIZES:
+        settings.HIDDEN_LAYER_SIZE = size
+        parents = [ai_brain_class(), ai_brain_class()]
+
+        # Time crossing over the parents, then mutating them
+        start_time = time.time()
+        for i in range(NUM_BREEDING_BENCHMARK_CALLS):
+            parents[0].crossover(parents[1], rng)
+        crossover_time = time.time() - start_time
+        start_time = time.time()
+        for i in range(NUM_BREEDING_BENCHMARK_CALLS):
+            parents[i % 2].mutate(settings.MUTATION_RATE, rng)
+        mutation_time = time.time() - start_time
+
+        print(
+            "%11d    %14.1f    %13.1f"
+            % (
+                size,
+                crossover_time * 1e6 / NUM_BREEDING_BENCHMARK_CALLS,
+                mutation_time * 1e6 / NUM_BREEDING_BENCHMARK_CALLS,
+            )
+        )
+    settings.HIDDEN_LAYER_SIZE = hidden_layer_size
+
+
+def _load_benchmark_brain():
+    """
+    Loads and returns the game AI brain to benchmark,
+    or a new brain if the brain file doesn't exist.
+    """
+    settings = get_settings()
+    ai_brain_class = algorithm_id_to_ai_brain_class(settings.ALGORITHM_ID)
+    if os.path.exists(settings.GAME_AI_BRAIN):
+        return ai_brain_class.load(settings.GAME_AI_BRAIN)
+    print(
+        "Brain file '%s' not found, using a new brain instead."
+        % settings.GAME_AI_BRAIN
+    )
+    return ai_brain_class()
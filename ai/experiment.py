@@ -183,7 +183,9 @@ def run_experiment():
             )
             return
         _write_to_log(
-            log, ": Best Fitness = %.2f - Saving" % best_brain.fitness
+            log,
+            ": Best Fitness = %.2f%s - Saving"
+            % (best_brain.fitness, _get_truncation_note(generation)),
         )
 
         # Save the generation
@@ -328,12 +330,8 @@ def merge_experiments(exp_dir_list, merged_dir):
         num_brains = brains_per_exp
         if parent_idx == len(exp_last_gens) - 1:
             num_brains += leftover_brains
-        gen_brain_files = [
-            os.path.join(gen_dir, x)
-            for x in os.listdir(gen_dir)
-            if x.endswith(".brn")
-        ]
-        if len(gen_brain_files) < num_brains:
+        gen_brains = generation_class.load_brains(gen_dir)
+        if len(gen_brains) < num_brains:
             raise ValueError(
                 (
                     "Parent experiment directory '%s' does not "
@@ -341,8 +339,7 @@ def merge_experiments(exp_dir_list, merged_dir):
                 )
                 % gen_dir
             )
-        for brain_file in gen_brain_files[:num_brains]:
-            brains.append(generation_class.load_brain(brain_file))
+        brains.extend(gen_brains[:num_brains])
     generation = generation_class(0, ai_apps, brains)
 
     # Create the experiment log file
@@ -375,7 +372,11 @@ def merge_experiments(exp_dir_list, merged_dir):
         return
 
     # Save the generation
-    _write_to_log(log, ": Best Fitness = %.2f - Saving" % best_brain.fitness)
+    _write_to_log(
+        log,
+        ": Best Fitness = %.2f%s - Saving"
+        % (best_brain.fitness, _get_truncation_note(generation)),
+    )
     try:
         generation.save(os.path.join(merged_dir, "gen000"))
     except Exception as e:
@@ -414,6 +415,17 @@ def merge_experiments(exp_dir_list, merged_dir):
     log.close()
 
 
+def _get_truncation_note(generation):
+    """
+    Returns a note of how many of the evaluated generation's
+    simulations were truncated, or an empty string if none were.
+    """
+    num_truncated = generation.get_evaluation_results()["truncated"]
+    if num_truncated == 0:
+        return ""
+    return " (%d simulations truncated)" % num_truncated
+
+
 def _write_to_log(log, message, force_echo=False):
     """
     Writes message to the provided log.
@@ -23,19 +23,45 @@ class Generation(object):
             self._brains = self._create_initial_brains(
                 settings.GENERATION_POPULATION
             )
+        self._num_truncated = [0] * len(self._brains)
 
     @staticmethod
     def _evaluate_fitness(brain_id, brain, seeds):
         """
-        Runs a simulation on the brain for each seed, and
-        returns its average performance as its fitness.
+        Runs a simulation on the brain for each seed, and returns its
+        average performance as its fitness, along with the number of
+        simulations that were truncated (stopped early).
         """
         global _worker_app
-        fitnesses = [
-            _worker_app.run_simulation(brain, seed=seed) for seed in seeds
-        ]
+        fitnesses = []
+        num_truncated = 0
+        for seed in seeds:
+            fitnesses.append(_worker_app.run_simulation(brain, seed=seed))
+            num_truncated += int(_worker_app.truncated)
         average_fitness = sum(fitnesses) / float(len(fitnesses))
-        return brain_id, average_fitness
+        return brain_id, average_fitness, num_truncated
+
+    @staticmethod
+    def _evaluate_fitness_batch(brain_ids, brains, seeds):
+        """
+        Runs a simulation on each brain for each seed, all in lockstep,
+        and returns a list of each brain's ID, average fitness and
+        number of truncated simulations.
+        """
+        global _worker_app
+        results = []
+        for brain_id, brain_results in zip(
+            brain_ids, _worker_app.run_simulations(brains, seeds)
+        ):
+            fitnesses = [fitness for fitness, truncated in brain_results]
+            results.append(
+                (
+                    brain_id,
+                    sum(fitnesses) / float(len(fitnesses)),
+                    sum(int(truncated) for _, truncated in brain_results),
+                )
+            )
+        return results
 
     def evaluate_fitnesses(self):
         """
@@ -56,7 +82,19 @@ class Generation(object):
             apps_queue.put(app)
 
         # Set up and divvy evaluation tasks across the worker pool
-        tasks = [(id, brain, seeds) for id, brain in enumerate(self._brains)]
+        # If batching, each worker evaluates an equal share of the brains
+        # at once, otherwise each task evaluates a single brain
+        if settings.SIMULATION_ENGINE == settings.BATCH:
+            num_batches = min(settings.NUM_THREADS, len(self._brains))
+            ids = list(range(len(self._brains)))
+            tasks = [
+                (ids[i::num_batches], self._brains[i::num_batches], seeds)
+                for i in range(num_batches)
+            ]
+        else:
+            tasks = [
+                (id, brain, seeds) for id, brain in enumerate(self._brains)
+            ]
         results = []
         with multiprocessing.Pool(
             processes=settings.NUM_THREADS,
@@ -66,16 +104,25 @@ class Generation(object):
                 settings,
             ),
         ) as pool:
-            results = pool.starmap(Generation._evaluate_fitness, tasks)
+            if settings.SIMULATION_ENGINE == settings.BATCH:
+                batch_results = pool.starmap(
+                    Generation._evaluate_fitness_batch, tasks
+                )
+                results = [
+                    result for batch in batch_results for result in batch
+                ]
+            else:
+                results = pool.starmap(Generation._evaluate_fitness, tasks)
 
         # Clean up multiprocessing resources
         manager.shutdown()
 
         # Record the fitness for each brain, and the best brain's ID
         best_fitness = -1
-        for id, fitness in results:
+        for id, fitness, num_truncated in results:
             brain = self._brains[id]
             brain.fitness = fitness
+            self._num_truncated[id] = num_truncated
             if brain.fitness > best_fitness:
                 self._best_brain_id = id
                 best_fitness = brain.fitness
@@ -84,8 +131,9 @@ class Generation(object):
 
     def get_evaluation_results(self):
         """
-        Returns a dictionary containing brain ID to
-        fitness pairs, and some group statistics.
+        Returns a dictionary containing brain ID to fitness pairs, and
+        some group statistics (including the number of simulations that
+        were truncated, under "truncated").
         """
         if not self._evaluated:
             raise RuntimeError(
@@ -98,6 +146,7 @@ class Generation(object):
             results["mean"] = float(sum(fitnesses)) / len(fitnesses)
             results["max"] = max(fitnesses)
             results["min"] = min(fitnesses)
+            results["truncated"] = sum(self._num_truncated)
             self._results = results
         return self._results
 
@@ -133,18 +182,7 @@ class Generation(object):
         os.mkdir(dirname)
 
         # Save all of the generation's brains
-        for id, brain in enumerate(self._brains):
-            brain.save(
-                os.path.join(
-                    dirname,
-                    "%s-%03d-%03d.brn"
-                    % (
-                        self.get_algorithm_name().lower(),
-                        self._generation_number,
-                        id,
-                    ),
-                )
-            )
+        self._save_brains(dirname)
 
         # Save the best brain in a designated file
         if self._evaluated:
@@ -171,14 +209,22 @@ class Generation(object):
                 )
                 summary_file.write("Fitness Stats:\n--------------\n")
                 summary_file.write(
-                    "Max: %.2f\nMin: %.2f\nMean: %.2f\n\n"
+                    "Max: %.2f\nMin: %.2f\nMean: %.2f\n"
                     % (results["max"], results["min"], results["mean"])
                 )
+                summary_file.write(
+                    "Truncated Simulations: %d\n\n" % results["truncated"]
+                )
                 summary_file.write(
                     "Individual Fitnesses:" + "\n---------------------\n"
                 )
                 for id in range(len(self._brains)):
-                    summary_file.write("%03d: %.2f\n" % (id, results[id]))
+                    summary_file.write("%03d: %.2f" % (id, results[id]))
+                    if self._num_truncated[id] > 0:
+                        summary_file.write(
+                            " (%d truncated)" % self._num_truncated[id]
+                        )
+                    summary_file.write("\n")
 
         # Write the meta file
         meta_filename = os.path.join(dirname, META_FILENAME)
@@ -218,10 +264,7 @@ class Generation(object):
             )
 
         # Load the generation's brains
-        brains = []
-        for filename in os.listdir(dirname):
-            if filename.endswith(".brn"):
-                brains.append(cls.load_brain(os.path.join(dirname, filename)))
+        brains = cls.load_brains(dirname)
 
         # Load the metafile
         with open(meta_filename, "r") as meta_file:
@@ -242,6 +285,42 @@ class Generation(object):
         loaded_generation._best_brain_id = best_brain_id
         return loaded_generation
 
+    @classmethod
+    def load_brains(cls, dirname):
+        """
+        Loads the brains saved in the specified generation
+        directory, and returns them as a list.
+
+        By default, loads each brain from its own file. Subclasses
+        that override _save_brains should override this to match.
+        """
+        brains = []
+        for filename in os.listdir(dirname):
+            if filename.endswith(".brn"):
+                brains.append(cls.load_brain(os.path.join(dirname, filename)))
+        return brains
+
+    def _save_brains(self, dirname):
+        """
+        Saves all of this generation's brains to the specified
+        directory, as done by save.
+
+        By default, saves each brain to its own file. Subclasses can
+        override this to save them together more efficiently.
+        """
+        for id, brain in enumerate(self._brains):
+            brain.save(
+                os.path.join(
+                    dirname,
+                    "%s-%03d-%03d.brn"
+                    % (
+                        self.get_algorithm_name().lower(),
+                        self._generation_number,
+                        id,
+                    ),
+                )
+            )
+
     ##################################################
     #   TO BE IMPLEMENTED BY GENERATION SUBCLASSES
     ##################################################
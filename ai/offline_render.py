@@ -0,0 +1,245 @@
+"""
+Defines functions for rendering games offline (without a display),
+many at once, into frame sequences that can be made into videos.
+"""
+
+from __future__ import print_function
+
+import multiprocessing
+from multiprocessing.util import Finalize
+import os
+import struct
+import zlib
+
+from ai.ai_app import AI_App
+from ai.replay import Replay
+from ai.replay_app import REPLAY_FILE_EXTENSION, Replay_App
+from ai.utils import algorithm_id_to_ai_brain_class
+from settings import get_settings, load_settings_from_settings
+
+# zlib compression level of PNG frames (the frames are mostly black,
+# so the fastest level still compresses them well)
+PNG_COMPRESSION_LEVEL = 1
+
+
+class Frame_Writer(object):
+    """
+    Writes the rendered frames of a game to the path, either as
+    a directory of numbered PNG images or a single raw RGB24 file.
+    """
+
+    def __init__(self, path, frame_format):
+        settings = get_settings()
+        self.num_frames = 0
+        self._frame_format = frame_format
+        if frame_format == settings.PNG:
+            self.path = path
+            os.mkdir(path)
+        else:
+            self.path = path + ".raw"
+            self._raw_file = open(self.path, "wb")
+
+    def write(self, screen):
+        """
+        Writes the screen as the next frame.
+        """
+        import pygame
+
+        settings = get_settings()
+        pixels = pygame.image.tobytes(screen, "RGB")
+        if self._frame_format == settings.PNG:
+            _write_png(
+                os.path.join(self.path, "frame-%05d.png" % self.num_frames),
+                pixels,
+                screen.get_width(),
+                screen.get_height(),
+            )
+        else:
+            self._raw_file.write(pixels)
+        self.num_frames += 1
+
+    def close(self):
+        """
+        Finishes writing the frames.
+        """
+        settings = get_settings()
+        if self._frame_format == settings.RAW:
+            self._raw_file.close()
+
+
+def render_runs(output_dir, filenames):
+    """
+    Renders every frame of a game for each replay file, and for each
+    seed with each brain file, into output_dir using multiprocessing.
+    """
+    settings = get_settings()
+    settings.SOUNDS_ENABLED = False
+    settings.SHOW_FPS = False
+    if os.path.exists(output_dir):
+        raise ValueError(
+            "Directory to render games to, '%s', already exists." % output_dir
+        )
+
+    # Games can only be rendered exactly if they have a seed
+    if settings.USE_PREDETERMINED_SEEDS:
+        seeds = settings.PREDETERMINED_SEEDS
+    else:
+        seeds = list(range(settings.NUM_EVALUATION_SIMULATIONS))
+
+    # Create a task for each game, numbered so their paths are unique
+    tasks = []
+    for filename in filenames:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        if filename.endswith(REPLAY_FILE_EXTENSION):
+            path = os.path.join(output_dir, "%03d-%s" % (len(tasks), name))
+            tasks.append((filename, None, path))
+        else:
+            for seed in seeds:
+                path = os.path.join(
+                    output_dir, "%03d-%s-seed-%d" % (len(tasks), name, seed)
+                )
+                tasks.append((filename, seed, path))
+    if len(tasks) == 0:
+        raise ValueError("No replay or brain files were provided to render.")
+
+    # Render the games across the worker pool, as each worker finishes
+    # Note: the workers are left to exit on their own once done (rather
+    # than terminated, as by the Pool context manager), so they can
+    # shut down pygame cleanly
+    os.mkdir(output_dir)
+    pool = multiprocessing.Pool(
+        processes=min(settings.NUM_THREADS, len(tasks)),
+        initializer=_pool_worker_initializer,
+        initargs=(settings,),
+    )
+    try:
+        for path, num_frames, fitness, error in pool.imap_unordered(
+            _render_run, tasks
+        ):
+            if error is not None:
+                print("Failed to render '%s': %s" % (path, error))
+                continue
+            print(
+                "Rendered '%s' (%d frames, fitness %.2f)."
+                % (path, num_frames, fitness)
+            )
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def _write_png(filename, pixels, width, height):
+    """
+    Writes the RGB24 pixels to a PNG image file. Much faster than
+    pygame.image.save, which compresses the image as much as it can.
+    """
+    row_size = 3 * width
+    rows = b"".join(
+        b"\x00" + pixels[i : i + row_size]
+        for i in range(0, row_size * height, row_size)
+    )
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    with open(filename, "wb") as png_file:
+        png_file.write(b"\x89PNG\r\n\x1a\n")
+        _write_png_chunk(png_file, b"IHDR", header)
+        _write_png_chunk(
+            png_file, b"IDAT", zlib.compress(rows, PNG_COMPRESSION_LEVEL)
+        )
+        _write_png_chunk(png_file, b"IEND", b"")
+
+
+def _write_png_chunk(png_file, chunk_type, data):
+    """
+    Writes a chunk of a PNG image with the type and data to the file.
+    """
+    png_file.write(struct.pack(">I", len(data)))
+    png_file.write(chunk_type + data)
+    png_file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+
+##################################################
+#   MULTIPROCESSING GLOBALS AND FUNCTIONS
+##################################################
+
+# Holds the worker process's headless AI_App, used to record
+# replays of brains, and its Replay_App, used to render them
+_worker_app = None
+_worker_render_app = None
+
+# Holds the error that stopped the worker process's
+# apps from being created, if any, to report for each task
+_worker_init_error = None
+
+
+def _pool_worker_initializer(parent_settings):
+    """
+    Initializes a worker process.
+
+    1. Loads the settings from the parent process into this
+       worker's local settings.
+    2. Creates the worker's apps, rendering to an offscreen surface
+       with SDL's dummy drivers (an app with a UI can only be created
+       once per process, so each worker reuses its own), and shuts
+       down pygame when the worker exits.
+
+    SDL's signal handlers would keep the worker from being stopped, so
+    aren't installed. Errors creating the apps are kept to be reported
+    by each task, as the pool would otherwise endlessly replace the
+    worker.
+    """
+    global _worker_app, _worker_render_app, _worker_init_error
+    load_settings_from_settings(parent_settings)
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+    try:
+        _worker_app = AI_App(use_ui=False)
+        _worker_render_app = Replay_App()
+    except Exception as e:
+        _worker_init_error = e
+        return
+
+    import pygame
+
+    Finalize(None, pygame.quit, exitpriority=10)
+
+
+def _render_run(task):
+    """
+    Renders the game for a task into its path, and returns the path,
+    the number of frames rendered, the fitness and the error that
+    stopped it from being rendered (or None).
+
+    Brains are first run headless to record a replay of the
+    game, which is then rendered like any other replay.
+    """
+    (filename, seed, path) = task
+    if _worker_init_error is not None:
+        return (path, 0, 0.0, _worker_init_error)
+    try:
+        return _render_game(filename, seed, path) + (None,)
+    except Exception as e:
+        return (path, 0, 0.0, e)
+
+
+def _render_game(filename, seed, path):
+    """
+    Renders the game of the brain with the seed, or replay if seed is
+    None, into the path, and returns the path of the frames written,
+    the number of frames rendered and the fitness.
+    """
+    settings = get_settings()
+    if seed is None:
+        replay = Replay.load(filename)
+    else:
+        ai_brain_class = algorithm_id_to_ai_brain_class(settings.ALGORITHM_ID)
+        _worker_app.run_simulation(ai_brain_class.load(filename), seed=seed)
+        replay = _worker_app.get_replay()
+
+    frame_writer = Frame_Writer(path, settings.RENDER_FRAME_FORMAT)
+    fitness = _worker_render_app.render_simulation(replay, frame_writer.write)
+    frame_writer.close()
+    return (frame_writer.path, frame_writer.num_frames, fitness)
@@ -0,0 +1,144 @@
+"""
+Defines compact recordings of AI games, which can be played back
+exactly without re-running the AI brain that played them.
+"""
+
+import struct
+
+from ai.ai_player import AI_Player
+from asteroids.player import Player
+
+# Identifies replay files, and the version of their format
+REPLAY_FILE_MAGIC = b"ARPL"
+REPLAY_FILE_VERSION = 1
+
+# Replay file header: magic, version, seed, number of frames
+_replay_header = struct.Struct("<4sBqI")
+
+# Decision vector for each packed (4-bit) set of decisions
+_decision_vectors = [
+    [bool(decisions & (1 << i)) for i in range(AI_Player.DECISION_VECTOR_SIZE)]
+    for decisions in range(1 << AI_Player.DECISION_VECTOR_SIZE)
+]
+
+
+class Replay(object):
+    """
+    Recording of an AI game: the seed it was played with, and the
+    decisions the AI player made on each frame (packed into 4 bits).
+
+    Replaying the decisions on a game with the same seed and settings
+    plays it out exactly as it was recorded.
+    """
+
+    def __init__(self, seed, decisions):
+        if seed is None:
+            raise ValueError("Only games played with a seed can be replayed.")
+        self.seed = seed
+        self.decisions = bytes(decisions)
+
+    def get_decision_vector(self, frame):
+        """
+        Returns the decision vector the player made on the frame,
+        or one with no decisions if the frame wasn't recorded.
+        """
+        if frame >= len(self.decisions):
+            return _decision_vectors[0]
+        return _decision_vectors[self.decisions[frame]]
+
+    def save(self, filename):
+        """
+        Saves this replay to the specified file, with
+        the decisions for two frames packed into each byte.
+        """
+        decisions = self.decisions
+        packed = bytearray(
+            low | (high << 4)
+            for low, high in zip(decisions[0::2], decisions[1::2])
+        )
+        if len(decisions) % 2:
+            packed.append(decisions[-1])
+        with open(filename, "wb") as save_file:
+            save_file.write(
+                _replay_header.pack(
+                    REPLAY_FILE_MAGIC,
+                    REPLAY_FILE_VERSION,
+                    self.seed,
+                    len(decisions),
+                )
+            )
+            save_file.write(packed)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Loads the replay from the specified file and returns it.
+        """
+        with open(filename, "rb") as load_file:
+            data = load_file.read()
+        if len(data) < _replay_header.size:
+            raise ValueError("'%s' is not a replay file." % filename)
+        (magic, version, seed, num_frames) = _replay_header.unpack_from(data)
+        if magic != REPLAY_FILE_MAGIC:
+            raise ValueError("'%s' is not a replay file." % filename)
+        if version != REPLAY_FILE_VERSION:
+            raise ValueError(
+                "Replay file '%s' has unsupported version '%d'."
+                % (filename, version)
+            )
+
+        # Unpack the decisions for two frames from each byte
+        packed = data[_replay_header.size :]
+        if len(packed) != (num_frames + 1) // 2:
+            raise ValueError("Replay file '%s' is truncated." % filename)
+        decisions = bytearray(2 * len(packed))
+        decisions[0::2] = bytes(byte & 15 for byte in packed)
+        decisions[1::2] = bytes(byte >> 4 for byte in packed)
+        return cls(seed, decisions[:num_frames])
+
+
+class Replay_Player(AI_Player):
+    """
+    Defines the player ship, controlled by the
+    decisions recorded in a replay of an AI game.
+    """
+
+    __slots__ = ("_replay",)
+
+    def __init__(self, x, y, replay):
+        super(Replay_Player, self).__init__(x, y, None)
+        self._replay = replay
+
+    def sense(self, asteroids, bullets, config):
+        """
+        The recorded decisions don't depend on the state of
+        the world, so there is nothing to sense.
+        """
+        return None
+
+    @classmethod
+    def sense_all(cls, players, asteroids, bullets, config):
+        """
+        There is nothing for any of the players to sense.
+        """
+        return [None] * len(players)
+
+    def update(self, bullets, sensor_data, config):
+        """
+        Updates any time dependent player state, then performs
+        the decisions recorded for the current frame.
+        """
+        Player.update(self, bullets, sensor_data, config)
+        decision_vector = self._replay.get_decision_vector(
+            len(self._decisions)
+        )
+        self._perform_decisions(decision_vector, bullets, config)
+
+    @classmethod
+    def update_all(cls, players, bullets, sensor_data, config):
+        """
+        Updates each of the players, as update does (there
+        are no brains to think all at once).
+        """
+        for i, player in enumerate(players):
+            player.update(bullets[i], sensor_data[i], config)
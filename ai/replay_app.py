@@ -0,0 +1,94 @@
+"""
+Defines the app for playing back replays of AI games,
+and functions for recording them.
+"""
+
+from __future__ import print_function
+
+import os
+
+from ai.ai_app import AI_App
+from ai.replay import Replay_Player
+from ai.utils import algorithm_id_to_ai_brain_class
+from settings import get_settings
+
+# Extension of replay files
+REPLAY_FILE_EXTENSION = ".rpl"
+
+
+class Replay_App(AI_App):
+    """
+    Defines the main application for the game, when
+    the player is playing back a replay of an AI game.
+    """
+
+    def _spawn_player(self):
+        """
+        Creates and returns a new Replay_Player in the center of the screen.
+        """
+        settings = get_settings()
+        return Replay_Player(
+            settings.WIDTH / 2, settings.HEIGHT / 2, self._replay
+        )
+
+    def start_game(self, replay):
+        """
+        Starts the game, playing back the provided replay.
+        """
+        self._replay = replay
+        super(Replay_App, self).start_game(None, seed=replay.seed)
+
+    def run_simulation(self, replay):
+        """
+        Plays back the replay to completion in non-graphical
+        mode, and returns the fitness score.
+        """
+        self._replay = replay
+        return super(Replay_App, self).run_simulation(None, seed=replay.seed)
+
+    def render_simulation(self, replay, save_frame):
+        """
+        Plays back the replay to completion, passing the
+        screen to save_frame after rendering each frame.
+        """
+        self._replay = replay
+        return super(Replay_App, self).render_simulation(
+            None, save_frame, seed=replay.seed
+        )
+
+
+def record_replays(output_dir):
+    """
+    Runs a headless simulation of the game AI brain for each seed with
+    the current settings, and saves a replay of each into output_dir.
+    """
+    settings = get_settings()
+    settings.SOUNDS_ENABLED = False
+    if os.path.exists(output_dir):
+        raise ValueError(
+            "Directory to save replays to, '%s', already exists." % output_dir
+        )
+
+    # Load the brain to record
+    ai_brain_class = algorithm_id_to_ai_brain_class(settings.ALGORITHM_ID)
+    ai_brain = ai_brain_class.load(settings.GAME_AI_BRAIN)
+
+    # Games can only be replayed if they have a seed
+    if settings.USE_PREDETERMINED_SEEDS:
+        seeds = settings.PREDETERMINED_SEEDS
+    else:
+        seeds = list(range(settings.NUM_EVALUATION_SIMULATIONS))
+
+    # Run the simulations, saving a replay of each
+    os.mkdir(output_dir)
+    app = AI_App(use_ui=False)
+    for seed in seeds:
+        fitness = app.run_simulation(ai_brain, seed=seed)
+        filename = os.path.join(
+            output_dir, "seed-%d%s" % (seed, REPLAY_FILE_EXTENSION)
+        )
+        app.get_replay().save(filename)
+        print(
+            "Recorded '%s' (%d frames, fitness %.2f)."
+            % (filename, app.run_time, fitness)
+        )
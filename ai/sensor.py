@@ -4,11 +4,78 @@ Defines asteroid sensing functions to be used by AI players.
 
 import math
 
+import numpy as np
+
+from asteroids.asteroid import Asteroid
 from asteroids.utils import angle_to_xy, distance_between_xy
-from settings import Settings, get_settings
+from settings import Settings
+
+# Minimum number of asteroids for sense_n_dir to sense them all at
+# once with sense_n_dir_batch (looping over fewer is faster)
+MIN_BATCH_SENSED_ASTEROIDS = 20
+
+# Rows of the player arrays accepted by sense_n_dir_batch
+PLAYER_X, PLAYER_Y, PLAYER_RADIUS, PLAYER_ROTATION = range(4)
+
+# Rows of the asteroid arrays accepted by sense_n_dir_batch
+ASTEROID_X, ASTEROID_Y, ASTEROID_RADIUS = range(3)
 
 
-def sense_n_dir(n, player, asteroids, max_distance, shape=Settings.LINEAR):
+def sense_by_sensor_id(player, asteroids, config):
+    """
+    Senses the asteroids around the player ship with the sensor
+    selected by SENSOR_ID, configured by the other sensor settings.
+    """
+    if config.SENSOR_ID == Settings.NDIR:
+        return sense_n_dir(
+            config.NUM_SENSOR_REGIONS,
+            player,
+            asteroids,
+            config.MAX_SENSOR_DISTANCE,
+            config,
+            shape=config.SENSOR_OUTPUT_SHAPE,
+        )
+    elif config.SENSOR_ID == Settings.RAYCAST:
+        return sense_ray_cast(
+            config.NUM_SENSOR_REGIONS,
+            player,
+            asteroids,
+            config.MAX_SENSOR_DISTANCE,
+            config.SENSOR_GRID_CELL_SIZE,
+            config,
+            shape=config.SENSOR_OUTPUT_SHAPE,
+        )
+    else:
+        raise RuntimeError(
+            "Programmer Error: Unsupported sensor ID %s" % config.SENSOR_ID
+        )
+
+
+def sense_all_by_sensor_id(players, asteroids, config):
+    """
+    Senses the asteroids around each of the player ships, as
+    sense_by_sensor_id does, and returns a list of the values sensed
+    by each. asteroids should contain the asteroids in each player's
+    game. The n-direction sensor senses for all players at once.
+    """
+    if config.SENSOR_ID == Settings.NDIR:
+        return sense_n_dir_for_players(
+            config.NUM_SENSOR_REGIONS,
+            players,
+            asteroids,
+            config.MAX_SENSOR_DISTANCE,
+            config,
+            shape=config.SENSOR_OUTPUT_SHAPE,
+        )
+    return [
+        sense_by_sensor_id(player, asteroids[i], config)
+        for i, player in enumerate(players)
+    ]
+
+
+def sense_n_dir(
+    n, player, asteroids, max_distance, config, shape=Settings.LINEAR
+):
     """
     Looks in n directions and returns an array containing
     how close the nearest asteroid is for each direction.
@@ -22,30 +89,281 @@ def sense_n_dir(n, player, asteroids, max_distance, shape=Settings.LINEAR):
         LINEAR: Increases linearly with decreasing distance
         HYPERBOLIC: Output has shape 1/distance
     """
-    settings = get_settings()
+    if n == 0:
+        return []
+    if len(asteroids) >= MIN_BATCH_SENSED_ASTEROIDS:
+        return _sense_n_dir_all(
+            n, player, asteroids, max_distance, config, shape
+        )
     distances = [0.0] * n
     for asteroid in asteroids:
         distance = distance_between_xy(
-            player.x, player.y, asteroid.x, asteroid.y
+            player.x, player.y, asteroid.x, asteroid.y, config=config
         ) - (asteroid.radius + player.radius)
         if distance > max_distance:
             continue
         distance = max(distance, 1.0)
         angle = (
-            angle_to_xy(player.x, player.y, asteroid.x, asteroid.y)
+            angle_to_xy(
+                player.x, player.y, asteroid.x, asteroid.y, config=config
+            )
             - player.rotation
         ) % (2 * math.pi)
         closest_direction = (
             int((angle + (math.pi / n)) / (2.0 * math.pi / n)) % n
         )
-        if shape == settings.LINEAR:
+        if shape == Settings.LINEAR:
             distances[closest_direction] = max(
                 1 - distance / max_distance, distances[closest_direction]
             )
-        elif shape == settings.HYPERBOLIC:
+        elif shape == Settings.HYPERBOLIC:
             distances[closest_direction] = max(
                 1.0 / distance, distances[closest_direction]
             )
         else:
             raise RuntimeError("Programmer Error: Unsupported shape %d" % shape)
     return distances
+
+
+def _sense_n_dir_all(n, player, asteroids, max_distance, config, shape):
+    """
+    Performs sense_n_dir with sense_n_dir_batch, sensing
+    all of the asteroids at once.
+    """
+    players = np.array(
+        [[player.x], [player.y], [player.radius], [player.rotation]]
+    )
+    return sense_n_dir_batch(
+        n,
+        players,
+        _get_asteroid_arrays(asteroids)[:, np.newaxis, :],
+        max_distance,
+        config,
+        shape=shape,
+    )[0].tolist()
+
+
+def sense_n_dir_for_players(
+    n, players, asteroids, max_distance, config, shape=Settings.LINEAR
+):
+    """
+    Performs sense_n_dir for each of the players, with the asteroids
+    in the corresponding game, sensing for all of them at once with
+    sense_n_dir_batch, and returns a list of the values each sensed.
+    """
+    if n == 0:
+        return [[] for _ in players]
+    player_arrays = np.array(
+        [
+            [player.x for player in players],
+            [player.y for player in players],
+            [player.radius for player in players],
+            [player.rotation for player in players],
+        ]
+    )
+    (asteroid_arrays, valid) = _get_asteroid_batch_arrays(asteroids)
+    return sense_n_dir_batch(
+        n,
+        player_arrays,
+        asteroid_arrays,
+        max_distance,
+        config,
+        shape=shape,
+        valid=valid,
+    ).tolist()
+
+
+def sense_n_dir_batch(
+    n,
+    players,
+    asteroids,
+    max_distance,
+    config,
+    shape=Settings.LINEAR,
+    valid=None,
+):
+    """
+    Performs sense_n_dir for a batch of p players at once, and returns
+    a (p x n) array with the values sensed by each player.
+
+    players should be a (4 x p) array of the x, y, radius and rotation
+    of each player, and asteroids a (3 x p x a) array of the x, y and
+    radius of the asteroids each player senses. If the players sense
+    different numbers of asteroids, valid should be a (p x a) boolean
+    array indicating which of the asteroids are present.
+
+    Distances, angles and directions are calculated exactly as
+    sense_n_dir does for one player, so both return the same values.
+    """
+    num_players = players.shape[1]
+    sensed = np.zeros((num_players, n))
+    player_x = players[PLAYER_X, :, np.newaxis]
+    player_y = players[PLAYER_Y, :, np.newaxis]
+
+    # Get the delta to each asteroid's looped position, as with
+    # get_looped_point (which always shifts y upward, regardless
+    # of which edge the asteroid is over)
+    asteroid_x = asteroids[ASTEROID_X]
+    asteroid_y = asteroids[ASTEROID_Y]
+    dx = asteroid_x - player_x
+    dy = asteroid_y - player_y
+    dx = (
+        asteroid_x
+        + (dx < -config.HALF_LOOPED_WIDTH) * config.LOOPED_WIDTH
+        - (dx > config.HALF_LOOPED_WIDTH) * config.LOOPED_WIDTH
+    ) - player_x
+    dy = (
+        asteroid_y
+        - (np.abs(dy) > config.HALF_LOOPED_HEIGHT) * config.LOOPED_HEIGHT
+    ) - player_y
+
+    # Find the distance to each asteroid, and which are within range
+    distances = np.sqrt((dx * dx) + (dy * dy)) - (
+        asteroids[ASTEROID_RADIUS] + players[PLAYER_RADIUS, :, np.newaxis]
+    )
+    in_range = distances <= max_distance
+    if valid is not None:
+        in_range &= valid
+    distances = np.maximum(distances, 1.0)
+
+    # Find the direction closest to each asteroid's angle
+    angles = np.remainder(
+        np.arctan2(dx, -dy) - players[PLAYER_ROTATION, :, np.newaxis],
+        2 * math.pi,
+    )
+    directions = ((angles + (math.pi / n)) / (2.0 * math.pi / n)).astype(
+        int
+    ) % n
+    directions += np.arange(0, num_players * n, n)[:, np.newaxis]
+
+    # Keep the largest value sensed in each direction
+    if shape == Settings.LINEAR:
+        values = 1 - distances / max_distance
+    elif shape == Settings.HYPERBOLIC:
+        values = 1.0 / distances
+    else:
+        raise RuntimeError("Programmer Error: Unsupported shape %s" % shape)
+    np.maximum.at(sensed.reshape(-1), directions[in_range], values[in_range])
+    return sensed
+
+
+def sense_ray_cast(
+    n,
+    player,
+    asteroids,
+    max_distance,
+    cell_size,
+    config,
+    shape=Settings.LINEAR,
+):
+    """
+    Casts n rays out from the player ship, in the directions sense_n_dir
+    looks in, and returns an array containing how close the nearest
+    asteroid along each ray is (with values as in sense_n_dir).
+
+    The asteroids are rasterized into a coarse occupancy grid over the
+    playfield, with cells of about cell_size pixels. Each ray then
+    marches out to max_distance from the edge of the player ship in
+    steps of cell_size, checking the cell at each step, so the cost of
+    casting the rays doesn't depend on the number of asteroids.
+    """
+    if n == 0:
+        return []
+    grid = _rasterize_asteroids(asteroids, cell_size, config)
+    (num_rows, num_cols) = grid.shape
+
+    # Get the cell at each step along each ray, wrapping around
+    distances = np.arange(int(max_distance // cell_size) + 1) * float(
+        cell_size
+    )
+    angles = player.rotation + np.arange(n) * (2 * math.pi / n)
+    lengths = distances + player.radius
+    x = (player.x - config.MIN_X) + np.sin(angles)[:, np.newaxis] * lengths
+    y = (player.y - config.MIN_Y) - np.cos(angles)[:, np.newaxis] * lengths
+    cols = (x // (config.LOOPED_WIDTH / num_cols)).astype(int) % num_cols
+    rows = (y // (config.LOOPED_HEIGHT / num_rows)).astype(int) % num_rows
+
+    # Find the distance to the first occupied cell along each ray
+    hits = grid[rows, cols]
+    hit_distances = np.maximum(distances[hits.argmax(axis=1)], 1.0)
+    if shape == Settings.LINEAR:
+        values = 1 - hit_distances / max_distance
+    elif shape == Settings.HYPERBOLIC:
+        values = 1.0 / hit_distances
+    else:
+        raise RuntimeError("Programmer Error: Unsupported shape %s" % shape)
+    return np.where(hits.any(axis=1), values, 0.0).tolist()
+
+
+def _rasterize_asteroids(asteroids, cell_size, config):
+    """
+    Returns a (rows x cols) boolean occupancy grid over the playfield,
+    with cells of about cell_size pixels, marking each cell overlapping
+    an asteroid. Asteroids over the edges wrap around the grid.
+    """
+    num_cols = max(int(round(config.LOOPED_WIDTH / cell_size)), 1)
+    num_rows = max(int(round(config.LOOPED_HEIGHT / cell_size)), 1)
+    cell_width = config.LOOPED_WIDTH / num_cols
+    cell_height = config.LOOPED_HEIGHT / num_rows
+    grid = np.zeros((num_rows, num_cols), dtype=bool)
+    asteroid_arrays = _get_asteroid_arrays(asteroids)
+    if asteroid_arrays.shape[1] == 0:
+        return grid
+
+    # Get the columns and rows of cells around each asteroid
+    # (enough to cover the largest), and the distance along each
+    # axis from the asteroid to the nearest point of those cells
+    x = (asteroid_arrays[ASTEROID_X] - config.MIN_X)[:, np.newaxis]
+    y = (asteroid_arrays[ASTEROID_Y] - config.MIN_Y)[:, np.newaxis]
+    max_radius = max(Asteroid.SIZE_TO_RADIUS)
+    col_reach = int(math.ceil(max_radius / cell_width))
+    row_reach = int(math.ceil(max_radius / cell_height))
+    cols = (x // cell_width) + np.arange(-col_reach, col_reach + 1)
+    rows = (y // cell_height) + np.arange(-row_reach, row_reach + 1)
+    dx = np.clip(x, cols * cell_width, (cols + 1) * cell_width) - x
+    dy = np.clip(y, rows * cell_height, (rows + 1) * cell_height) - y
+
+    # Mark the cells whose nearest point to the asteroid is inside it
+    radius = asteroid_arrays[ASTEROID_RADIUS][:, np.newaxis, np.newaxis]
+    dx_squared = (dx * dx)[:, np.newaxis, :]
+    dy_squared = (dy * dy)[:, :, np.newaxis]
+    overlaps = dx_squared + dy_squared <= radius * radius
+    (asteroid_indices, row_indices, col_indices) = overlaps.nonzero()
+    grid[
+        rows[asteroid_indices, row_indices].astype(int) % num_rows,
+        cols[asteroid_indices, col_indices].astype(int) % num_cols,
+    ] = True
+    return grid
+
+
+def _get_asteroid_arrays(asteroids):
+    """
+    Returns a (3 x n) array of the x, y and radius of each of the
+    n asteroids, using the arrays of an Array_World view if possible.
+    """
+    if hasattr(asteroids, "get_arrays"):
+        return asteroids.get_arrays()
+    return np.array(
+        [
+            [asteroid.x for asteroid in asteroids],
+            [asteroid.y for asteroid in asteroids],
+            [asteroid.radius for asteroid in asteroids],
+        ]
+    ).reshape(3, -1)
+
+
+def _get_asteroid_batch_arrays(asteroids):
+    """
+    Accepts p collections of asteroids, and returns a (3 x p x a) array
+    of the x, y and radius of the asteroids in each, along with a
+    (p x a) boolean array indicating which of them are present, using
+    the arrays of Array_World views if possible.
+    """
+    if hasattr(asteroids[0], "get_batch_arrays"):
+        return asteroids[0].get_batch_arrays(asteroids)
+    asteroid_arrays = [_get_asteroid_arrays(group) for group in asteroids]
+    counts = np.array([arrays.shape[1] for arrays in asteroid_arrays])
+    batch = np.zeros((3, len(asteroids), counts.max()))
+    for i, arrays in enumerate(asteroid_arrays):
+        batch[:, i, : counts[i]] = arrays
+    return (batch, np.arange(batch.shape[2]) < counts[:, np.newaxis])
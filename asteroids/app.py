@@ -1,33 +1,73 @@
 import math
 import random
-
-import pygame
+from collections import namedtuple
 
 from asteroids.asteroid import Asteroid
 from asteroids.bullet import Bullet
+from asteroids.component import Component
 from asteroids.player import Player
 from asteroids.sound import load_sounds, play_sound, stop_all_sounds, stop_sound
-from asteroids.utils import BLACK, GRAY, WHITE, render_on
-from settings import get_settings
+from asteroids.spatial_hash import Spatial_Hash
+from settings import get_settings, get_simulation_config
+
+# Snapshot of a game's full state, taken with App.snapshot
+App_Snapshot = namedtuple(
+    "App_Snapshot",
+    [
+        "state",
+        "running",
+        "config",
+        "seed",
+        "rng_state",
+        "player",
+        "bullets",
+        "asteroids",
+        "score",
+        "asteroids_hit",
+        "run_time",
+        "last_spawn_time",
+        "spawn_period",
+    ],
+)
 
 
 class App(object):
     """
     Defines the main application logic for the Asteroids game.
+
+    pygame is only imported (through asteroids.render) when the UI is
+    used, so that headless simulations don't need to load it at all.
     """
 
     # Game states
     SETUP, SPLASH, RUNNING, PAUSED, GAME_OVER = range(5)
 
+    # Size of the cells used to index asteroids for collision checks
+    # (the largest possible collision distance, plus a margin for error)
+    COLLISION_CELL_SIZE = (
+        max(Asteroid.SIZE_TO_RADIUS) + max(Player.RADIUS, Bullet.RADIUS) + 1
+    )
+
+    # Maximum distance an asteroid and the player ship or a bullet can move
+    # towards each other per frame (used to widen the cells above when
+    # collisions are checked along moves covering multiple frames)
+    MAX_APPROACH_SPEED = max(Player.MAX_SPEED, Bullet.SPEED) + max(
+        Asteroid.SIZE_TO_MAX_SPEED
+    )
+
+    # Maximum number of regions to erase individually between frames
+    MAX_ERASED_RECTS = 64
+
     def __init__(self, use_ui=True):
         """
-        Initializes pygame and core state.
-        If use_ui is True, loads UI components as well.
+        Initializes core state.
+        If use_ui is True, initializes pygame and loads UI components too.
         """
-        pygame.init()
-
         self._use_ui = use_ui
         if self._use_ui:
+            import pygame
+
+            pygame.init()
             pygame.mixer.init()
             load_sounds()
 
@@ -48,6 +88,9 @@ class App(object):
 
         # If the UI is enabled, set up relevant components
         if self._use_ui:
+            import pygame
+
+            from asteroids.render import BLACK, WHITE, Text_Label
 
             # Set up the game screen
             self.screen = pygame.display.set_mode(
@@ -55,6 +98,7 @@ class App(object):
             )
             self.screen.fill(BLACK)
             pygame.display.flip()
+            self._drawn_rects = []
 
             # Set up the game clock
             self._clock = pygame.time.Clock()
@@ -64,16 +108,27 @@ class App(object):
             self._medium_font = pygame.font.SysFont(None, 50)
             self._small_font = pygame.font.SysFont(None, 24)
 
+            # Render the HUD's static text, and create its changing labels
+            self._paused_text = self._big_font.render("PAUSED", True, WHITE)
+            self._game_over_text = self._big_font.render(
+                "GAME OVER", True, WHITE
+            )
+            self._score_label = Text_Label(self._small_font)
+            self._fps_label = Text_Label(self._small_font)
+
         # If the UI is disabled, ensure sounds are also disabled
         elif settings.SOUNDS_ENABLED:
             raise RuntimeError(
                 "settings.SOUNDS_ENABLED must be False if use_ui is False"
             )
 
-        # Save the rng seed
+        # Save the rng seed, and create the game's own RNG, so that
+        # games never draw from (or disturb) the global RNG
         self._seed = seed
+        self._rng = random.Random()
 
-        # Initialize game component variables
+        # Initialize the simulation config and game component variables
+        self._config = None
         self.player = None
         self.bullets = []
         self.asteroids = []
@@ -93,15 +148,23 @@ class App(object):
 
     def _cleanup(self):
         """
-        Cleanup all game components.
+        Cleanup all game components. pygame is only
+        initialized (and so shut down) if use_ui is True.
         """
-        pygame.quit()
-        pygame.mixer.quit()
+        if self._use_ui:
+            import pygame
+
+            pygame.quit()
+            pygame.mixer.quit()
 
     def _load_splash(self):
         """
         Loads the splash page for human players.
         """
+        import pygame
+
+        from asteroids.render import GRAY, WHITE, render_on
+
         settings = get_settings()
         self._state = App.SPLASH
         self._splash_title = self._big_font.render("Asteroids", True, WHITE)
@@ -129,18 +192,30 @@ class App(object):
         settings = get_settings()
         self._state = App.RUNNING
 
-        # Use saved RNG seed if one was provided
-        if self._seed is not None:
-            self._prev_rng_state = random.getstate()
-            random.seed(self._seed)
+        # Take a snapshot of the settings used while the game runs
+        self._config = get_simulation_config()
+
+        # Seed the game's RNG with the saved seed if one was provided
+        # (seeding it with None seeds it unpredictably)
+        self._rng.seed(self._seed)
 
-        # Load initial game components
+        # Load initial game components, recycling the previous level's
+        for component in self.bullets + self.asteroids:
+            component.recycle()
         self.player = self._spawn_player()
         self.bullets = []
         self.asteroids = []
         for i in range(4):
-            Asteroid.spawn(self.asteroids, self.player, False)
-        Asteroid.spawn(self.asteroids, self.player, True)
+            Asteroid.spawn(
+                self.asteroids,
+                self.player,
+                False,
+                self._config,
+                rng=self._rng,
+            )
+        Asteroid.spawn(
+            self.asteroids, self.player, True, self._config, rng=self._rng
+        )
 
         # Initialize performance trackers
         self.score = 0
@@ -153,8 +228,13 @@ class App(object):
 
         # Reset the screen, if necessary
         if self._use_ui:
+            import pygame
+
+            from asteroids.render import BLACK
+
             self.screen.fill(BLACK)
             pygame.display.flip()
+            self._drawn_rects = []
 
             # Reset sounds and start the BGM
             stop_all_sounds()
@@ -168,7 +248,7 @@ class App(object):
         self.player.x = -self.player.radius
         self.player.y = -self.player.radius
         self.player.speed = 0
-        self.player.stop_boosting()
+        self.player.stop_boosting(self._config)
         self.player.stop_spinning()
         stop_sound("bgm")
 
@@ -179,7 +259,7 @@ class App(object):
         if self._state != App.RUNNING and self._state != App.GAME_OVER:
             return
 
-        settings = get_settings()
+        config = self._config
 
         # If the player is destroyed, transition to Game Over state or quit.
         if self._state == App.RUNNING and self.player.destroyed:
@@ -188,13 +268,9 @@ class App(object):
             else:
                 self._running = False
 
-            # Restore RNG state as well if necessary
-            if self._seed:
-                random.setstate(self._prev_rng_state)
-
-        # Remove destroyed components
-        self.bullets = [x for x in self.bullets if not x.destroyed]
-        self.asteroids = [x for x in self.asteroids if not x.destroyed]
+        # Remove destroyed components, recycling them for later reuse
+        Component.remove_destroyed(self.bullets)
+        Component.remove_destroyed(self.asteroids)
 
         # Get the approximate number of milliseconds since last asteroid spawn
         # Since the game operates on frames (the number of update iterations),
@@ -204,73 +280,96 @@ class App(object):
 
         # If the spawn period has expired, spawn a new aimed Asteroid
         if ms_since_last_spawn > self._spawn_period:
-            new_spawn_period = self._spawn_period - settings.SPAWN_PERIOD_DEC
-            self._spawn_period = max(
-                new_spawn_period, settings.MIN_SPAWN_PERIOD
-            )
+            new_spawn_period = self._spawn_period - config.SPAWN_PERIOD_DEC
+            self._spawn_period = max(new_spawn_period, config.MIN_SPAWN_PERIOD)
             self._last_spawn_time = self.run_time
-            Asteroid.spawn(self.asteroids, self.player, True)
+            Asteroid.spawn(
+                self.asteroids, self.player, True, config, rng=self._rng
+            )
 
         # Update the player with the current game state
         if not self.player.destroyed:
             self._update_player()
 
         # Move all game components
-        self.player.move()
+        self.player.move(config)
         for bullet in self.bullets:
-            bullet.move()
+            bullet.move(config)
         for asteroid in self.asteroids:
-            asteroid.move()
+            asteroid.move(config)
+
+        # Index the asteroids by position, so that collision checks
+        # only need to consider the asteroids near each component
+        cell_size = App.COLLISION_CELL_SIZE
+        if config.SIMULATION_TIMESTEP != 1:
+            cell_size += App.MAX_APPROACH_SPEED * config.SIMULATION_TIMESTEP
+        asteroid_hash = Spatial_Hash(self.asteroids, cell_size, config)
 
         # Check for player collisions with asteroids:
-        self.player.check_for_collisions(self.asteroids)
+        self.player.check_for_collisions(self.asteroids, config, asteroid_hash)
 
         # Age and check for bullet collisions with asteroids
         for bullet in self.bullets:
-            bullet_score = bullet.check_for_collisions(self.asteroids)
+            bullet_score = bullet.check_for_collisions(
+                self.asteroids, config, asteroid_hash, self._rng
+            )
             self.score += bullet_score
             self.asteroids_hit += int(bullet_score > 0)
-            bullet.increase_age()
+            bullet.increase_age(config)
 
         # Increment run time if the player is still alive
         if not self.player.destroyed:
-            self.run_time += 1
+            self.run_time += config.SIMULATION_TIMESTEP
 
     def _render(self):
         """
-        Re-renders all game components.
+        Re-renders all game components. Only the regions drawn on this
+        frame or the last are cleared and pushed to the display.
         """
         if self._state not in [App.RUNNING, App.PAUSED, App.GAME_OVER]:
             return
 
+        import pygame
+
+        from asteroids.render import (
+            BLACK,
+            draw_asteroid,
+            draw_bullet,
+            draw_player,
+            get_render_rect,
+            merge_rects,
+            render_on,
+        )
+
         settings = get_settings()
 
-        # Reset the screen
-        self.screen.fill((0, 0, 0))
+        # Erase everything drawn on the last frame. If a lot was drawn,
+        # it's faster to clear the whole screen than to merge the regions
+        if len(self._drawn_rects) > App.MAX_ERASED_RECTS:
+            self.screen.fill(BLACK)
+            erased_rects = [self.screen.get_rect()]
+        else:
+            erased_rects = merge_rects(self._drawn_rects)
+            for rect in erased_rects:
+                self.screen.fill(BLACK, rect)
 
         # Redraw all non-destroyed game components
+        render_rects = []
         if not self.player.destroyed:
-            self.player.draw(self.screen)
+            draw_player(self.screen, self.player)
+            render_rects.append(get_render_rect(self.player))
         for bullet in self.bullets:
             if not bullet.destroyed:
-                bullet.draw(self.screen)
+                draw_bullet(self.screen, bullet)
+                render_rects.append(get_render_rect(bullet))
         for asteroid in self.asteroids:
             if not asteroid.destroyed:
-                asteroid.draw(self.screen)
-
-        # Add render rects for the components current and previous positions
-        render_rects = []
-        self.player.add_render_rects(render_rects)
-        for bullet in self.bullets:
-            bullet.add_render_rects(render_rects)
-        for asteroid in self.asteroids:
-            asteroid.add_render_rects(render_rects)
+                draw_asteroid(self.screen, asteroid)
+                render_rects.append(get_render_rect(asteroid))
 
         # Show score in top left if necessary
         if settings.SHOW_SCORE:
-            score_text = self._small_font.render(
-                "Score: %d" % self.score, True, WHITE
-            )
+            score_text = self._score_label.render("Score: %d" % self.score)
             score_rect = render_on(
                 score_text,
                 self.screen,
@@ -286,9 +385,7 @@ class App(object):
                 if math.isinf(self._clock.get_fps())
                 else int(self._clock.get_fps())
             )
-            fps_text = self._small_font.render(
-                "FPS: %d" % current_fps, True, WHITE
-            )
+            fps_text = self._fps_label.render("FPS: %d" % current_fps)
             fps_rect = render_on(
                 fps_text,
                 self.screen,
@@ -299,9 +396,8 @@ class App(object):
 
         # If the game is paused, display paused text
         if self._state == App.PAUSED:
-            paused_text = self._big_font.render("PAUSED", True, WHITE)
             paused_rect = render_on(
-                paused_text,
+                self._paused_text,
                 self.screen,
                 settings.WIDTH / 2,
                 settings.HEIGHT / 2,
@@ -310,9 +406,8 @@ class App(object):
 
         # If the game is over, display game over text
         if self._state == App.GAME_OVER:
-            game_over_text = self._big_font.render("GAME OVER", True, WHITE)
             game_over_rect = render_on(
-                game_over_text,
+                self._game_over_text,
                 self.screen,
                 settings.WIDTH / 2,
                 settings.HEIGHT / 2,
@@ -323,13 +418,16 @@ class App(object):
         ai_render_rects = self._render_ai_spectator_overlay()
         render_rects.extend(ai_render_rects)
 
-        # Actually re-render all collected rectangles
-        pygame.display.update(render_rects)
+        # Actually re-render the erased and newly drawn regions
+        pygame.display.update(erased_rects + render_rects)
+        self._drawn_rects = render_rects
 
     def _handle_event(self, event):
         """
         Interprets and handles an asynchronous event.
         """
+        import pygame
+
         settings = get_settings()
 
         # Stop running when the close button or 'Q' is pressed
@@ -365,12 +463,19 @@ class App(object):
             if event.type == pygame.KEYDOWN and event.key == pygame.K_d:
                 settings.DEBUG_MODE = not settings.DEBUG_MODE
                 settings.SHOW_COLLISION_BOUNDARY = settings.DEBUG_MODE
+                self._config = get_simulation_config()
             # F: Toggle FPS display
             if event.type == pygame.KEYDOWN and event.key == pygame.K_f:
                 settings.SHOW_FPS = not settings.SHOW_FPS
             # N: Spawn a new aimed asteroid
             if event.type == pygame.KEYDOWN and event.key == pygame.K_n:
-                Asteroid.spawn(self.asteroids, self.player, True)
+                Asteroid.spawn(
+                    self.asteroids,
+                    self.player,
+                    True,
+                    self._config,
+                    rng=self._rng,
+                )
             # P: Pauses / Unpauses the game
             if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
                 if self._state == App.RUNNING:
@@ -385,6 +490,7 @@ class App(object):
             # S: Toggles sound effects
             if event.type == pygame.KEYDOWN and event.key == pygame.K_s:
                 settings.PLAY_SFX = not settings.PLAY_SFX
+                self._config = get_simulation_config()
                 if settings.PLAY_SFX:
                     if self._state == App.RUNNING:
                         play_sound("bgm", -1)
@@ -393,7 +499,9 @@ class App(object):
             # X: Splits the first asteroid on the asteroid list
             if event.type == pygame.KEYDOWN and event.key == pygame.K_x:
                 if len(self.asteroids) > 0:
-                    self.asteroids[0].split(self.asteroids)
+                    self.asteroids[0].split(
+                        self.asteroids, self._config, self._rng
+                    )
 
             # Running state only controls
             if self._state == App.RUNNING:
@@ -402,16 +510,16 @@ class App(object):
                 if settings.PLAYER_MODE == settings.HUMAN:
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_UP:
-                            self.player.start_boosting()
+                            self.player.start_boosting(self._config)
                         if event.key == pygame.K_LEFT:
                             self.player.start_spinning(False)
                         if event.key == pygame.K_RIGHT:
                             self.player.start_spinning(True)
                         if event.key == pygame.K_SPACE:
-                            self.player.shoot(self.bullets)
+                            self.player.shoot(self.bullets, self._config)
                     elif event.type == pygame.KEYUP:
                         if event.key == pygame.K_UP:
-                            self.player.stop_boosting()
+                            self.player.stop_boosting(self._config)
                         if event.key == pygame.K_LEFT:
                             self.player.stop_spinning()
                         if event.key == pygame.K_RIGHT:
@@ -429,6 +537,8 @@ class App(object):
         """
         Sets up the game and begins the main execution loop.
         """
+        import pygame
+
         settings = get_settings()
         self._setup(seed=seed)
 
@@ -439,11 +549,56 @@ class App(object):
         while self._running:
             for event in pygame.event.get():
                 self._handle_event(event)
-            self._update()
+            for i in range(self._get_steps_per_frame()):
+                self._update()
+                if self._state != App.RUNNING:
+                    break
             self._render()
             self._clock.tick(settings.MAX_FPS)
         self._cleanup()
 
+    def snapshot(self):
+        """
+        Returns an App_Snapshot of the game's current state (including
+        the RNG state), which can later be restored with restore.
+        """
+        return App_Snapshot(
+            self._state,
+            self._running,
+            self._config,
+            self._seed,
+            self._rng.getstate(),
+            self.player.get_state(),
+            [bullet.get_state() for bullet in self.bullets],
+            [asteroid.get_state() for asteroid in self.asteroids],
+            self.score,
+            self.asteroids_hit,
+            self.run_time,
+            self._last_spawn_time,
+            self._spawn_period,
+        )
+
+    def restore(self, snapshot):
+        """
+        Restores the game (and the RNG) to the state in the provided
+        App_Snapshot, so that it continues exactly as it did from there.
+        """
+        for component in self.bullets + self.asteroids:
+            component.recycle()
+        self._state = snapshot.state
+        self._running = snapshot.running
+        self._config = snapshot.config
+        self._seed = snapshot.seed
+        self._rng.setstate(snapshot.rng_state)
+        self.player = Component.from_state(snapshot.player)
+        self.bullets = [Component.from_state(s) for s in snapshot.bullets]
+        self.asteroids = [Component.from_state(s) for s in snapshot.asteroids]
+        self.score = snapshot.score
+        self.asteroids_hit = snapshot.asteroids_hit
+        self.run_time = snapshot.run_time
+        self._last_spawn_time = snapshot.last_spawn_time
+        self._spawn_period = snapshot.spawn_period
+
     ##################################################
     #       TO BE IMPLEMENTED BY AI SUBCLASSES
     ##################################################
@@ -459,7 +614,7 @@ class App(object):
         """
         Reads the current game state + has the player respond accordingly.
         """
-        self.player.update(self.bullets, None)
+        self.player.update(self.bullets, None, self._config)
 
     def _render_ai_spectator_overlay(self):
         """
@@ -476,3 +631,9 @@ class App(object):
         raise NotImplementedError(
             "'_handle_ai_spectator_controls' should only be called by AI_App"
         )
+
+    def _get_steps_per_frame(self):
+        """
+        Returns the number of game steps to simulate per rendered frame.
+        """
+        return 1
@@ -0,0 +1,658 @@
+"""
+Defines a structure-of-arrays implementation of the game world,
+used to run headless simulations without per-component objects.
+"""
+
+import math
+import random
+from collections import namedtuple
+
+import numpy as np
+
+from asteroids.asteroid import Asteroid
+from asteroids.bullet import Bullet
+from asteroids.sound import play_sound
+from settings import get_settings, get_simulation_config
+
+# Read-only view of a single asteroid, as seen by sensors
+Asteroid_State = namedtuple("Asteroid_State", ["x", "y", "radius"])
+
+
+class Component_Arrays(object):
+    """
+    Holds the state of a group of components for any number of games
+    as a 3D array, such that each field is stored contiguously for all
+    of a game's components. Components are kept in the order they were
+    added, as they are in App's lists.
+    """
+
+    # Fields shared by all component types
+    X, Y, RADIUS, VX, VY = range(5)
+    NUM_FIELDS = 5
+
+    # Number of components per game to allocate space for initially
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, num_games=1):
+        self.reset(num_games)
+
+    def reset(self, num_games):
+        """
+        Removes all components, and resizes to hold the provided
+        number of games (reusing the existing arrays if possible).
+        """
+        if not hasattr(self, "data") or len(self.counts) != num_games:
+            capacity = self.INITIAL_CAPACITY
+            self.data = np.zeros((self.NUM_FIELDS, num_games, capacity))
+            self.destroyed = np.zeros((num_games, capacity), dtype=bool)
+            self.counts = np.zeros(num_games, dtype=int)
+            self._has_destroyed = np.zeros(num_games, dtype=bool)
+        self.destroyed[:] = False
+        self.counts[:] = 0
+        self._has_destroyed[:] = False
+
+    def get_valid_mask(self):
+        """
+        Returns a (games x n) boolean array indicating which slots hold
+        a component, where n is the largest number held by any game.
+        """
+        return np.arange(self.counts.max()) < self.counts[:, np.newaxis]
+
+    def destroy(self, game, index):
+        """
+        Marks a game's component at index as destroyed.
+        """
+        self.destroyed[game, index] = True
+        self._has_destroyed[game] = True
+
+    def compact(self):
+        """
+        Removes destroyed components, preserving the order of the rest.
+        """
+        games = self._has_destroyed.nonzero()[0]
+        if len(games) == 0:
+            return
+        n = int(self.counts[games].max())
+        kept = ~self.destroyed[games, :n]
+        kept &= np.arange(n) < self.counts[games, np.newaxis]
+
+        # Stable sort each game's kept components to the front
+        order = np.argsort(~kept, axis=1, kind="stable")
+        self.data[:, games, :n] = np.take_along_axis(
+            self.data[:, games, :n], order[np.newaxis], axis=2
+        )
+        self.destroyed[games] = False
+        self.counts[games] = kept.sum(axis=1)
+        self._has_destroyed[games] = False
+
+    def move(self, lower_bound, upper_bounds):
+        """
+        Moves all components by their velocity, wrapping any that
+        leave the screen bounds to the other side. upper_bounds
+        should be a (2 x 1 x 1) array of the maximum x and y values.
+        """
+        n = self.counts.max()
+        position = self.data[
+            Component_Arrays.X : Component_Arrays.Y + 1, :, :n
+        ]
+        velocity = self.data[
+            Component_Arrays.VX : Component_Arrays.VY + 1, :, :n
+        ]
+        position += velocity
+        np.copyto(position, upper_bounds, where=position < lower_bound)
+        np.copyto(position, lower_bound, where=position > upper_bounds)
+
+    def select_games(self, games):
+        """
+        Keeps only the components of the games at the provided
+        indices, which become games 0 to len(games) - 1.
+        """
+        self.data = self.data[:, games]
+        self.destroyed = self.destroyed[games]
+        self.counts = self.counts[games]
+        self._has_destroyed = self._has_destroyed[games]
+
+    def _add(self, game):
+        """
+        Reserves space for a new component in a game and returns its index.
+        """
+        index = int(self.counts[game])
+        (num_games, capacity) = self.destroyed.shape
+        if index == capacity:
+            data = np.zeros((self.NUM_FIELDS, num_games, capacity * 2))
+            data[:, :, :capacity] = self.data
+            destroyed = np.zeros((num_games, capacity * 2), dtype=bool)
+            destroyed[:, :capacity] = self.destroyed
+            self.data = data
+            self.destroyed = destroyed
+        self.destroyed[game, index] = False
+        self.counts[game] += 1
+        return index
+
+
+class Asteroid_Arrays(Component_Arrays):
+    """
+    Holds the state of all asteroids in an Array_World.
+    """
+
+    SPEED, ANGLE, SIZE, SPIN, ROTATION, SHAPE, DIVOT = range(5, 12)
+    NUM_FIELDS = 12
+
+    def get_states(self, game):
+        """
+        Returns an iterator of Asteroid_States for
+        each of a game's asteroids, in list order.
+        """
+        n = self.counts[game]
+        return map(
+            Asteroid_State._make,
+            zip(
+                self.data[Asteroid_Arrays.X, game, :n].tolist(),
+                self.data[Asteroid_Arrays.Y, game, :n].tolist(),
+                self.data[Asteroid_Arrays.RADIUS, game, :n].tolist(),
+            ),
+        )
+
+    def add(self, game, rng, size, x, y, speed, angle):
+        """
+        Adds a new asteroid to a game, choosing its spin and shape
+        from rng in the same order as the Asteroid constructor.
+        """
+        speed = min(speed, Asteroid.SIZE_TO_MAX_SPEED[size])
+        spin = rng.uniform(
+            -Asteroid.MAX_ROTATION_SPEED, Asteroid.MAX_ROTATION_SPEED
+        )
+        shape = rng.randint(0, len(Asteroid.ASTEROID_SHAPES) - 1)
+        divot = rng.randint(-2, len(Asteroid.ASTEROID_SHAPES[shape]) - 1)
+
+        index = self._add(game)
+        column = self.data[:, game, index]
+        column[Asteroid_Arrays.X] = x
+        column[Asteroid_Arrays.Y] = y
+        column[Asteroid_Arrays.VX] = speed * math.sin(angle)
+        column[Asteroid_Arrays.VY] = speed * -math.cos(angle)
+        column[Asteroid_Arrays.RADIUS] = Asteroid.SIZE_TO_RADIUS[size]
+        column[Asteroid_Arrays.SPEED] = speed
+        column[Asteroid_Arrays.ANGLE] = angle
+        column[Asteroid_Arrays.SIZE] = size
+        column[Asteroid_Arrays.SPIN] = spin
+        column[Asteroid_Arrays.ROTATION] = 0
+        column[Asteroid_Arrays.SHAPE] = shape
+        column[Asteroid_Arrays.DIVOT] = divot
+
+    def rotate(self):
+        """
+        Advances the rotation of all asteroids by their spin.
+        """
+        n = self.counts.max()
+        rotation = self.data[Asteroid_Arrays.ROTATION, :, :n]
+        rotation += self.data[Asteroid_Arrays.SPIN, :, :n]
+        np.remainder(rotation, 2 * math.pi, out=rotation)
+
+    def split(self, game, index, rng, config):
+        """
+        Splits a game's asteroid at index into two smaller asteroids
+        if possible, mirroring Asteroid.split, and returns its score.
+        """
+        self.destroy(game, index)
+        (x, y, speed, angle, size) = self.data[
+            [
+                Asteroid_Arrays.X,
+                Asteroid_Arrays.Y,
+                Asteroid_Arrays.SPEED,
+                Asteroid_Arrays.ANGLE,
+                Asteroid_Arrays.SIZE,
+            ],
+            game,
+            index,
+        ].tolist()
+        size = int(size)
+        if size > 1:
+            for direction in [-1, 1]:
+                child_speed = rng.uniform(
+                    speed, Asteroid.SIZE_TO_MAX_SPEED[size - 1]
+                )
+                child_angle = (
+                    angle + direction * rng.uniform(0, math.pi / 4)
+                ) % (2 * math.pi)
+                self.add(game, rng, size - 1, x, y, child_speed, child_angle)
+        play_sound(Asteroid.SIZE_TO_BANG_SOUND[size], config=config)
+        return Asteroid.SIZE_TO_SCORE[size]
+
+
+class Bullet_Arrays(Component_Arrays):
+    """
+    Holds the state of all bullets in an Array_World.
+    """
+
+    AGE = 5
+    NUM_FIELDS = 6
+
+    def add(self, game, bullet):
+        """
+        Adds the state of a newly shot Bullet object to a game.
+        """
+        index = self._add(game)
+        column = self.data[:, game, index]
+        column[Bullet_Arrays.X] = bullet.x
+        column[Bullet_Arrays.Y] = bullet.y
+        column[Bullet_Arrays.VX] = bullet.speed * math.sin(bullet.angle)
+        column[Bullet_Arrays.VY] = bullet.speed * -math.cos(bullet.angle)
+        column[Bullet_Arrays.RADIUS] = bullet.radius
+        column[Bullet_Arrays.AGE] = 0
+
+    def increase_age(self):
+        """
+        Increments the age of all bullets, destroying
+        any that have reached their maximum lifespan.
+        """
+        n = int(self.counts.max())
+        if n == 0:
+            return
+        age = self.data[Bullet_Arrays.AGE, :, :n]
+        age += 1
+
+        # Bullets are kept in the order they were shot, so none
+        # of a game's bullets have expired unless its first has
+        expiring = (age[:, 0] > Bullet.MAX_LIFESPAN) & (self.counts > 0)
+        games = expiring.nonzero()[0]
+        if len(games) > 0:
+            expired = age[games] > Bullet.MAX_LIFESPAN
+            expired &= np.arange(n) < self.counts[games, np.newaxis]
+            self.destroyed[games, :n] |= expired
+            self._has_destroyed[games] = True
+
+
+class Game_Asteroids(object):
+    """
+    Iterable view of one game's asteroids in an Array_World,
+    yielding an Asteroid_State for each, for use by sensors.
+    """
+
+    def __init__(self, asteroids, game):
+        self._asteroids = asteroids
+        self._game = game
+
+    def __iter__(self):
+        return self._asteroids.get_states(self._game)
+
+    def __len__(self):
+        return int(self._asteroids.counts[self._game])
+
+    def get_arrays(self):
+        """
+        Returns a (3 x n) view of the x, y and radius of
+        each of the game's n asteroids, for vectorized sensors.
+        """
+        n = self._asteroids.counts[self._game]
+        return self._asteroids.data[
+            : Asteroid_Arrays.RADIUS + 1, self._game, :n
+        ]
+
+    def get_batch_arrays(self, views):
+        """
+        Returns a (3 x p x n) array of the x, y and radius of the
+        asteroids of each of the p games viewed (all in the same arrays
+        as this view), where n is the most held by any of them, and a
+        (p x n) boolean array indicating which are present.
+        """
+        games = [view._game for view in views]
+        counts = self._asteroids.counts[games]
+        n = counts.max()
+        return (
+            self._asteroids.data[: Asteroid_Arrays.RADIUS + 1, games, :n],
+            np.arange(n) < counts[:, np.newaxis],
+        )
+
+
+class Game_Bullets(object):
+    """
+    View of one game's bullets in an Array_World, supporting
+    the parts of the list interface used by Player.shoot.
+    """
+
+    def __init__(self, bullets, game):
+        self._bullets = bullets
+        self._game = game
+
+    def __len__(self):
+        return int(self._bullets.counts[self._game])
+
+    def append(self, bullet):
+        self._bullets.add(self._game, bullet)
+        bullet.recycle()
+
+
+class Array_World(object):
+    """
+    Headless game world that keeps asteroid and bullet state in
+    NumPy arrays, so that movement, screen wrapping, aging and
+    compaction run as whole-array operations.
+
+    Any number of independent games can be played in lockstep, sharing
+    the same arrays, so that the cost of each array operation is spread
+    over all of them. Finished games are masked out of each step, and
+    dropped from the arrays once they make up half of them.
+
+    Each update mirrors App._update step for step, with each game
+    drawing from its own RNG seeded as App seeds the global one, so
+    that every game produces the same results as the object engine.
+    """
+
+    def __init__(self):
+        self.players = []
+        self.asteroids = Asteroid_Arrays()
+        self.bullets = Bullet_Arrays()
+
+    @property
+    def running(self):
+        """
+        Whether any of the games are still running.
+        """
+        return any(self._running)
+
+    def load_level(self, players, seeds):
+        """
+        Loads the initial game components for one game per provided
+        (already spawned) player ship, seeding each game's RNG with
+        the corresponding seed (or at random if the seed is None).
+        """
+        settings = get_settings()
+        config = get_simulation_config()
+        num_games = len(players)
+
+        # Precompute the screen bounds and looping offsets
+        self._config = config
+        self._lower_bound = config.MIN_X
+        self._upper_bounds = np.array(
+            [config.MAX_X, config.MAX_Y], dtype=float
+        ).reshape(2, 1, 1)
+        self._half_screen_size = np.array(
+            [config.HALF_LOOPED_WIDTH, config.HALF_LOOPED_HEIGHT]
+        ).reshape(2, 1, 1, 1)
+
+        # Asteroids more than half a screen away are shifted by a screen
+        # width or height, as get_looped_point does (which always shifts
+        # y upward, regardless of which edge the asteroid is over)
+        self._below_half_shift = np.array(
+            [config.LOOPED_WIDTH, -config.LOOPED_HEIGHT]
+        ).reshape(2, 1, 1, 1)
+        self._above_half_shift = np.array(
+            [-config.LOOPED_WIDTH, -config.LOOPED_HEIGHT]
+        ).reshape(2, 1, 1, 1)
+
+        # Initialize the state of each game still in the arrays
+        self.players = list(players)
+        self._game_ids = list(range(num_games))
+        self._rngs = [random.Random(seed) for seed in seeds]
+        self._running = [True] * num_games
+        self._last_spawn_time = [0] * num_games
+        self._spawn_period = [settings.INITIAL_SPAWN_PERIOD] * num_games
+        self._score = [0] * num_games
+        self._asteroids_hit = [0] * num_games
+        self._run_time = [0] * num_games
+
+        # Initialize the final performance trackers of every game
+        self.scores = [0] * num_games
+        self.asteroids_hits = [0] * num_games
+        self.run_times = [0] * num_games
+
+        # Load initial game components
+        self.asteroids.reset(num_games)
+        self.bullets.reset(num_games)
+        self._load_game_views()
+        for game in range(num_games):
+            for i in range(4):
+                self._spawn_asteroid(game, False)
+            self._spawn_asteroid(game, True)
+
+    def update(self):
+        """
+        Performs one step of the game loop for every running game.
+        """
+        config = self._config
+        players = self._players
+        asteroids = self.asteroids
+        bullets = self.bullets
+
+        # Games whose player was destroyed last step stop running,
+        # but (as in App) still finish this step
+        active = [game for game, r in enumerate(self._running) if r]
+        finishing = [game for game in active if players[game].destroyed]
+        alive = [game for game in active if not players[game].destroyed]
+        for game in finishing:
+            self._running[game] = False
+
+        # Remove destroyed components
+        bullets.compact()
+        asteroids.compact()
+
+        # Spawn a new aimed Asteroid in games whose spawn period expired
+        for game in active:
+            frames_since_last_spawn = (
+                self._run_time[game] - self._last_spawn_time[game]
+            )
+            ms_since_last_spawn = frames_since_last_spawn * 1000.0 / 60.0
+            if ms_since_last_spawn > self._spawn_period[game]:
+                new_spawn_period = (
+                    self._spawn_period[game] - config.SPAWN_PERIOD_DEC
+                )
+                self._spawn_period[game] = max(
+                    new_spawn_period, config.MIN_SPAWN_PERIOD
+                )
+                self._last_spawn_time[game] = self._run_time[game]
+                self._spawn_asteroid(game, True)
+
+        # Update the players with their game's current state, all at
+        # once (so AI players can think together in lockstep), unless
+        # there's only one, which is faster to update on its own
+        if len(alive) == 1:
+            game = alive[0]
+            game_bullets = self._game_bullets[game]
+            sensor_data = players[game].sense(
+                self._game_asteroids[game], game_bullets, config
+            )
+            players[game].update(game_bullets, sensor_data, config)
+        elif alive:
+            alive_players = [players[game] for game in alive]
+            alive_bullets = [self._game_bullets[game] for game in alive]
+            sensor_data = type(alive_players[0]).sense_all(
+                alive_players,
+                [self._game_asteroids[game] for game in alive],
+                alive_bullets,
+                config,
+            )
+            type(alive_players[0]).update_all(
+                alive_players, alive_bullets, sensor_data, config
+            )
+
+        # Move all game components
+        for game in active:
+            players[game].move(config)
+        bullets.move(self._lower_bound, self._upper_bounds)
+        asteroids.move(self._lower_bound, self._upper_bounds)
+        asteroids.rotate()
+
+        # Find the collisions of each player (column 0) and bullet with
+        # its game's asteroids, before any of the asteroids are split
+        bullet_counts = bullets.counts.tolist()
+        colliders = np.empty((3, len(players), max(bullet_counts) + 1))
+        colliders[:, :, 0] = [
+            [player.x for player in players],
+            [player.y for player in players],
+            [player.radius for player in players],
+        ]
+        colliders[:, :, 1:] = bullets.data[
+            : Bullet_Arrays.RADIUS + 1, :, : max(bullet_counts)
+        ]
+        hits = self._get_asteroid_hits(colliders)
+        if asteroids.counts.min() < hits.shape[2]:
+            hits &= asteroids.get_valid_mask()[:, np.newaxis, :]
+        has_hit = hits.any(axis=2).tolist()
+
+        # Check for player collisions with asteroids
+        if not config.DEBUG_MODE:
+            for game in alive:
+                if has_hit[game][0]:
+                    target = int(hits[game, 0].argmax())
+                    players[game].check_for_collisions(
+                        [self._get_asteroid_state(game, target)], config
+                    )
+
+        # Check for bullet collisions with asteroids in order, in each
+        # game where any occurred. Asteroids split by earlier bullets
+        # are added to the end of the list, so are only checked if the
+        # bullet didn't hit any of the others.
+        for game in active:
+            num_bullets = bullet_counts[game]
+            game_has_hit = has_hit[game]
+            if not any(game_has_hit[1 : num_bullets + 1]):
+                continue
+            num_asteroids = int(asteroids.counts[game])
+            for index in range(1, num_bullets + 1):
+                if game_has_hit[index]:
+                    target = int(hits[game, index].argmax())
+                elif asteroids.counts[game] > num_asteroids:
+                    child_hits = self._get_asteroid_hits(
+                        colliders[:, game : game + 1, index : index + 1],
+                        game=game,
+                        start=num_asteroids,
+                    )
+                    if not child_hits.any():
+                        continue
+                    target = num_asteroids + int(child_hits.argmax())
+                else:
+                    continue
+                bullets.destroy(game, index - 1)
+                bullet_score = asteroids.split(
+                    game, target, self._rngs[game], config
+                )
+                self._score[game] += bullet_score
+                self._asteroids_hit[game] += int(bullet_score > 0)
+        bullets.increase_age()
+
+        # Increment run time in games where the player is still alive
+        for game in alive:
+            if not players[game].destroyed:
+                self._run_time[game] += 1
+
+        # Record the results of finished games, and drop
+        # them from the arrays once they make up half of them
+        for game in finishing:
+            game_id = self._game_ids[game]
+            self.scores[game_id] = self._score[game]
+            self.asteroids_hits[game_id] = self._asteroids_hit[game]
+            self.run_times[game_id] = self._run_time[game]
+        num_running = len(active) - len(finishing)
+        if finishing and 2 * num_running <= len(self._running):
+            self._select_games(
+                [game for game, r in enumerate(self._running) if r]
+            )
+
+    def stop(self):
+        """
+        Stops every game that is still running (e.g. when out of time),
+        recording the results of each so far. Returns the IDs of the
+        games whose player was still alive, which were cut short.
+        """
+        stopped_games = []
+        for game, running in enumerate(self._running):
+            if not running:
+                continue
+            game_id = self._game_ids[game]
+            self.scores[game_id] = self._score[game]
+            self.asteroids_hits[game_id] = self._asteroids_hit[game]
+            self.run_times[game_id] = self._run_time[game]
+            self._running[game] = False
+            if not self._players[game].destroyed:
+                stopped_games.append(game_id)
+        return stopped_games
+
+    def _select_games(self, games):
+        """
+        Keeps only the games at the provided indices in the arrays.
+        """
+        self.asteroids.select_games(games)
+        self.bullets.select_games(games)
+        self._game_ids = [self._game_ids[game] for game in games]
+        self._rngs = [self._rngs[game] for game in games]
+        self._running = [self._running[game] for game in games]
+        self._last_spawn_time = [self._last_spawn_time[g] for g in games]
+        self._spawn_period = [self._spawn_period[game] for game in games]
+        self._score = [self._score[game] for game in games]
+        self._asteroids_hit = [self._asteroids_hit[game] for game in games]
+        self._run_time = [self._run_time[game] for game in games]
+        self._load_game_views()
+
+    def _load_game_views(self):
+        """
+        Creates the player list and per-game component
+        views for the games currently in the arrays.
+        """
+        self._players = [self.players[i] for i in self._game_ids]
+        self._game_asteroids = [
+            Game_Asteroids(self.asteroids, game)
+            for game in range(len(self._players))
+        ]
+        self._game_bullets = [
+            Game_Bullets(self.bullets, game)
+            for game in range(len(self._players))
+        ]
+
+    def _spawn_asteroid(self, game, aimed):
+        """
+        Spawns a new asteroid in a game, as done by Asteroid.spawn.
+        """
+        rng = self._rngs[game]
+        (x, y, speed, angle) = Asteroid.choose_spawn_state(
+            self._players[game], aimed, self._config, rng=rng
+        )
+        self.asteroids.add(game, rng, 3, x, y, speed, angle)
+
+    def _get_asteroid_state(self, game, index):
+        """
+        Returns an Asteroid_State for a game's asteroid at index.
+        """
+        return Asteroid_State._make(
+            self.asteroids.data[
+                : Asteroid_Arrays.RADIUS + 1, game, index
+            ].tolist()
+        )
+
+    def _get_asteroid_hits(self, colliders, game=None, start=0):
+        """
+        Accepts a (3 x g x k) array containing the x, y and radius of k
+        components in each of g games, and returns a (g x k x n) boolean
+        matrix indicating which of their game's asteroids (from index
+        start onward) each collides with. If game is provided, the
+        components must all belong to that game.
+
+        Distances are calculated exactly as has_collided does,
+        so both engines agree on every collision.
+        """
+        if game is None:
+            games = slice(None)
+            end = self.asteroids.counts.max()
+        else:
+            games = slice(game, game + 1)
+            end = self.asteroids.counts[game]
+        position = colliders[: Component_Arrays.Y + 1, :, :, np.newaxis]
+        asteroid_data = self.asteroids.data[:, games, np.newaxis, start:end]
+        asteroid_position = asteroid_data[: Component_Arrays.Y + 1]
+
+        # Get the looped position of each asteroid
+        delta = asteroid_position - position
+        looped_position = (
+            asteroid_position
+            + (delta < -self._half_screen_size) * self._below_half_shift
+            + (delta > self._half_screen_size) * self._above_half_shift
+        )
+
+        # Compare the distance to each against the sum of their radiuses
+        delta = looped_position - position
+        delta *= delta
+        distances = np.sqrt(delta.sum(axis=0))
+        return distances <= (
+            colliders[Component_Arrays.RADIUS, :, :, np.newaxis]
+            + asteroid_data[Component_Arrays.RADIUS]
+        )
@@ -1,12 +1,9 @@
 import math
 import random
 
-import pygame
-
 from asteroids.component import Component
 from asteroids.sound import play_sound
-from asteroids.utils import WHITE, angle_to_xy, get_rotated_vertices
-from settings import get_settings
+from asteroids.utils import angle_to_xy, get_rotated_vertices
 
 
 class Asteroid(Component):
@@ -14,6 +11,8 @@ class Asteroid(Component):
     Defines an in-game asteroid.
     """
 
+    __slots__ = ("_size", "_rotation", "_spin", "_shape", "_divot")
+
     # The component radiuses for each asteroid size
     SIZE_TO_RADIUS = [0, 10, 20, 40]
 
@@ -63,7 +62,16 @@ class Asteroid(Component):
     ]
 
     def __init__(
-        self, size, x, y, speed, angle, spin=None, shape=None, divot=None
+        self,
+        size,
+        x,
+        y,
+        speed,
+        angle,
+        spin=None,
+        shape=None,
+        divot=None,
+        rng=random,
     ):
         super(Asteroid, self).__init__(
             Asteroid.SIZE_TO_RADIUS[size], x, y, speed, angle
@@ -74,132 +82,161 @@ class Asteroid(Component):
         self._spin = (
             spin
             if spin is not None
-            else random.uniform(
+            else rng.uniform(
                 -Asteroid.MAX_ROTATION_SPEED, Asteroid.MAX_ROTATION_SPEED
             )
         )
         self._shape = (
             shape
             if shape is not None
-            else random.randint(0, len(Asteroid.ASTEROID_SHAPES) - 1)
+            else rng.randint(0, len(Asteroid.ASTEROID_SHAPES) - 1)
         )
         self._divot = (
             divot
             if divot is not None
-            else random.randint(
+            else rng.randint(
                 -2, len(Asteroid.ASTEROID_SHAPES[self._shape]) - 1
             )
         )
 
     @staticmethod
-    def spawn(asteroids, player, aimed, speed=None):
+    def spawn(asteroids, player, aimed, config, speed=None, rng=random):
         """
         Spawns a new asteroid and adds it to the asteroids list.
         If aimed is True, the asteroid spawns moving in the
-        direction of the player ship.
+        direction of the player ship. Its random state is drawn
+        from rng (the global RNG by default).
+        """
+        (new_x, new_y, speed, angle) = Asteroid.choose_spawn_state(
+            player, aimed, config, speed, rng
+        )
+        spawned_asteroid = Asteroid.create(
+            3, new_x, new_y, speed, angle, rng=rng
+        )
+        asteroids.append(spawned_asteroid)
+
+    @staticmethod
+    def choose_spawn_state(player, aimed, config, speed=None, rng=random):
+        """
+        Randomly chooses the position, speed and angle of a newly
+        spawned asteroid, and returns them as an (x, y, speed, angle)
+        tuple. If aimed is True, the angle points toward the player.
+        Values are drawn from rng (the global RNG by default).
         """
-        settings = get_settings()
         [NORTH, EAST, SOUTH, WEST] = range(4)
 
         # Get the possible spawn edges
         possible_spawn_edges = [NORTH, EAST, SOUTH, WEST]
-        if player.y < settings.MIN_SPAWN_EDGE_DISTANCE:
+        if player.y < config.MIN_SPAWN_EDGE_DISTANCE:
             possible_spawn_edges.remove(NORTH)
-        if player.y > settings.HEIGHT - settings.MIN_SPAWN_EDGE_DISTANCE:
+        if player.y > config.HEIGHT - config.MIN_SPAWN_EDGE_DISTANCE:
             possible_spawn_edges.remove(SOUTH)
-        if player.x < settings.MIN_SPAWN_EDGE_DISTANCE:
+        if player.x < config.MIN_SPAWN_EDGE_DISTANCE:
             possible_spawn_edges.remove(WEST)
-        if player.x > settings.WIDTH - settings.MIN_SPAWN_EDGE_DISTANCE:
+        if player.x > config.WIDTH - config.MIN_SPAWN_EDGE_DISTANCE:
             possible_spawn_edges.remove(EAST)
 
         # Choose one of them, and a location on that edge
-        spawn_edge = random.choice(possible_spawn_edges)
+        spawn_edge = rng.choice(possible_spawn_edges)
         if spawn_edge == NORTH:
-            new_x = random.randint(0, settings.WIDTH)
-            new_y = -settings.SCREEN_EDGE_THICKNESS
+            new_x = rng.randint(0, config.WIDTH)
+            new_y = config.MIN_Y
         elif spawn_edge == SOUTH:
-            new_x = random.randint(0, settings.WIDTH)
-            new_y = settings.HEIGHT + settings.SCREEN_EDGE_THICKNESS
+            new_x = rng.randint(0, config.WIDTH)
+            new_y = config.MAX_Y
         elif spawn_edge == WEST:
-            new_x = -settings.SCREEN_EDGE_THICKNESS
-            new_y = random.randint(0, settings.HEIGHT)
+            new_x = config.MIN_X
+            new_y = rng.randint(0, config.HEIGHT)
         elif spawn_edge == EAST:
-            new_x = settings.WIDTH + settings.SCREEN_EDGE_THICKNESS
-            new_y = random.randint(0, settings.HEIGHT)
+            new_x = config.MAX_X
+            new_y = rng.randint(0, config.HEIGHT)
 
         # Choose the angle (set toward the player if aimed)
         angle = angle_to_xy(
             new_x, new_y, player.x, player.y, handle_looping=False
         )
         if not aimed:
-            angle += random.uniform(-math.pi / 2, math.pi / 2)
+            angle += rng.uniform(-math.pi / 2, math.pi / 2)
 
         # Choose the speed (set reasonably high if aimed)
         if speed is None:
             max_speed = Asteroid.SIZE_TO_MAX_SPEED[3]
             min_speed = 3 * max_speed / 4.0 if aimed else max_speed / 2.0
-            speed = random.uniform(min_speed, max_speed)
+            speed = rng.uniform(min_speed, max_speed)
 
-        # Create the asteroid and add it to the provided list
-        spawned_asteroid = Asteroid(3, new_x, new_y, speed, angle)
-        asteroids.append(spawned_asteroid)
+        return (new_x, new_y, speed, angle)
 
-    def move(self):
+    def move(self, config):
         """
         Moves the asteroid, and accounts for rotation.
         """
-        super(Asteroid, self).move()
-        self._rotation = (self._rotation + self._spin) % (2 * math.pi)
+        super(Asteroid, self).move(config)
+        self._rotation = (
+            self._rotation + self._spin * config.SIMULATION_TIMESTEP
+        ) % (2 * math.pi)
+
+    def get_outline(self):
+        """
+        Returns the asteroid's (shape, size, divot, rotation), which
+        determine its outline (along with its position).
+        """
+        return (self._shape, self._size, self._divot, self._rotation)
 
-    def draw(self, screen):
+    def get_vertices(self, x=None, y=None, rotation=None):
         """
-        Draws the asteroid at its current location.
+        Returns the vertices of the asteroid's outline as a list of
+        (x, y) tuples. Uses the asteroid's current location and rotation,
+        unless others are provided.
         """
-        super(Asteroid, self).draw(screen)
+        x = self.x if x is None else x
+        y = self.y if y is None else y
+        rotation = self._rotation if rotation is None else rotation
         unrotated_angles = Asteroid.ASTEROID_SHAPES[self._shape]
         vertices = get_rotated_vertices(
-            unrotated_angles, self.x, self.y, self.radius, self._rotation
+            unrotated_angles, x, y, self.radius, rotation
         )
         if self._divot > 0:
             vertices = (
-                vertices[: self._divot]
-                + [(self.x, self.y)]
-                + vertices[self._divot :]
+                vertices[: self._divot] + [(x, y)] + vertices[self._divot :]
             )
-        pygame.draw.polygon(screen, WHITE, vertices, 1)
+        return vertices
 
-    def split(self, asteroids):
+    def split(self, asteroids, config, rng=random):
         """
         Splits the asteroid into two smaller asteroids if possible.
         Just destroys the asteroid if its at the minimum size.
+        The smaller asteroids are randomized with rng (the global
+        RNG by default).
         """
         self.destroyed = True
         if self._size > 1:
             asteroids.append(
-                Asteroid(
+                Asteroid.create(
                     self._size - 1,
                     self.x,
                     self.y,
-                    random.uniform(
+                    rng.uniform(
                         self.speed, Asteroid.SIZE_TO_MAX_SPEED[self._size - 1]
                     ),
-                    (self.angle - random.uniform(0, math.pi / 4))
+                    (self.angle - rng.uniform(0, math.pi / 4))
                     % (2 * math.pi),
+                    rng=rng,
                 )
             )
             asteroids.append(
-                Asteroid(
+                Asteroid.create(
                     self._size - 1,
                     self.x,
                     self.y,
-                    random.uniform(
+                    rng.uniform(
                         self.speed, Asteroid.SIZE_TO_MAX_SPEED[self._size - 1]
                     ),
-                    (self.angle + random.uniform(0, math.pi / 4))
+                    (self.angle + rng.uniform(0, math.pi / 4))
                     % (2 * math.pi),
+                    rng=rng,
                 )
             )
-        play_sound(Asteroid.SIZE_TO_BANG_SOUND[self._size])
+        play_sound(Asteroid.SIZE_TO_BANG_SOUND[self._size], config=config)
 
     def get_score(self):
         """
@@ -1,7 +1,7 @@
-import pygame
+import random
 
 from asteroids.component import Component
-from asteroids.utils import WHITE, has_collided
+from asteroids.utils import has_collided, has_swept_collided
 
 
 class Bullet(Component):
@@ -9,6 +9,8 @@ class Bullet(Component):
     Defines an in-game bullet, shot by the player ship.
     """
 
+    __slots__ = ("_age",)
+
     # The component characteristics of each bullet
     RADIUS = 3
     SPEED = 10
@@ -20,35 +22,41 @@ class Bullet(Component):
         super(Bullet, self).__init__(Bullet.RADIUS, x, y, Bullet.SPEED, angle)
         self._age = 0
 
-    def draw(self, screen):
-        """
-        Draws the bullet at its current location.
-        """
-        super(Bullet, self).draw(screen)
-        pygame.draw.circle(
-            screen, WHITE, (int(self.x), int(self.y)), self.radius, 0
-        )
-
-    def increase_age(self):
+    def increase_age(self, config):
         """
-        Increments the bullet's age, destroying it
-        if its reached its maximum lifespan.
+        Increases the bullet's age by the configured timestep,
+        destroying it if its reached its maximum lifespan.
         """
-        self._age += 1
+        self._age += config.SIMULATION_TIMESTEP
         if self._age > Bullet.MAX_LIFESPAN:
             self.destroyed = True
 
-    def check_for_collisions(self, asteroids):
+    def check_for_collisions(
+        self, asteroids, config, asteroid_hash=None, rng=random
+    ):
         """
         Checks whether the bullet has collided with any asteroids,
-        splitting the asteroid, destroying the bullet, and returning
-        the associated score if a collision occurs. Returns 0 otherwise.
+        splitting the asteroid (with rng), destroying the bullet, and
+        returning the associated score if a collision occurs.
+        Returns 0 otherwise.
+        If a Spatial_Hash of the asteroids is provided, only the
+        asteroids near the bullet are checked. With timesteps bigger
+        than 1, collisions anywhere along the last move are detected,
+        so that the bullet can't pass through asteroids between steps.
         """
         if self.destroyed:
             return 0
-        for asteroid in asteroids:
-            if has_collided(self, asteroid):
+        if asteroid_hash is not None:
+            nearby_asteroids = asteroid_hash.get_nearby(self.x, self.y)
+        else:
+            nearby_asteroids = asteroids
+        if config.SIMULATION_TIMESTEP == 1:
+            collided = has_collided
+        else:
+            collided = has_swept_collided
+        for asteroid in nearby_asteroids:
+            if collided(self, asteroid, config):
                 self.destroyed = True
-                asteroid.split(asteroids)
+                asteroid.split(asteroids, config, rng)
                 return asteroid.get_score()
         return 0
@@ -1,16 +1,35 @@
 import math
+import threading
+from operator import attrgetter
 
-import pygame
+# Destroyed components that may be reused, keyed by component class.
+# Each thread has its own pools (see _get_recycled_components), so
+# simulations running in different threads never share components.
+_thread_local = threading.local()
 
-from asteroids.utils import GREEN, RED, get_render_rect
-from settings import get_settings
+# Names of the attributes saved by get_state, keyed by component class
+_state_attribute_names = {}
 
 
 class Component(object):
     """
     Base class for all Game Components that appear on screen.
+
+    Components that are created and destroyed often can be recycled
+    instead of discarded, and reused by create, to avoid allocations.
     """
 
+    __slots__ = (
+        "radius",
+        "x",
+        "y",
+        "prevX",
+        "prevY",
+        "speed",
+        "angle",
+        "destroyed",
+    )
+
     def __init__(self, radius, x, y, speed, angle):
         self.radius = radius
         self.x = x
@@ -21,50 +40,127 @@ class Component(object):
         self.angle = angle
         self.destroyed = False
 
-    def move(self):
+    @classmethod
+    def create(cls, *args, **kwargs):
         """
-        Updates the component's position according to its speed and angle.
+        Returns a new component of this class, initialized with the
+        provided arguments. Reuses a recycled component if possible.
         """
-        self.prevX = self.x
-        self.prevY = self.y
-        self.x += self.speed * math.sin(self.angle)
-        self.y += self.speed * -math.cos(self.angle)
-        self._wrap_screen_bounds()
+        recycled = _get_recycled_components(cls)
+        if recycled:
+            component = recycled.pop()
+            component.__init__(*args, **kwargs)
+            return component
+        return cls(*args, **kwargs)
+
+    @staticmethod
+    def remove_destroyed(components):
+        """
+        Removes all destroyed components from the provided list in
+        place, keeping the rest in order, and recycles the removed ones.
+        """
+        num_kept = 0
+        for component in components:
+            if component.destroyed:
+                component.recycle()
+            else:
+                components[num_kept] = component
+                num_kept += 1
+        del components[num_kept:]
+
+    def get_state(self):
+        """
+        Returns a snapshot of the component's state as a tuple,
+        which can be restored with Component.from_state.
+        """
+        names = _get_state_attribute_names(type(self))
+        state = (type(self), attrgetter(*names)(self))
+        self._copy_mutable_state()
+        return state
+
+    @staticmethod
+    def from_state(state):
+        """
+        Returns a component restored from a snapshot taken by get_state.
+        Reuses a recycled component if possible.
+        """
+        (cls, values) = state
+        recycled = _get_recycled_components(cls)
+        component = recycled.pop() if recycled else cls.__new__(cls)
+        for name, value in zip(_get_state_attribute_names(cls), values):
+            setattr(component, name, value)
+        component._copy_mutable_state()
+        return component
 
-    def draw(self, screen):
+    def _copy_mutable_state(self):
         """
-        Draws the component at its current position.
-        Draws a circle around the collision boundary
-        of the component if specified in settings.
+        Replaces any mutable state with a copy, so that it isn't
+        shared with a snapshot taken by get_state or restored by
+        from_state (as either may be restored again later).
         """
-        settings = get_settings()
-        if settings.DEBUG_MODE:
-            pygame.draw.circle(
-                screen, GREEN, (int(self.x), int(self.y)), self.radius, 1
-            )
-        elif settings.SHOW_COLLISION_BOUNDARY:
-            pygame.draw.circle(
-                screen, RED, (int(self.x), int(self.y)), self.radius, 1
-            )
+        pass
 
-    def add_render_rects(self, rects):
+    def recycle(self):
         """
-        Adds the render rects for the component's current and
-        previous positions to the provided rectangle list.
+        Makes the component available for reuse by create. It should
+        not be used afterwards (except by the code that reuses it).
         """
-        rects.append(get_render_rect(self.x, self.y, self.radius))
-        rects.append(get_render_rect(self.prevX, self.prevY, self.radius))
+        _get_recycled_components(type(self)).append(self)
 
-    def _wrap_screen_bounds(self):
+    def move(self, config):
+        """
+        Updates the component's position according to its speed and angle,
+        moving it as far as it goes in the configured timestep.
+        """
+        timestep = config.SIMULATION_TIMESTEP
+        self.prevX = self.x
+        self.prevY = self.y
+        self.x += self.speed * timestep * math.sin(self.angle)
+        self.y += self.speed * timestep * -math.cos(self.angle)
+        self._wrap_screen_bounds(config)
+
+    def _wrap_screen_bounds(self, config):
         """
         If the component is out of the screen bounds, wrap it to other side.
         """
-        settings = get_settings()
-        if self.x < -settings.SCREEN_EDGE_THICKNESS:
-            self.x = settings.WIDTH + settings.SCREEN_EDGE_THICKNESS
-        if self.x > settings.WIDTH + settings.SCREEN_EDGE_THICKNESS:
-            self.x = -settings.SCREEN_EDGE_THICKNESS
-        if self.y < -settings.SCREEN_EDGE_THICKNESS:
-            self.y = settings.HEIGHT + settings.SCREEN_EDGE_THICKNESS
-        if self.y > settings.HEIGHT + settings.SCREEN_EDGE_THICKNESS:
-            self.y = -settings.SCREEN_EDGE_THICKNESS
+        if self.x < config.MIN_X:
+            self.x = config.MAX_X
+        if self.x > config.MAX_X:
+            self.x = config.MIN_X
+        if self.y < config.MIN_Y:
+            self.y = config.MAX_Y
+        if self.y > config.MAX_Y:
+            self.y = config.MIN_Y
+
+
+def _get_recycled_components(cls):
+    """
+    Returns the current thread's list of recycled components of the
+    class. Only the current thread uses it, so it can be checked and
+    popped from without racing any others.
+    """
+    try:
+        recycled_components = _thread_local.recycled_components
+    except AttributeError:
+        recycled_components = {}
+        _thread_local.recycled_components = recycled_components
+    recycled = recycled_components.get(cls)
+    if recycled is None:
+        recycled = recycled_components[cls] = []
+    return recycled
+
+
+def _get_state_attribute_names(cls):
+    """
+    Returns the names of all attributes of the component class,
+    which are those declared in the __slots__ of it and its bases.
+    """
+    names = _state_attribute_names.get(cls)
+    if names is None:
+        names = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in klass.__dict__.get("__slots__", ())
+        )
+        _state_attribute_names[cls] = names
+    return names
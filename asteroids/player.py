@@ -1,12 +1,13 @@
 import math
 
-import pygame
-
 from asteroids.bullet import Bullet
 from asteroids.component import Component
 from asteroids.sound import play_sound, stop_sound
-from asteroids.utils import WHITE, get_rotated_vertices, has_collided
-from settings import get_settings
+from asteroids.utils import (
+    get_rotated_vertices,
+    has_collided,
+    has_swept_collided,
+)
 
 
 class Player(Component):
@@ -14,6 +15,14 @@ class Player(Component):
     Defines the player ship.
     """
 
+    __slots__ = (
+        "num_bullets_fired",
+        "rotation",
+        "_boosting",
+        "_spin",
+        "_remaining_reload_time",
+    )
+
     # Radius of the player ship
     RADIUS = 14
 
@@ -46,58 +55,62 @@ class Player(Component):
         self._spin = Player.NO_SPIN
         self._remaining_reload_time = 0
 
-    def move(self):
+    def move(self, config):
         """
-        Moves the player ship, and accounts for acceleration + rotation.
+        Moves the player ship, and accounts for acceleration + rotation
+        over the configured timestep.
         """
-        super(Player, self).move()
+        timestep = config.SIMULATION_TIMESTEP
+        super(Player, self).move(config)
         if self._boosting:
+            acceleration = Player.BOOSTER_ACCELERATION * timestep
             new_vx = (self.speed * math.sin(self.angle)) + (
-                Player.BOOSTER_ACCELERATION * math.sin(self.rotation)
+                acceleration * math.sin(self.rotation)
             )
             new_vy = (self.speed * math.cos(self.angle)) + (
-                Player.BOOSTER_ACCELERATION * math.cos(self.rotation)
+                acceleration * math.cos(self.rotation)
             )
             new_speed = math.sqrt((new_vx * new_vx) + (new_vy * new_vy))
             new_angle = math.atan2(new_vx, new_vy)
         else:
-            new_speed = self.speed - Player.DRAG_DECELERATION
+            new_speed = self.speed - Player.DRAG_DECELERATION * timestep
             new_angle = self.angle
         self.speed = max(min(new_speed, Player.MAX_SPEED), 0)
         self.angle = new_angle % (2 * math.pi)
-        self.rotation = (self.rotation + self._spin * Player.ROTATE_SPEED) % (
-            2 * math.pi
-        )
+        self.rotation = (
+            self.rotation + self._spin * Player.ROTATE_SPEED * timestep
+        ) % (2 * math.pi)
 
-    def draw(self, screen):
+    def get_vertices(self, x=None, y=None, rotation=None):
         """
-        Draws the player ship at its current location.
+        Returns the vertices of the player ship's outline as a list of
+        (x, y) tuples. Uses the ship's current location and rotation,
+        unless others are provided.
         """
-        super(Player, self).draw(screen)
+        x = self.x if x is None else x
+        y = self.y if y is None else y
+        rotation = self.rotation if rotation is None else rotation
         unrotated_angles = [0, (3 * math.pi / 4), (5 * math.pi / 4)]
         vertices = get_rotated_vertices(
-            unrotated_angles, self.x, self.y, self.radius, self.rotation
+            unrotated_angles, x, y, self.radius, rotation
         )
-        vertices = vertices[:2] + [(self.x, self.y)] + vertices[2:]
-        pygame.draw.polygon(screen, WHITE, vertices, 1)
+        return vertices[:2] + [(x, y)] + vertices[2:]
 
-    def start_boosting(self):
+    def start_boosting(self, config):
         """
         Engages the ships boosters.
         """
-        settings = get_settings()
-        if not self._boosting and not settings.DISABLE_BOOSTING:
+        if not self._boosting and not config.DISABLE_BOOSTING:
             self._boosting = True
-            play_sound("thrust", -1)
+            play_sound("thrust", -1, config)
 
-    def stop_boosting(self):
+    def stop_boosting(self, config):
         """
         Disengages the ship's boosters.
         """
-        settings = get_settings()
-        if self._boosting and not settings.ALWAYS_BOOSTING:
+        if self._boosting and not config.ALWAYS_BOOSTING:
             self._boosting = False
-            stop_sound("thrust", 400)
+            stop_sound("thrust", 400, config)
 
     def start_spinning(self, clockwise):
         """
@@ -113,34 +126,42 @@ class Player(Component):
         """
         self._spin = Player.NO_SPIN
 
-    def shoot(self, bullets):
+    def shoot(self, bullets, config):
         """
         Shoots a bullet in the current direction if possible.
         """
-        settings = get_settings()
         if (
             len(bullets) < Player.MAX_ONSCREEN_BULLETS
-            and self._remaining_reload_time == 0
-            and not settings.DISABLE_SHOOTING
+            and self._remaining_reload_time <= 0
+            and not config.DISABLE_SHOOTING
         ):
-            bullets.append(Bullet(self.x, self.y, self.rotation))
+            bullets.append(Bullet.create(self.x, self.y, self.rotation))
             self.num_bullets_fired += 1
-            self._remaining_reload_time = Player.RELOAD_TIME
-            play_sound("fire")
+            self._remaining_reload_time += Player.RELOAD_TIME
+            play_sound("fire", config=config)
 
-    def check_for_collisions(self, asteroids):
+    def check_for_collisions(self, asteroids, config, asteroid_hash=None):
         """
         Returns whether the player ship has collided with
         any asteroids, destroying the player ship if so.
+        If a Spatial_Hash of the asteroids is provided, only
+        the asteroids near the player ship are checked. With
+        timesteps bigger than 1, collisions anywhere along
+        the last move are detected.
         """
-        settings = get_settings()
-        if self.destroyed or settings.DEBUG_MODE:
+        if self.destroyed or config.DEBUG_MODE:
             return False
+        if asteroid_hash is not None:
+            asteroids = asteroid_hash.get_nearby(self.x, self.y)
+        if config.SIMULATION_TIMESTEP == 1:
+            collided = has_collided
+        else:
+            collided = has_swept_collided
         for asteroid in asteroids:
-            if has_collided(self, asteroid):
+            if collided(self, asteroid, config):
                 self.destroyed = True
-                stop_sound("thrust")
-                play_sound("bangSmall")
+                stop_sound("thrust", config=config)
+                play_sound("bangSmall", config=config)
                 return True
         return False
 
@@ -148,21 +169,47 @@ class Player(Component):
     #       TO BE IMPLEMENTED BY AI SUBCLASSES
     ##################################################
 
-    def sense(self, asteroids, bullets):
+    def sense(self, asteroids, bullets, config):
         """
         Checks the state of the world, and returns a feature
         matrix to be used as input to the AI update function.
         """
         raise NotImplementedError("'sense' should only be called by AI_Player")
 
-    def update(self, bullets, sensor_data):
+    @classmethod
+    def sense_all(cls, players, asteroids, bullets, config):
+        """
+        Checks the state of each of the players' games (all of this
+        class), as sense does, with the corresponding asteroids and
+        bullets, and returns a list of their feature matrices. Subclasses
+        can override this to sense for the players together more
+        efficiently.
+        """
+        return [
+            player.sense(asteroids[i], bullets[i], config)
+            for i, player in enumerate(players)
+        ]
+
+    def update(self, bullets, sensor_data, config):
         """
         Updates any time dependent player state, then runs
         the AI algorithm on sensor_data, and performs the
         appropiate actions in response.
         """
-        settings = get_settings()
-        if self._remaining_reload_time != 0:
-            self._remaining_reload_time -= 1
-        if settings.ALWAYS_BOOSTING and not self._boosting:
-            self.start_boosting()
+        # With timesteps bigger than 1, the reload time can finish partway
+        # through a step, so the time past that is carried over (as a
+        # negative value) into the next reload
+        if self._remaining_reload_time > 0:
+            self._remaining_reload_time -= config.SIMULATION_TIMESTEP
+        if config.ALWAYS_BOOSTING and not self._boosting:
+            self.start_boosting(config)
+
+    @classmethod
+    def update_all(cls, players, bullets, sensor_data, config):
+        """
+        Updates each of the players (all of this class), as update does,
+        with the corresponding bullets and sensor data. Subclasses can
+        override this to update the players together more efficiently.
+        """
+        for i, player in enumerate(players):
+            player.update(bullets[i], sensor_data[i], config)
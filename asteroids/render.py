@@ -0,0 +1,224 @@
+"""
+Draws the Asteroids game with pygame.
+
+Kept apart from the rest of the game, so that headless
+simulations never need to import (or initialize) pygame.
+"""
+
+import math
+from collections import OrderedDict
+
+import pygame
+
+from settings import get_settings
+
+# Commonly used colors
+BLACK = (0, 0, 0)
+GRAY = (140, 140, 140)
+GREEN = (20, 200, 20)
+RED = (200, 20, 20)
+WHITE = (220, 220, 220)
+
+# Number of distinct rotations outlines are pre-rendered at
+NUM_SPRITE_ROTATIONS = 64
+
+# Maximum memory (in bytes) the pre-rendered outlines can take up at
+# once. The full set of ~4.4k outlines (every asteroid shape, size and
+# divot at every rotation) would take ~55 MB, but a game only cycles
+# through the rotations of the few outlines on screen at a time.
+MAX_CACHED_SPRITE_BYTES = 32 * 1024 * 1024
+
+
+class Sprite_Cache(object):
+    """
+    Bounded cache of pre-rendered component outlines, so that drawing
+    an asteroid or the player ship is a single blit. Rotations are
+    rounded to one of NUM_SPRITE_ROTATIONS steps, and the least
+    recently used sprites are evicted once the cached sprites take
+    up more than max_bytes of memory.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHED_SPRITE_BYTES):
+        self._sprites = OrderedDict()
+        self._max_bytes = max_bytes
+        self._num_bytes = 0
+
+    def get_asteroid_sprite(self, asteroid):
+        """
+        Returns the sprite for the asteroid's current outline.
+        """
+        (shape, size, divot, rotation) = asteroid.get_outline()
+        step = _get_rotation_step(rotation)
+        return self._get_sprite(
+            ("asteroid", shape, size, max(divot, 0), step), asteroid, step
+        )
+
+    def get_player_sprite(self, player):
+        """
+        Returns the sprite for the player ship's current outline.
+        """
+        step = _get_rotation_step(player.rotation)
+        return self._get_sprite(("player", step), player, step)
+
+    def _get_sprite(self, key, component, step):
+        """
+        Returns the cached sprite with the provided key, pre-rendering
+        the component's outline at the rotation step if necessary.
+        """
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+
+        # Draw the outline centered on a transparent surface,
+        # leaving room for the width of the outline itself
+        center = component.radius + 1
+        sprite = pygame.Surface((2 * center + 1, 2 * center + 1))
+        sprite.set_colorkey(BLACK, pygame.RLEACCEL)
+        rotation = step * 2 * math.pi / NUM_SPRITE_ROTATIONS
+        vertices = component.get_vertices(center, center, rotation)
+        pygame.draw.polygon(sprite, WHITE, vertices, 1)
+
+        self._sprites[key] = sprite
+        self._num_bytes += _get_sprite_bytes(sprite)
+        while self._num_bytes > self._max_bytes and len(self._sprites) > 1:
+            (_, evicted) = self._sprites.popitem(last=False)
+            self._num_bytes -= _get_sprite_bytes(evicted)
+        return sprite
+
+
+class Text_Label(object):
+    """
+    Line of text drawn in a single font and color, such as a HUD
+    counter. The text is only re-rendered when it changes.
+    """
+
+    def __init__(self, font, color=WHITE):
+        self._font = font
+        self._color = color
+        self._text = None
+        self._surface = None
+
+    def render(self, text):
+        """
+        Returns a surface with the provided text drawn on it.
+        """
+        if text != self._text:
+            self._text = text
+            self._surface = self._font.render(text, True, self._color)
+        return self._surface
+
+
+# The sprite cache used to draw components
+_sprite_cache = Sprite_Cache()
+
+
+def draw_component(screen, component):
+    """
+    Draws a circle around the collision boundary
+    of the component if specified in settings.
+    """
+    settings = get_settings()
+    position = (int(component.x), int(component.y))
+    if settings.DEBUG_MODE:
+        pygame.draw.circle(screen, GREEN, position, component.radius, 1)
+    elif settings.SHOW_COLLISION_BOUNDARY:
+        pygame.draw.circle(screen, RED, position, component.radius, 1)
+
+
+def draw_asteroid(screen, asteroid):
+    """
+    Draws the asteroid at its current location.
+    """
+    draw_component(screen, asteroid)
+    _blit_sprite(screen, _sprite_cache.get_asteroid_sprite(asteroid), asteroid)
+
+
+def draw_bullet(screen, bullet):
+    """
+    Draws the bullet at its current location.
+    """
+    draw_component(screen, bullet)
+    pygame.draw.circle(
+        screen, WHITE, (int(bullet.x), int(bullet.y)), bullet.radius, 0
+    )
+
+
+def draw_player(screen, player):
+    """
+    Draws the player ship at its current location.
+    """
+    draw_component(screen, player)
+    _blit_sprite(screen, _sprite_cache.get_player_sprite(player), player)
+
+
+def get_render_rect(component):
+    """
+    Returns the screen rectangle covering everything
+    drawn for the component at its current position.
+    """
+    center = component.radius + 1
+    return pygame.Rect(
+        int(component.x) - center,
+        int(component.y) - center,
+        2 * center + 1,
+        2 * center + 1,
+    )
+
+
+def merge_rects(rects):
+    """
+    Returns a list of rectangles covering (at least) the same area as
+    the provided ones, with any overlapping rectangles merged together.
+    Rectangles are widened to start on a multiple of 16 pixels (and end
+    on a multiple of 4), as filling unaligned rows can be far slower.
+    """
+    merged_rects = []
+    for rect in rects:
+        left = rect.left & ~15
+        right = (rect.right + 3) & ~3
+        rect = pygame.Rect(left, rect.top, right - left, rect.height)
+        index = rect.collidelist(merged_rects)
+        while index != -1:
+            rect.union_ip(merged_rects.pop(index))
+            index = rect.collidelist(merged_rects)
+        merged_rects.append(rect)
+    return merged_rects
+
+
+def _blit_sprite(screen, sprite, component):
+    """
+    Draws the sprite centered at the component's current position.
+    """
+    center = component.radius + 1
+    screen.blit(sprite, (int(component.x) - center, int(component.y) - center))
+
+
+def _get_rotation_step(rotation):
+    """
+    Returns the index of the sprite rotation step closest to rotation.
+    """
+    step = int(round(rotation * NUM_SPRITE_ROTATIONS / (2 * math.pi)))
+    return step % NUM_SPRITE_ROTATIONS
+
+
+def _get_sprite_bytes(sprite):
+    """
+    Returns the number of bytes the sprite's pixels take up.
+    """
+    (width, height) = sprite.get_size()
+    return width * height * sprite.get_bytesize()
+
+
+def render_on(foreground, background, x, y):
+    """
+    Draws the foreground surface onto the background
+    surface, centered at position x, y. Returns the
+    render rect of the surface.
+    """
+    render_rect = foreground.get_rect()
+    render_rect = render_rect.move(
+        x - render_rect.width / 2, y - render_rect.height / 2
+    )
+    background.blit(foreground, render_rect)
+    return render_rect
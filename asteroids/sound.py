@@ -4,9 +4,7 @@ Handles BGM and sound effects for the Asteroids game.
 
 import os
 
-import pygame
-
-from settings import get_settings
+from settings import get_settings, get_simulation_config
 
 # Whether the sound module has been initialized
 _is_initialized = False
@@ -19,6 +17,8 @@ def load_sounds():
     """
     Loads all sounds from the designated director into the sound library.
     """
+    import pygame
+
     global _is_initialized, _sound_library
 
     # Ensure we don't double initialize the sound module
@@ -41,13 +41,15 @@ def load_sounds():
             )
 
 
-def play_sound(sound_name, loops=0):
+def play_sound(sound_name, loops=0, config=None):
     """
     Plays the sound with the provided name.
     The name should not include the file extension.
+    Uses the provided Simulation_Config, or the current settings if None.
     """
-    settings = get_settings()
-    if not settings.SOUNDS_ENABLED or not settings.PLAY_SFX:
+    if config is None:
+        config = get_simulation_config()
+    if not config.SFX_ENABLED:
         return
     if not _is_initialized:
         raise RuntimeError(
@@ -57,13 +59,15 @@ def play_sound(sound_name, loops=0):
     _sound_library[sound_name].play(loops)
 
 
-def stop_sound(sound_name, fadeout_ms=0):
+def stop_sound(sound_name, fadeout_ms=0, config=None):
     """
     Fades out and stops the sound with the provided name.
     Only necessary when sound was previously looped.
+    Uses the provided Simulation_Config, or the current settings if None.
     """
-    settings = get_settings()
-    if not settings.SOUNDS_ENABLED:
+    if config is None:
+        config = get_simulation_config()
+    if not config.SOUNDS_ENABLED:
         return
     if not _is_initialized:
         raise RuntimeError(
@@ -0,0 +1,80 @@
+"""
+Defines a spatial index over the playfield, used to quickly find
+the game components near a point without checking all of them.
+"""
+
+
+class Spatial_Hash(object):
+    """
+    Uniform grid over the wrapped playfield (including the screen
+    edges), which buckets a list of components by the cell their
+    position falls in. The grid wraps around like the playfield does,
+    so cells on opposite edges of the screen are neighbors.
+
+    Components are indexed lazily when the grid is queried, so any
+    appended to the list after it is built (such as the children of
+    split asteroids) are included too.
+    """
+
+    def __init__(self, components, cell_size, config):
+        """
+        Creates an index of the provided components. cell_size should
+        be at least the largest distance at which two components are
+        considered near each other (e.g. the largest collision distance).
+        """
+        self._components = components
+        self._edge = config.SCREEN_EDGE_THICKNESS
+        self._num_cols = max(int(config.LOOPED_WIDTH // cell_size), 1)
+        self._num_rows = max(int(config.LOOPED_HEIGHT // cell_size), 1)
+        self._cell_width = config.LOOPED_WIDTH / self._num_cols
+        self._cell_height = config.LOOPED_HEIGHT / self._num_rows
+        self._cells = {}
+        self._num_indexed = 0
+
+    def get_nearby(self, x, y):
+        """
+        Returns the components in the cell containing the point and
+        the cells surrounding it, in the order they appear in the list.
+        """
+        self._index_new_components()
+        (col, row) = self._get_cell(x, y)
+        cols = {(col - 1) % self._num_cols, col, (col + 1) % self._num_cols}
+        rows = {(row - 1) % self._num_rows, row, (row + 1) % self._num_rows}
+        indices = []
+        for nearby_col in cols:
+            for nearby_row in rows:
+                key = nearby_col * self._num_rows + nearby_row
+                if key in self._cells:
+                    indices.extend(self._cells[key])
+        indices.sort()
+        return [self._components[i] for i in indices]
+
+    def _get_cell(self, x, y):
+        """
+        Returns the column and row of the cell containing the point.
+        """
+        col = int((x + self._edge) / self._cell_width) % self._num_cols
+        row = int((y + self._edge) / self._cell_height) % self._num_rows
+        return (col, row)
+
+    def _index_new_components(self):
+        """
+        Adds any components appended to the list since it was last indexed.
+        The cell of each is computed inline (as in _get_cell), as this
+        runs for every component on every frame.
+        """
+        components = self._components
+        cells = self._cells
+        edge = self._edge
+        (cell_width, cell_height) = (self._cell_width, self._cell_height)
+        (num_cols, num_rows) = (self._num_cols, self._num_rows)
+        for i in range(self._num_indexed, len(components)):
+            component = components[i]
+            col = int((component.x + edge) / cell_width) % num_cols
+            row = int((component.y + edge) / cell_height) % num_rows
+            key = col * num_rows + row
+            if key in cells:
+                cells[key].append(i)
+            else:
+                cells[key] = [i]
+        self._num_indexed = len(components)
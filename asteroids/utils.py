@@ -4,83 +4,68 @@ Defines utility function for the Asteroids game.
 
 import math
 
-import pygame
+from settings import get_simulation_config
 
-from settings import get_settings
 
-# Commonly used colors
-BLACK = (0, 0, 0)
-GRAY = (140, 140, 140)
-GREEN = (20, 200, 20)
-RED = (200, 20, 20)
-WHITE = (220, 220, 220)
-
-
-def angle_to(comp1, comp2, handle_looping=True):
+def angle_to(comp1, comp2, handle_looping=True, config=None):
     """
     Returns the angle comp1 would have to face to move toward comp2.
     """
-    return angle_to_xy(comp1.x, comp1.y, comp2.x, comp2.y, handle_looping)
+    return angle_to_xy(
+        comp1.x, comp1.y, comp2.x, comp2.y, handle_looping, config
+    )
 
 
-def angle_to_xy(x1, y1, x2, y2, handle_looping=True):
+def angle_to_xy(x1, y1, x2, y2, handle_looping=True, config=None):
     """
     Returns the angle between the pair of points.
     """
     if handle_looping:
-        (x2, y2) = get_looped_point(x1, y1, x2, y2)
+        (x2, y2) = get_looped_point(x1, y1, x2, y2, config)
     dx = x2 - x1
     dy = y2 - y1
     return math.atan2(dx, -dy)
 
 
-def distance_between(comp1, comp2, handle_looping=True):
+def distance_between(comp1, comp2, handle_looping=True, config=None):
     """
     Returns the distance between the two components.
     """
     return distance_between_xy(
-        comp1.x, comp1.y, comp2.x, comp2.y, handle_looping
+        comp1.x, comp1.y, comp2.x, comp2.y, handle_looping, config
     )
 
 
-def distance_between_xy(x1, y1, x2, y2, handle_looping=True):
+def distance_between_xy(x1, y1, x2, y2, handle_looping=True, config=None):
     """
     Returns the distance between the pair of points.
     """
     if handle_looping:
-        (x2, y2) = get_looped_point(x1, y1, x2, y2)
+        (x2, y2) = get_looped_point(x1, y1, x2, y2, config)
     dx = x2 - x1
     dy = y2 - y1
     return math.sqrt((dx * dx) + (dy * dy))
 
 
-def get_looped_point(x1, y1, x2, y2):
+def get_looped_point(x1, y1, x2, y2, config=None):
     """
     Returns the looped values of x2 and y2 relative to x1 and y1.
+    Uses the provided Simulation_Config, or the current settings if None.
     """
-    settings = get_settings()
+    if config is None:
+        config = get_simulation_config()
     (looped_x2, looped_y2) = (x2, y2)
-    screen_width = settings.WIDTH + (2.0 * settings.SCREEN_EDGE_THICKNESS)
-    screen_height = settings.HEIGHT + (2.0 * settings.SCREEN_EDGE_THICKNESS)
-    if (x2 - x1) > (screen_width / 2.0):
-        looped_x2 = x2 - screen_width
-    elif (x2 - x1) < -(screen_width / 2.0):
-        looped_x2 = x2 + screen_width
-    if (y2 - y1) > (screen_height / 2.0):
-        looped_y2 = y2 - screen_height
-    elif (y2 - y1) < -(screen_height / 2.0):
-        looped_y2 = y2 - screen_height
+    if (x2 - x1) > config.HALF_LOOPED_WIDTH:
+        looped_x2 = x2 - config.LOOPED_WIDTH
+    elif (x2 - x1) < -config.HALF_LOOPED_WIDTH:
+        looped_x2 = x2 + config.LOOPED_WIDTH
+    if (y2 - y1) > config.HALF_LOOPED_HEIGHT:
+        looped_y2 = y2 - config.LOOPED_HEIGHT
+    elif (y2 - y1) < -config.HALF_LOOPED_HEIGHT:
+        looped_y2 = y2 - config.LOOPED_HEIGHT
     return (looped_x2, looped_y2)
 
 
-def get_render_rect(x, y, radius):
-    """
-    Returns the screen rectangle that needs to be
-    re-rendered, given a component's position and radius.
-    """
-    return pygame.Rect(x - radius, y - radius, radius * 2, radius * 2)
-
-
 def get_rotated_vertices(angles, x, y, radius, rotation):
     """
     Accepts a list of angles (in radians) corresponding to points
@@ -97,21 +82,66 @@ def get_rotated_vertices(angles, x, y, radius, rotation):
     ]
 
 
-def has_collided(comp1, comp2):
+def has_collided(comp1, comp2, config=None):
     """
     Returns whether the two components have collided.
     """
-    return distance_between(comp1, comp2) <= (comp1.radius + comp2.radius)
+    distance = distance_between(comp1, comp2, config=config)
+    return distance <= (comp1.radius + comp2.radius)
 
 
-def render_on(foreground, background, x, y):
+def has_swept_collided(comp1, comp2, config=None):
     """
-    Draws the foreground surface onto the background
-    surface, centered at position x, y. Returns the
-    render rect of the surface.
+    Returns whether the two components collided at any point during
+    their last move, assuming each moved in a straight line from its
+    previous position to its current one.
+    Uses the provided Simulation_Config, or the current settings if None.
     """
-    render_rect = foreground.get_rect()
-    render_rect = render_rect.move(
-        x - render_rect.width / 2, y - render_rect.height / 2
+    if config is None:
+        config = get_simulation_config()
+
+    # Get the offset between the components at the start of the move,
+    # and how much it changed over the move
+    (dx, dy) = _get_looped_offset(
+        comp2.prevX - comp1.prevX, comp2.prevY - comp1.prevY, config
     )
-    background.blit(foreground, render_rect)
+    (move1_x, move1_y) = _get_looped_offset(
+        comp1.x - comp1.prevX, comp1.y - comp1.prevY, config
+    )
+    (move2_x, move2_y) = _get_looped_offset(
+        comp2.x - comp2.prevX, comp2.y - comp2.prevY, config
+    )
+    move_x = move2_x - move1_x
+    move_y = move2_y - move1_y
+
+    # Find how far through the move the components were closest
+    move_length_sq = (move_x * move_x) + (move_y * move_y)
+    if move_length_sq > 0:
+        t = -((dx * move_x) + (dy * move_y)) / move_length_sq
+        t = max(0.0, min(1.0, t))
+    else:
+        t = 0.0
+
+    # Check whether they were close enough to collide at that point
+    closest_x = dx + (t * move_x)
+    closest_y = dy + (t * move_y)
+    collision_distance = comp1.radius + comp2.radius
+    return ((closest_x * closest_x) + (closest_y * closest_y)) <= (
+        collision_distance * collision_distance
+    )
+
+
+def _get_looped_offset(dx, dy, config):
+    """
+    Returns the shortest offset equivalent to dx, dy on the looped screen.
+    """
+    if dx > config.HALF_LOOPED_WIDTH:
+        dx -= config.LOOPED_WIDTH
+    elif dx < -config.HALF_LOOPED_WIDTH:
+        dx += config.LOOPED_WIDTH
+    if dy > config.HALF_LOOPED_HEIGHT:
+        dy -= config.LOOPED_HEIGHT
+    elif dy < -config.HALF_LOOPED_HEIGHT:
+        dy += config.LOOPED_HEIGHT
+    return (dx, dy)
+
@@ -5,9 +5,18 @@ Usage: python manage.py [--help]
 """
 
 import click
+import numpy as np
 
+from ai.benchmark import run_benchmark, run_breeding_benchmark
 from ai.experiment import merge_experiments
-from settings import get_settings, load_settings_from_cli
+from ai.offline_render import render_runs
+from ai.replay_app import record_replays
+from nn.nn_brain import convert_brain_files
+from settings import (
+    get_settings,
+    load_settings_from_cli,
+    load_settings_from_dict,
+)
 
 
 class TransparentGroup(click.Group):
@@ -62,6 +71,157 @@ def merge(ctx, parent_dirs, output_dir):
     merge_experiments(parent_dirs, output_dir)
 
 
+@manage.command(
+    short_help="Times headless simulations",
+    context_settings=dict(
+        ignore_unknown_options=True,
+        allow_extra_args=True,
+    ),
+)
+@click.pass_context
+def benchmark(ctx):
+    """
+    Times headless simulations of the game AI brain, and reports
+    the average time taken to simulate each frame:
+
+    \b
+    The settings passed to this command configure the simulations.
+    One game is run per predetermined seed (or, if not using those,
+    per seed in range(NUM_EVALUATION_SIMULATIONS)).
+    """
+    load_settings_from_cli()
+    run_benchmark()
+
+
+@manage.command(
+    "benchmark-breeding",
+    short_help="Times the breeding operators against network size",
+    context_settings=dict(
+        ignore_unknown_options=True,
+        allow_extra_args=True,
+    ),
+)
+@click.pass_context
+def benchmark_breeding(ctx):
+    """
+    Times the crossover and mutation operators of new brains on
+    increasing hidden layer sizes, and reports the average time
+    taken per call of each:
+
+    \b
+    The settings passed to this command configure the brains and
+    the operators (other than the hidden layer size).
+    """
+    load_settings_from_cli()
+    run_breeding_benchmark()
+
+
+@manage.command(
+    short_help="Records replays of the game AI brain",
+    context_settings=dict(
+        ignore_unknown_options=True,
+        allow_extra_args=True,
+    ),
+)
+@click.argument("output_dir")
+@click.pass_context
+def record(ctx, output_dir):
+    """
+    Runs headless simulations of the game AI brain, and saves
+    a replay of each game into the output directory:
+
+    \b
+    The settings passed to this command configure the simulations.
+    One game is run per predetermined seed (or, if not using those,
+    per seed in range(NUM_EVALUATION_SIMULATIONS)). Replays can be
+    watched with `python start.py --player-mode=ai --game-replay=...`,
+    using the same settings.
+
+    \b
+    Arguments:
+      output_dir - Directory to save the replays into.
+    Settings must be passed after this argument.
+    """
+    if output_dir.startswith("-"):
+        raise click.UsageError("Settings must follow the other arguments.")
+
+    load_settings_from_cli()
+    record_replays(output_dir)
+
+
+@manage.command(
+    short_help="Renders games offline to frame files",
+    context_settings=dict(
+        ignore_unknown_options=True,
+        allow_extra_args=True,
+    ),
+)
+@click.argument("output_dir")
+@click.argument("run_files", nargs=-1)
+@click.pass_context
+def render(ctx, output_dir, run_files):
+    """
+    Renders every frame of the games in the provided replay and brain
+    files into the output directory, without a display, using
+    multiprocessing:
+
+    \b
+    The settings passed to this command configure the games.
+    Replay files are rendered as recorded, and brain files (of the
+    algorithm given by ALGORITHM_ID) once per predetermined seed (or,
+    if not using those, per seed in range(NUM_EVALUATION_SIMULATIONS)).
+    With RENDER_FRAME_FORMAT = png, each game is written to a directory
+    of numbered PNG images. With raw, it's written to a single file of
+    RGB24 frames, which can be made into a video with, for example:
+    `ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600 -r 60 -i game.raw
+    game.mp4`
+
+    \b
+    Arguments:
+      output_dir - Directory to render the games into.
+      run_files  - Replay (.rpl) and brain (.brn) files to render.
+    Settings must be passed after these arguments.
+    """
+    # Remove all options (and their values) from the file arguments
+    run_files = [x for x in run_files if x.endswith((".rpl", ".brn"))]
+    if output_dir.startswith("-"):
+        raise click.UsageError("Settings must follow the other arguments.")
+
+    load_settings_from_cli()
+    render_runs(output_dir, run_files)
+
+
+@manage.command(
+    "convert-brains", short_help="Converts NN brain files between formats"
+)
+@click.argument("brain_files", nargs=-1)
+@click.option(
+    "--use-json",
+    is_flag=True,
+    help="Convert to the JSON format, instead of the binary format.",
+)
+@click.option(
+    "--float32",
+    is_flag=True,
+    help="Store the weights of binary brains as float32 (not float64).",
+)
+@click.pass_context
+def convert_brains(ctx, brain_files, use_json, float32):
+    """
+    Converts the NN brain files, in place, to the binary brain format
+    (or the JSON format). Brains are loaded from either format, so this
+    is only needed to shrink (or inspect) existing brain files:
+
+    \b
+    Arguments:
+      brain_files - NN brain (.brn) files to convert.
+    """
+    load_settings_from_dict({})
+    convert_brain_files(
+        brain_files, use_json, np.float32 if float32 else np.float64
+    )
+
+
 @manage.command("settings", short_help="View configurable settings")
 @click.pass_context
 def view_settings(ctx):
@@ -1,18 +1,57 @@
 import json
+import threading
 
 import numpy as np
 
-from ai.activations import get_activation_function, threshold_activation
+from ai.activations import (
+    get_array_activation_function,
+    threshold_activation_array,
+)
 from settings import get_settings
 
+# Random number generator used by the breeding operators
+# (crossover and mutation) when none is provided
+_default_rng = np.random.default_rng()
+
 
 class Neural_Network(object):
     """
     Implementation of a neural network.
+
+    All of the network's weights are stored in a single contiguous
+    array (its genome), and each weight matrix is a view into it.
     """
 
     def __init__(self, weight_matrices):
-        self._weight_matrices = weight_matrices
+        shapes = tuple(np.shape(weights) for weights in weight_matrices)
+        genome = np.concatenate(
+            [np.ravel(weights) for weights in weight_matrices]
+        ).astype(float, copy=False)
+        self._set_genome(genome, shapes)
+
+    @classmethod
+    def from_genome(cls, genome, shapes):
+        """
+        Returns a new Neural Network whose weight matrices, of the
+        provided shapes, are views into genome (which isn't copied).
+        """
+        network = cls.__new__(cls)
+        network._set_genome(genome, shapes)
+        return network
+
+    def __getstate__(self):
+        """
+        Returns the network's state for pickling: just its genome and
+        the shapes of its weight matrices (views into the genome, and
+        the inference plan's buffers, wouldn't survive pickling).
+        """
+        return {"genome": self._genome, "shapes": self._shapes}
+
+    def __setstate__(self, state):
+        """
+        Restores the network from its pickled state.
+        """
+        self._set_genome(state["genome"], state["shapes"])
 
     @classmethod
     def init_random(cls, num_inputs, num_outputs):
@@ -45,82 +84,120 @@ class Neural_Network(object):
 
         return cls(weight_matrices)
 
-    def get_output(self, input_values):
+    def get_output(self, input_values, config):
         """
         Feeds forward the input values through the network,
         and returns a vector of outputs, all either 0 or 1.
         """
-        settings = get_settings()
-        activation_fn = get_activation_function(
-            settings.HIDDEN_LAYER_ACTIVATION_FN
-        )
-        curr_inputs = input_values
-
-        # Compute the outputs of each layer, by dot multiplying the layer's
-        # inputs (+ a bias term of 1) with the layer's weight matrix.
-        # The output vector sent through the activation function is used
-        # as the inputs to the next layer.
-        for i in range(settings.NUM_HIDDEN_LAYERS):
-            inputs_with_bias = np.append(curr_inputs, 1)
-            curr_outputs = np.dot(inputs_with_bias, self._weight_matrices[i])
-            curr_inputs = np.array([activation_fn(x) for x in curr_outputs])
-
-        # Compute the final output of the network, by dot multiplying the
-        # last hidden layer's outputs with the output layer weights, and
-        # sending it through the threshold activation function.
-        inputs_with_bias = np.append(curr_inputs, 1)
-        raw_outputs = np.dot(inputs_with_bias, self._weight_matrices[-1])
-        threshold_fn = lambda x: threshold_activation(
-            x, settings.OUTPUT_ACTIVATION_THRESHOLD
-        )
-        return [threshold_fn(x) for x in raw_outputs]
+        return [int(x) for x in self.get_decisions(input_values, config)]
+
+    def get_decisions(self, input_values, config):
+        """
+        Feeds forward the input values through the network, and
+        returns a list of outputs, all either True or False.
+        """
+        return self.compile(config).feed_forward(input_values).tolist()
+
+    def compile(self, config):
+        """
+        Returns the network's inference plan for the settings in config,
+        compiling a new one if the network doesn't have one for them yet.
+        """
+        plan = self._plan
+        if plan is None or (
+            plan.config is not config
+            and plan.key != Inference_Plan.get_key(config)
+        ):
+            plan = Inference_Plan(self._weight_matrices, config)
+            self._plan = plan
+        return plan
+
+    def get_shape(self):
+        """
+        Returns the shapes of the network's weight matrices as a tuple,
+        which is the same for any networks of the same structure.
+        """
+        return self._shapes
+
+    def get_genome(self):
+        """
+        Returns the 1D array holding all of the network's weights, which
+        can be transferred or hashed as a single buffer. Changes to it
+        change the network (after which it must be recompiled).
+        """
+        return self._genome
 
-    def crossover(self, other_nn):
+    @staticmethod
+    def compile_all(networks, config, batch_plan=None):
         """
-        Mixes the weight matrices of this neural network and the other
-        one according to the crossover scheme defined in settings, and
-        returns a new Neural Network with this mixed weight matrix.
+        Returns an inference plan for feeding forward through each of the
+        networks (all of the same shape) at once, for the settings in
+        config. batch_plan, returned by an earlier call, is reused if it
+        was compiled for the same networks and they haven't changed.
         """
-        if len(self._weight_matrices) != len(other_nn._weight_matrices):
+        plans = [network.compile(config) for network in networks]
+        if batch_plan is not None and batch_plan.is_compiled_from(plans):
+            return batch_plan
+        return Batch_Inference_Plan(plans, config)
+
+    def crossover(self, other_nn, rng=None):
+        """
+        Mixes the genomes of this neural network and the other one
+        according to the crossover scheme defined in settings, and
+        returns a new Neural Network with this mixed genome.
+        Random choices are drawn from rng (a NumPy Generator), or
+        a shared default Generator if not provided.
+        """
+        if len(self._shapes) != len(other_nn._shapes):
             raise RuntimeError(
                 "Programmer Error: Attempted crossover "
                 "between NNs with different numbers of hidden layers."
             )
 
         settings = get_settings()
+        rng = _default_rng if rng is None else rng
 
-        # Crossover each layer's weight matrix
-        new_weight_matrices = []
-        for i in range(len(self._weight_matrices)):
-            if settings.CROSSOVER_MECHANISM == settings.RANDOM:
-                weight_matrix = Neural_Network._random_crossover(
-                    self._weight_matrices[i], other_nn._weight_matrices[i]
-                )
-            elif settings.CROSSOVER_MECHANISM == settings.SPLIT:
-                weight_matrix = Neural_Network._split_crossover(
-                    self._weight_matrices[i], other_nn._weight_matrices[i]
-                )
-            else:
-                raise RuntimeError(
-                    "Programmer Error: Unsupported crossover "
-                    + "mechanism ID '%d'" % settings.CROSSOVER_MECHANISM
+        # Crossover the whole genome at once, or
+        # each layer's weight matrix (view) in turn
+        if settings.CROSSOVER_MECHANISM == settings.RANDOM:
+            new_genome = Neural_Network._random_crossover(
+                self._genome, other_nn._genome, rng
+            )
+        elif settings.CROSSOVER_MECHANISM == settings.SPLIT:
+            new_genome = np.empty(len(self._genome))
+            new_weight_matrices = Neural_Network._get_weight_matrices(
+                new_genome, self._shapes
+            )
+            for i in range(len(self._weight_matrices)):
+                Neural_Network._split_crossover(
+                    self._weight_matrices[i],
+                    other_nn._weight_matrices[i],
+                    rng,
+                    new_weight_matrices[i],
                 )
-            new_weight_matrices.append(weight_matrix)
+        else:
+            raise RuntimeError(
+                "Programmer Error: Unsupported crossover "
+                + "mechanism ID '%d'" % settings.CROSSOVER_MECHANISM
+            )
 
-        return Neural_Network(new_weight_matrices)
+        return Neural_Network.from_genome(new_genome, self._shapes)
 
-    def mutate(self, mutation_rate):
+    def mutate(self, mutation_rate, rng=None):
         """
-        Sets values in the weight matrices to random
-        values at the specified mutation rate.
+        Sets values in the genome to random values at the specified
+        mutation rate. Random values are drawn from rng (a NumPy
+        Generator), or a shared default Generator if not provided.
         """
-        for layer in range(len(self._weight_matrices)):
-            for row in range(self._weight_matrices[layer].shape[0]):
-                for col in range(self._weight_matrices[layer].shape[1]):
-                    if float(np.random.random(1)) < mutation_rate:
-                        self._weight_matrices[layer][row][col] = (
-                            float(np.random.random(1)) - 0.5
-                        ) * 2.0
+        rng = _default_rng if rng is None else rng
+
+        # Choose each weight to mutate independently, then
+        # replace those with random values between -1 and 1
+        mutated = rng.random(len(self._genome)) < mutation_rate
+        num_mutated = np.count_nonzero(mutated)
+        if num_mutated > 0:
+            self._genome[mutated] = (rng.random(num_mutated) - 0.5) * 2.0
+        self._plan = None
 
     def serialize(self):
         """
@@ -136,33 +213,58 @@ class Neural_Network(object):
         """
         return cls([np.asarray(x) for x in serialized_nn])
 
+    def _set_genome(self, genome, shapes):
+        """
+        Sets the network's genome, and its weight matrices
+        of the provided shapes to views into it.
+        """
+        self._genome = genome
+        self._shapes = tuple(tuple(shape) for shape in shapes)
+        self._weight_matrices = Neural_Network._get_weight_matrices(
+            genome, self._shapes
+        )
+        self._plan = None
+
+    @staticmethod
+    def _get_weight_matrices(genomes, shapes):
+        """
+        Returns a list of views into the genomes (the last axis of the
+        array), one for each weight matrix of the provided shapes.
+        Stacked genomes give a stack of each weight matrix.
+        """
+        weight_matrices = []
+        start = 0
+        for shape in shapes:
+            end = start + shape[0] * shape[1]
+            weight_matrices.append(
+                genomes[..., start:end].reshape(genomes.shape[:-1] + shape)
+            )
+            start = end
+        return weight_matrices
+
     @staticmethod
-    def _random_crossover(matrixA, matrixB):
+    def _random_crossover(genomeA, genomeB, rng):
         """
-        Returns a fully random crossover between the two matrices,
-        where each value in the new matrix is chosen at random from
+        Returns a fully random crossover between the two genomes,
+        where each value in the new genome is chosen at random from
         either of the two parents.
         """
-        if matrixA.shape != matrixB.shape:
+        if genomeA.shape != genomeB.shape:
             raise RuntimeError(
                 "Programmer Error: Attempted crossover "
-                "between matrices with different shapes."
+                "between genomes with different shapes."
             )
 
         # Inherit each value from a parent at random
-        new_matrix = np.zeros(matrixA.shape)
-        for row in range(new_matrix.shape[0]):
-            for col in range(new_matrix.shape[1]):
-                parent = [matrixA, matrixB][np.random.randint(2)]
-                new_matrix[row][col] = parent[row][col]
-        return new_matrix
+        from_parent_a = rng.integers(2, size=genomeA.shape) == 0
+        return np.where(from_parent_a, genomeA, genomeB)
 
     @staticmethod
-    def _split_crossover(matrixA, matrixB):
+    def _split_crossover(matrixA, matrixB, rng, new_matrix):
         """
-        Picks a random point in the matrix, and returns a new
-        matrix such that all values before that point come from
-        parent A, and all other values come from parent B.
+        Picks a random point in the matrix, and fills new_matrix
+        such that all values before that point come from parent A,
+        and all other values come from parent B.
         """
         if matrixA.shape != matrixB.shape:
             raise RuntimeError(
@@ -171,18 +273,171 @@ class Neural_Network(object):
             )
 
         # Pick a random split point
-        new_matrix = np.zeros(matrixA.shape)
-        split_row = np.random.randint(matrixA.shape[0])
-        split_col = np.random.randint(matrixB.shape[0])
+        split_row = rng.integers(matrixA.shape[0])
+        split_col = rng.integers(matrixB.shape[0])
 
         # Inherit all values before that point from
         # first parent, and the rest from the second
-        for row in range(new_matrix.shape[0]):
-            for col in range(new_matrix.shape[1]):
-                parent = (
-                    matrixA
-                    if (row < split_row) and (col < split_col)
-                    else matrixB
-                )
-                new_matrix[row][col] = parent[row][col]
-        return new_matrix
+        new_matrix[:] = matrixB
+        new_matrix[:split_row, :split_col] = matrixA[:split_row, :split_col]
+
+
+class Inference_Plan(object):
+    """
+    Layer plan of a neural network, frozen for the settings in a
+    simulation config. Feeds forward inputs through preallocated
+    buffers (each with a trailing 1 for the bias term) and NumPy
+    ufunc activations, so no arrays are allocated per call.
+
+    The plan itself is never modified once compiled, so can be shared
+    by any games running the network. Each thread feeds forward
+    through its own set of buffers, allocated on its first call.
+
+    The plan reads the network's weight matrices directly (unless
+    converted to float32), so must be recompiled when they change.
+    """
+
+    def __init__(self, weight_matrices, config):
+        dtype = Inference_Plan.get_dtype(config)
+        self.config = config
+        self.key = Inference_Plan.get_key(config)
+        self._activation_fn = get_array_activation_function(
+            config.HIDDEN_LAYER_ACTIVATION_FN
+        )
+        self._threshold = config.OUTPUT_ACTIVATION_THRESHOLD
+
+        # The hidden layers, followed by the output layer
+        layer_weights = weight_matrices[: config.NUM_HIDDEN_LAYERS] + [
+            weight_matrices[-1]
+        ]
+        self._weights = [
+            np.ascontiguousarray(weights, dtype=dtype)
+            for weights in layer_weights
+        ]
+
+        self._dtype = dtype
+        self._thread_buffers = threading.local()
+
+    @staticmethod
+    def get_dtype(config):
+        """
+        Returns the float type networks are run with for the config.
+        """
+        return np.float32 if config.USE_FLOAT32_INFERENCE else np.float64
+
+    @staticmethod
+    def get_key(config):
+        """
+        Returns a tuple of the settings in config a plan is frozen for.
+        """
+        return (
+            config.NUM_HIDDEN_LAYERS,
+            config.HIDDEN_LAYER_ACTIVATION_FN,
+            config.OUTPUT_ACTIVATION_THRESHOLD,
+            config.USE_FLOAT32_INFERENCE,
+        )
+
+    def feed_forward(self, input_values):
+        """
+        Feeds forward the input values through the network, and returns
+        a boolean array of its outputs. The array is reused by the next
+        call, so should be copied if it needs to be kept.
+        """
+        thread_buffers = self._thread_buffers
+        if not hasattr(thread_buffers, "buffers"):
+            self._allocate_buffers(thread_buffers)
+        buffers = thread_buffers.buffers
+        activation_fn = self._activation_fn
+        weights = self._weights
+        thread_buffers.inputs[:] = input_values
+
+        # Compute the outputs of each hidden layer, and send them through
+        # the activation function in place, as the next layer's inputs
+        for i, hidden_outputs in enumerate(thread_buffers.hidden_outputs):
+            np.dot(buffers[i], weights[i], out=hidden_outputs)
+            activation_fn(hidden_outputs, hidden_outputs)
+
+        # Compute the final outputs, thresholded to either True or False
+        raw_outputs = thread_buffers.raw_outputs
+        np.dot(buffers[-1], weights[-1], out=raw_outputs)
+        return threshold_activation_array(
+            raw_outputs, self._threshold, thread_buffers.outputs
+        )
+
+    def _allocate_buffers(self, thread_buffers):
+        """
+        Allocates the buffers feed_forward uses as attributes
+        of thread_buffers (the current thread's local storage).
+        """
+        dtype = self._dtype
+
+        # Each layer's inputs (+ the bias term of 1) are the previous
+        # layer's outputs, so each layer writes into the next's buffer
+        buffers = [
+            np.ones(weights.shape[0], dtype=dtype) for weights in self._weights
+        ]
+        thread_buffers.inputs = buffers[0][:-1]
+        thread_buffers.hidden_outputs = [buffer[:-1] for buffer in buffers[1:]]
+        thread_buffers.raw_outputs = np.empty(
+            self._weights[-1].shape[1], dtype=dtype
+        )
+        thread_buffers.outputs = np.empty(
+            len(thread_buffers.raw_outputs), dtype=bool
+        )
+        thread_buffers.buffers = buffers
+
+
+class Batch_Inference_Plan(object):
+    """
+    Layer plan for feeding forward through a batch of networks of the
+    same shape at once, made from their inference plans. Each layer's
+    weight matrices are stacked once, when the plan is compiled, so
+    every network's outputs for the layer take one matmul.
+
+    Like an Inference_Plan, the plan is never modified once compiled.
+    """
+
+    def __init__(self, plans, config):
+        self._plans = plans
+        self._activation_fn = get_array_activation_function(
+            config.HIDDEN_LAYER_ACTIVATION_FN
+        )
+        self._threshold = config.OUTPUT_ACTIVATION_THRESHOLD
+        self._dtype = Inference_Plan.get_dtype(config)
+        self._weights = [
+            np.stack([plan._weights[i] for plan in plans])
+            for i in range(len(plans[0]._weights))
+        ]
+
+    def is_compiled_from(self, plans):
+        """
+        Returns whether the batch plan was compiled from the provided
+        inference plans, in the same order.
+        """
+        return len(plans) == len(self._plans) and all(
+            plan is own_plan for (plan, own_plan) in zip(plans, self._plans)
+        )
+
+    def feed_forward(self, input_values):
+        """
+        Feeds forward each row of input values through the corresponding
+        network, and returns a boolean matrix with each network's outputs
+        as its rows, matching what its Inference_Plan would return.
+        """
+        curr_inputs = np.asarray(input_values, dtype=self._dtype)
+        bias = np.ones((len(self._plans), 1), dtype=self._dtype)
+        for weights in self._weights[:-1]:
+            inputs_with_bias = np.hstack((curr_inputs, bias))
+            curr_outputs = np.matmul(
+                inputs_with_bias[:, np.newaxis, :], weights
+            )[:, 0, :]
+            curr_inputs = self._activation_fn(curr_outputs, curr_outputs)
+
+        # Compute the final outputs, thresholded to either True or False
+        inputs_with_bias = np.hstack((curr_inputs, bias))
+        raw_outputs = np.matmul(
+            inputs_with_bias[:, np.newaxis, :], self._weights[-1]
+        )
+        return threshold_activation_array(
+            raw_outputs[:, 0, :], self._threshold, None
+        )
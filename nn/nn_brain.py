@@ -1,12 +1,38 @@
+from __future__ import print_function
+
 import json
 import os
+import struct
+import threading
+
+import numpy as np
 
 from ai.ai_brain import AI_Brain
 from ai.ai_player import AI_Player
-from ai.sensor import sense_n_dir
+from ai.sensor import sense_all_by_sensor_id, sense_by_sensor_id
 from nn.neural_network import Neural_Network
 from settings import get_settings
 
+# Identifies binary brain files, and the version of their format
+BRAIN_FILE_MAGIC = b"ABRN"
+BRAIN_FILE_VERSION = 1
+
+# Binary brain file header: magic, version, weight type code,
+# number of weight matrices, fitness
+_brain_header = struct.Struct("<4sBBHd")
+
+# Shape (rows, columns) of each weight matrix, following the header.
+# The weights themselves follow the shapes, as one flat array.
+_brain_shape = struct.Struct("<II")
+
+# Types the weights of binary brain files can be stored as
+# (indexed by the header's weight type code)
+_brain_weight_types = [np.dtype("<f8"), np.dtype("<f4")]
+
+# Each thread's batch inference plans from its last lockstep frame,
+# by network shape, reused on later frames while still valid
+_thread_local = threading.local()
+
 
 class NN_Brain(AI_Brain):
     """
@@ -23,54 +49,176 @@ class NN_Brain(AI_Brain):
                 settings.NUM_SENSOR_REGIONS, AI_Player.DECISION_VECTOR_SIZE
             )
 
-    def sense(self, player, asteroids, bullets):
+    def sense(self, player, asteroids, bullets, config):
         """
-        Checks the state of the world, and returns a feature
-        matrix to be used as input to the AI update function.
+        Checks the state of the world with the sensor selected in
+        settings, and returns a feature matrix to be used as input
+        to the AI update function.
         """
-        settings = get_settings()
-        return sense_n_dir(
-            settings.NUM_SENSOR_REGIONS,
-            player,
-            asteroids,
-            settings.MAX_SENSOR_DISTANCE,
-            shape=settings.SENSOR_OUTPUT_SHAPE,
-        )
+        return sense_by_sensor_id(player, asteroids, config)
 
-    def think(self, player, bullets, sensor_data):
+    @classmethod
+    def sense_all(cls, ai_brains, players, asteroids, bullets, config):
+        """
+        Checks the state of each of the AI brains' players' games with
+        the sensor selected in settings, sensing for all of them at once
+        if possible, and returns a list of their feature matrices.
+        """
+        return sense_all_by_sensor_id(players, asteroids, config)
+
+    def think(self, player, bullets, sensor_data, config):
         """
         Runs the AI algorithm on sensor_data and
         outputs a decision vector in response.
         """
-        return [bool(x) for x in self.network.get_output(sensor_data)]
+        return self.network.get_decisions(sensor_data, config)
+
+    @classmethod
+    def think_all(cls, ai_brains, players, bullets, sensor_data, config):
+        """
+        Runs the AI algorithm on the sensor data of each of the AI brains,
+        evaluating all of their networks of the same structure together,
+        and outputs a list of their decision vectors in response.
+
+        The batch plans the networks are evaluated with are kept for the
+        next call, so their weights are only stacked again once the
+        batch's networks change (e.g. when one of their games ends).
+        """
+        groups = {}
+        for i, ai_brain in enumerate(ai_brains):
+            groups.setdefault(ai_brain.network.get_shape(), []).append(i)
 
-    def crossover(self, other_brain):
+        if not hasattr(_thread_local, "batch_plans"):
+            _thread_local.batch_plans = {}
+        batch_plans = _thread_local.batch_plans
+        decision_vectors = [None] * len(ai_brains)
+        for shape, indices in groups.items():
+            batch_plan = Neural_Network.compile_all(
+                [ai_brains[i].network for i in indices],
+                config,
+                batch_plan=batch_plans.get(shape),
+            )
+            batch_plans[shape] = batch_plan
+            outputs = batch_plan.feed_forward(
+                [sensor_data[i] for i in indices]
+            )
+            for i, row in zip(indices, outputs.tolist()):
+                decision_vectors[i] = row
+        return decision_vectors
+
+    def crossover(self, other_brain, rng=None):
         """
         Combines the network of this AI brain with that of the
         other, exchanging network weights and or structure, and
         returns a new AI brain with the resultant combined network.
+        Random choices are drawn from rng (a NumPy Generator) if
+        provided.
         """
-        return NN_Brain(self.network.crossover(other_brain.network))
+        return NN_Brain(self.network.crossover(other_brain.network, rng))
 
-    def mutate(self, mutation_rate):
+    def mutate(self, mutation_rate, rng=None):
         """
-        Mutates the network at the specified rate.
+        Mutates the network at the specified rate. Random
+        values are drawn from rng (a NumPy Generator) if provided.
         """
-        self.network.mutate(mutation_rate)
+        self.network.mutate(mutation_rate, rng)
 
-    def save(self, filename):
+    def save(self, filename, use_json=False, weight_type=np.float64):
         """
-        Saves this AI brain to the specified file.
+        Saves this AI brain to the specified file, in the binary brain
+        format with weights of the provided type (float64 or float32),
+        or in the JSON format if use_json is set.
+
+        The file is replaced rather than overwritten, so any brains
+        loaded from (and memory mapped to) it are unaffected.
         """
-        with open(filename, "w") as save_file:
-            serialized_nn = self.network.serialize()
-            save_data = {"Fitness": self.fitness, "Network": serialized_nn}
-            json.dump(save_data, save_file)
+        temp_filename = filename + ".tmp"
+        if use_json:
+            with open(temp_filename, "w") as save_file:
+                serialized_nn = self.network.serialize()
+                save_data = {"Fitness": self.fitness, "Network": serialized_nn}
+                json.dump(save_data, save_file)
+        else:
+            weight_type = np.dtype(weight_type).newbyteorder("<")
+            if weight_type not in _brain_weight_types:
+                raise ValueError(
+                    "Unsupported brain weight type '%s'." % weight_type
+                )
+            shapes = self.network.get_shape()
+            with open(temp_filename, "wb") as save_file:
+                save_file.write(
+                    _brain_header.pack(
+                        BRAIN_FILE_MAGIC,
+                        BRAIN_FILE_VERSION,
+                        _brain_weight_types.index(weight_type),
+                        len(shapes),
+                        self.fitness,
+                    )
+                )
+                for shape in shapes:
+                    save_file.write(_brain_shape.pack(*shape))
+                genome = self.network.get_genome()
+                save_file.write(genome.astype(weight_type, copy=False).data)
+        os.replace(temp_filename, filename)
 
     @classmethod
     def load(cls, filename):
         """
-        Loads the AI brain from the specified file and returns it.
+        Loads the AI brain from the specified file and returns it,
+        detecting whether the file is in the binary or JSON format.
+
+        The weights of binary brains stored as float64 are memory
+        mapped (copy-on-write), rather than read into memory.
+        """
+        with open(filename, "rb") as load_file:
+            header = load_file.read(_brain_header.size)
+            if not header.startswith(BRAIN_FILE_MAGIC):
+                return cls._load_json(filename)
+            if len(header) < _brain_header.size:
+                raise ValueError("Brain file '%s' is truncated." % filename)
+            (magic, version, weight_type_code, num_shapes, fitness) = (
+                _brain_header.unpack(header)
+            )
+            if version != BRAIN_FILE_VERSION:
+                raise ValueError(
+                    "Brain file '%s' has unsupported version '%d'."
+                    % (filename, version)
+                )
+            if weight_type_code >= len(_brain_weight_types):
+                raise ValueError(
+                    "Brain file '%s' has unsupported weight type '%d'."
+                    % (filename, weight_type_code)
+                )
+            shapes_data = load_file.read(num_shapes * _brain_shape.size)
+            if len(shapes_data) < num_shapes * _brain_shape.size:
+                raise ValueError("Brain file '%s' is truncated." % filename)
+            shapes = list(_brain_shape.iter_unpack(shapes_data))
+
+        # Map the weights that follow the shapes as the network's genome
+        weight_type = _brain_weight_types[weight_type_code]
+        offset = _brain_header.size + len(shapes_data)
+        num_weights = sum(rows * cols for (rows, cols) in shapes)
+        if os.path.getsize(filename) != (
+            offset + num_weights * weight_type.itemsize
+        ):
+            raise ValueError("Brain file '%s' is truncated." % filename)
+        genome = np.memmap(
+            filename,
+            dtype=weight_type,
+            mode="c",
+            offset=offset,
+            shape=(num_weights,),
+        )
+        if weight_type != np.float64:
+            genome = genome.astype(np.float64)
+        loaded_brain = cls(Neural_Network.from_genome(genome, shapes))
+        loaded_brain.fitness = fitness
+        return loaded_brain
+
+    @classmethod
+    def _load_json(cls, filename):
+        """
+        Loads the AI brain from the specified JSON file and returns it.
         """
         with open(filename, "r") as load_file:
             load_data = json.load(load_file)
@@ -78,3 +226,18 @@ class NN_Brain(AI_Brain):
             loaded_brain = cls(Neural_Network.deserialize(serialized_nn))
             loaded_brain.fitness = load_data["Fitness"]
             return loaded_brain
+
+
+def convert_brain_files(filenames, use_json=False, weight_type=np.float64):
+    """
+    Converts each of the NN brain files, in place, to the binary brain
+    format with weights of the provided type (or the JSON format, if
+    use_json is set).
+    """
+    for filename in filenames:
+        ai_brain = NN_Brain.load(filename)
+        ai_brain.save(filename, use_json, weight_type)
+        print(
+            "Converted '%s' (%d weights)."
+            % (filename, len(ai_brain.network.get_genome()))
+        )
@@ -1,11 +1,30 @@
+import copy
 import os
+import struct
 
 import numpy as np
 
 from ai.generation import Generation
+from nn.neural_network import Neural_Network
 from nn.nn_brain import NN_Brain
 from settings import get_settings
 
+# Name of the file a generation's brains are saved to together
+POPULATION_FILENAME = "_population.pop"
+
+# Identifies population files, and the version of their format
+POPULATION_FILE_MAGIC = b"APOP"
+POPULATION_FILE_VERSION = 1
+
+# Population file header: magic, version, number of brains,
+# number of weight matrices (in each brain's network)
+_population_header = struct.Struct("<4sBxxxII")
+
+# Shape (rows, columns) of each weight matrix, following the header.
+# The brains' fitnesses follow the shapes, as one array of float64s,
+# then their genomes, as one (brains x weights) array of float64s.
+_population_shape = struct.Struct("<II")
+
 
 class NN_Generation(Generation):
     """
@@ -27,6 +46,7 @@ class NN_Generation(Generation):
         according to their fitness, and returns the new generation.
         """
         settings = get_settings()
+        rng = np.random.default_rng()
         new_brains = []
         num_brains = len(self._brains)
 
@@ -40,8 +60,7 @@ class NN_Generation(Generation):
         # Choose a single brain for each fitness value to represent that bucket
         sorted_fitnesses = sorted(brain_buckets.keys(), reverse=True)
         sorted_brains = [
-            np.random.choice(brain_buckets[fitness])
-            for fitness in sorted_fitnesses
+            rng.choice(brain_buckets[fitness]) for fitness in sorted_fitnesses
         ]
 
         # Choose the best brains of this generation to survive into the next
@@ -54,19 +73,15 @@ class NN_Generation(Generation):
         survivor_fitnesses = np.array([x.fitness for x in survivors])
         survivor_probs = survivor_fitnesses / float(survivor_fitnesses.sum())
         for i in range(num_survivor_children):
-            parents = np.random.choice(
-                survivors, 2, replace=False, p=survivor_probs
-            )
-            new_brains.append(parents[0].crossover(parents[1]))
+            parents = rng.choice(survivors, 2, replace=False, p=survivor_probs)
+            new_brains.append(parents[0].crossover(parents[1], rng))
 
         # Breed the remaining population from the entire previous generation
         num_remaining_children = num_brains - len(new_brains)
         all_probs = np.array(sorted_fitnesses) / sum(sorted_fitnesses)
         for i in range(num_remaining_children):
-            parents = np.random.choice(
-                sorted_brains, 2, replace=False, p=all_probs
-            )
-            new_brains.append(parents[0].crossover(parents[1]))
+            parents = rng.choice(sorted_brains, 2, replace=False, p=all_probs)
+            new_brains.append(parents[0].crossover(parents[1], rng))
 
         # Determine the number of champions in the previous generation
         if settings.CHAMPION_SELECTION_SCHEME == settings.STATIC:
@@ -78,17 +93,100 @@ class NN_Generation(Generation):
                 if survivor_fitnesses[num_champions] < threshold:
                     break
 
-        # Mutate all members of the new generation,
-        # except the previous generation's champion(s)
-        map(
-            lambda x: x.mutate(settings.MUTATION_RATE),
-            new_brains[num_champions:],
-        )
+        # Mutate all members of the new generation, except the previous
+        # generation's champion(s). Survivors still belong to the previous
+        # generation, so copies of them are mutated instead.
+        for i in range(num_champions, len(new_brains)):
+            if i < num_survivors:
+                new_brains[i] = copy.deepcopy(new_brains[i])
+            new_brains[i].mutate(settings.MUTATION_RATE, rng)
 
         return NN_Generation(
             self._generation_number + 1, self._apps, brains=new_brains
         )
 
+    @classmethod
+    def load_brains(cls, dirname):
+        """
+        Loads the brains saved in the specified generation directory,
+        from its population file with a single read, and returns them
+        as a list. Directories saved with each brain in its own file
+        (before population files) are loaded from those instead.
+        """
+        filename = os.path.join(dirname, POPULATION_FILENAME)
+        if not os.path.exists(filename):
+            return super(NN_Generation, cls).load_brains(dirname)
+        data = bytearray(os.path.getsize(filename))
+        with open(filename, "rb") as load_file:
+            load_file.readinto(data)
+
+        # Read the header and shapes
+        if len(data) < _population_header.size:
+            raise ValueError("'%s' is not a population file." % filename)
+        (magic, version, num_brains, num_shapes) = (
+            _population_header.unpack_from(data)
+        )
+        if magic != POPULATION_FILE_MAGIC:
+            raise ValueError("'%s' is not a population file." % filename)
+        if version != POPULATION_FILE_VERSION:
+            raise ValueError(
+                "Population file '%s' has unsupported version '%d'."
+                % (filename, version)
+            )
+        offset = _population_header.size
+        shapes_size = num_shapes * _population_shape.size
+        shapes = list(
+            _population_shape.iter_unpack(data[offset : offset + shapes_size])
+        )
+        offset += shapes_size
+        num_weights = sum(rows * cols for (rows, cols) in shapes)
+        if len(data) != offset + 8 * num_brains * (1 + num_weights):
+            raise ValueError("Population file '%s' is truncated." % filename)
+
+        # Each brain's genome is a view into the file's data
+        fitnesses = np.frombuffer(data, "<f8", num_brains, offset)
+        offset += fitnesses.nbytes
+        genomes = np.frombuffer(
+            data, "<f8", num_brains * num_weights, offset
+        ).reshape(num_brains, num_weights)
+        brains = []
+        for fitness, genome in zip(fitnesses.tolist(), genomes):
+            brain = NN_Brain(Neural_Network.from_genome(genome, shapes))
+            brain.fitness = fitness
+            brains.append(brain)
+        return brains
+
+    def _save_brains(self, dirname):
+        """
+        Saves all of this generation's brains to the specified
+        directory together, as a single population file.
+        """
+        shapes = self._brains[0].network.get_shape()
+        if any(brain.network.get_shape() != shapes for brain in self._brains):
+            super(NN_Generation, self)._save_brains(dirname)
+            return
+        fitnesses = np.array(
+            [brain.fitness for brain in self._brains], dtype="<f8"
+        )
+        genomes = np.stack(
+            [brain.network.get_genome() for brain in self._brains]
+        ).astype("<f8", copy=False)
+        filename = os.path.join(dirname, POPULATION_FILENAME)
+        with open(filename, "wb") as save_file:
+            save_file.write(
+                _population_header.pack(
+                    POPULATION_FILE_MAGIC,
+                    POPULATION_FILE_VERSION,
+                    len(self._brains),
+                    len(shapes),
+                )
+            )
+            save_file.write(
+                b"".join(_population_shape.pack(*shape) for shape in shapes)
+            )
+            save_file.write(fitnesses.data)
+            save_file.write(genomes.data)
+
     @staticmethod
     def load_brain(filename):
         """
@@ -6,6 +6,7 @@ import json
 import multiprocessing
 import os
 import sys
+from collections import namedtuple
 
 import click
 
@@ -36,7 +37,11 @@ class Settings:
     PERFORMANCE = "performance"
 
     # Sensor IDs
+    # N-Direction - nearest asteroid in each of n angle regions
+    # Ray Cast - nearest asteroid along each of n rays, marched over
+    #   an occupancy grid of the asteroids
     NDIR = "ndir"
+    RAYCAST = "raycast"
 
     # Sensor Output Shapes
     LINEAR = "linear"
@@ -52,6 +57,23 @@ class Settings:
     RANDOM = "random"
     SPLIT = "split"
 
+    # Simulation Engines
+    # Object - each game component is a separate Python object
+    # Array - component state is kept in NumPy arrays (headless only),
+    #   which mostly pays off in Batch: a lone game runs about as fast
+    #   on the Object engine
+    # Batch - like Array, but all of a worker's simulations run in
+    #   lockstep, sharing the same arrays (headless only)
+    OBJECT = "object"
+    ARRAY = "array"
+    BATCH = "batch"
+
+    # Render Frame Formats
+    # PNG - a numbered PNG image for each frame
+    # Raw - a single file of every frame's raw RGB24 pixels
+    PNG = "png"
+    RAW = "raw"
+
     def __init__(self):
         """
         Initialize settings with sane defaults
@@ -73,6 +95,13 @@ class Settings:
         # Path to the AI brain to use when playing the game
         self.GAME_AI_BRAIN = os.path.join("experiments", "simple", "_best.brn")
 
+        # Path to a replay to play back (instead of running
+        # GAME_AI_BRAIN) when AI is playing the game, if any
+        self.GAME_REPLAY = None
+
+        # Format to write frames in when rendering games offline
+        self.RENDER_FRAME_FORMAT = Settings.PNG
+
         # Path to the directory used by the experiment:
         # If the directory contains the work of a previous experiment,
         # it will be continued; otherwise a new experiment is started
@@ -112,6 +141,24 @@ class Settings:
         # Number of simulations to run when determining fitness
         self.NUM_EVALUATION_SIMULATIONS = 1
 
+        # Which engine to use when running headless simulations
+        self.SIMULATION_ENGINE = Settings.OBJECT
+
+        # Number of frames of game time each simulation step covers:
+        # Bigger timesteps need fewer steps (and AI decisions) per game,
+        # at the cost of some accuracy (only supported by the object engine)
+        self.SIMULATION_TIMESTEP = 1
+
+        # Maximum number of frames to run each simulation for,
+        # before stopping it early and marking it as truncated
+        # (0 means no limit)
+        self.MAX_SIMULATION_FRAMES = 0
+
+        # Maximum time (in seconds) to run each simulation for,
+        # before stopping it early and marking it as truncated
+        # (0 means no limit)
+        self.MAX_SIMULATION_TIME = 0.0
+
         # Weights of each variable in the fitness function
         self.FITNESS_SCORE_WEIGHT = 1.0
         self.FITNESS_RUN_TIME_WEIGHT = 5.0 / 60.0
@@ -137,8 +184,13 @@ class Settings:
         self.MAX_SENSOR_DISTANCE = 400
 
         # Number of angle regions to divide the sensor space into
+        # (or, for the ray cast sensor, the number of rays to cast)
         self.NUM_SENSOR_REGIONS = 8
 
+        # Size (in pixels) of the cells of the occupancy grid used by the
+        # ray cast sensor, and of the steps its rays march in
+        self.SENSOR_GRID_CELL_SIZE = 20
+
         ##################################################
         #             NEURAL NETWORK SETTINGS
         ##################################################
@@ -155,6 +207,11 @@ class Settings:
         # Threshold value for activation in the output layer
         self.OUTPUT_ACTIVATION_THRESHOLD = 0.8
 
+        # Whether to run the networks with single (instead of double)
+        # precision floats, which can be faster for large hidden layers,
+        # but may change decisions whose outputs are near the threshold
+        self.USE_FLOAT32_INFERENCE = False
+
         # Crossover mechanism to use
         self.CROSSOVER_MECHANISM = Settings.SPLIT
 
@@ -226,6 +283,10 @@ class Settings:
         # Whether to play sound effects
         self.PLAY_SFX = True
 
+        # Number of game steps simulated per rendered frame
+        # in AI Spectator mode (1 means normal speed)
+        self.SPECTATOR_SPEED = 1
+
     def validate_and_set_dependents(self):
         """
         Sets any settings that are derived from other settings,
@@ -245,6 +306,25 @@ class Settings:
                 "less than 2 members will survive each generation"
             ).format(self.GENERATION_POPULATION, self.GENERATION_SURVIVOR_RATE)
             raise ValueError(msg)
+        if self.SIMULATION_TIMESTEP < 1:
+            msg = "SIMULATION_TIMESTEP must be at least 1, not {}".format(
+                self.SIMULATION_TIMESTEP
+            )
+            raise ValueError(msg)
+        if (
+            self.SIMULATION_TIMESTEP != 1
+            and self.SIMULATION_ENGINE != Settings.OBJECT
+        ):
+            msg = (
+                "SIMULATION_TIMESTEP is set to {}, but only the {} "
+                "simulation engine supports timesteps other than 1"
+            ).format(self.SIMULATION_TIMESTEP, Settings.OBJECT)
+            raise ValueError(msg)
+        if self.SENSOR_GRID_CELL_SIZE <= 0:
+            msg = "SENSOR_GRID_CELL_SIZE must be positive, not {}".format(
+                self.SENSOR_GRID_CELL_SIZE
+            )
+            raise ValueError(msg)
         if (
             self.RUN_MODE == Settings.EXPERIMENT
             and self.USE_PREDETERMINED_SEEDS
@@ -259,6 +339,57 @@ class Settings:
             raise ValueError(msg)
 
 
+class Simulation_Config(
+    namedtuple(
+        "Simulation_Config",
+        [
+            # Settings used by the game loop, sensors and networks
+            "WIDTH",
+            "HEIGHT",
+            "SCREEN_EDGE_THICKNESS",
+            "MIN_SPAWN_EDGE_DISTANCE",
+            "SPAWN_PERIOD_DEC",
+            "MIN_SPAWN_PERIOD",
+            "ALWAYS_BOOSTING",
+            "DISABLE_BOOSTING",
+            "DISABLE_SHOOTING",
+            "DEBUG_MODE",
+            "SOUNDS_ENABLED",
+            "SIMULATION_TIMESTEP",
+            "SENSOR_ID",
+            "NUM_SENSOR_REGIONS",
+            "MAX_SENSOR_DISTANCE",
+            "SENSOR_OUTPUT_SHAPE",
+            "SENSOR_GRID_CELL_SIZE",
+            "NUM_HIDDEN_LAYERS",
+            "HIDDEN_LAYER_ACTIVATION_FN",
+            "OUTPUT_ACTIVATION_THRESHOLD",
+            "USE_FLOAT32_INFERENCE",
+            # Values derived from the settings
+            "MIN_X",
+            "MIN_Y",
+            "MAX_X",
+            "MAX_Y",
+            "LOOPED_WIDTH",
+            "LOOPED_HEIGHT",
+            "HALF_LOOPED_WIDTH",
+            "HALF_LOOPED_HEIGHT",
+            "SFX_ENABLED",
+        ],
+    )
+):
+    """
+    Immutable snapshot of the settings used every frame of a game,
+    along with values precomputed from them.
+
+    Created once per game (see get_simulation_config), and passed to
+    the game components, sensors and networks, so that they don't need
+    to look up the settings (or recompute values from them) every call.
+    """
+
+    __slots__ = ()
+
+
 ##################################################
 #        SETTINGS MODULE PUBLIC INTERFACE
 ##################################################
@@ -282,6 +413,48 @@ def get_settings():
     return _SETTINGS_INSTANCE
 
 
+def get_simulation_config():
+    """
+    Returns a new Simulation_Config, containing
+    the current values of the singleton's settings.
+    """
+    settings = get_settings()
+    looped_width = settings.WIDTH + (2.0 * settings.SCREEN_EDGE_THICKNESS)
+    looped_height = settings.HEIGHT + (2.0 * settings.SCREEN_EDGE_THICKNESS)
+    return Simulation_Config(
+        WIDTH=settings.WIDTH,
+        HEIGHT=settings.HEIGHT,
+        SCREEN_EDGE_THICKNESS=settings.SCREEN_EDGE_THICKNESS,
+        MIN_SPAWN_EDGE_DISTANCE=settings.MIN_SPAWN_EDGE_DISTANCE,
+        SPAWN_PERIOD_DEC=settings.SPAWN_PERIOD_DEC,
+        MIN_SPAWN_PERIOD=settings.MIN_SPAWN_PERIOD,
+        ALWAYS_BOOSTING=settings.ALWAYS_BOOSTING,
+        DISABLE_BOOSTING=settings.DISABLE_BOOSTING,
+        DISABLE_SHOOTING=settings.DISABLE_SHOOTING,
+        DEBUG_MODE=settings.DEBUG_MODE,
+        SOUNDS_ENABLED=settings.SOUNDS_ENABLED,
+        SIMULATION_TIMESTEP=settings.SIMULATION_TIMESTEP,
+        SENSOR_ID=settings.SENSOR_ID,
+        NUM_SENSOR_REGIONS=settings.NUM_SENSOR_REGIONS,
+        MAX_SENSOR_DISTANCE=settings.MAX_SENSOR_DISTANCE,
+        SENSOR_OUTPUT_SHAPE=settings.SENSOR_OUTPUT_SHAPE,
+        SENSOR_GRID_CELL_SIZE=settings.SENSOR_GRID_CELL_SIZE,
+        NUM_HIDDEN_LAYERS=settings.NUM_HIDDEN_LAYERS,
+        HIDDEN_LAYER_ACTIVATION_FN=settings.HIDDEN_LAYER_ACTIVATION_FN,
+        OUTPUT_ACTIVATION_THRESHOLD=settings.OUTPUT_ACTIVATION_THRESHOLD,
+        USE_FLOAT32_INFERENCE=settings.USE_FLOAT32_INFERENCE,
+        MIN_X=-settings.SCREEN_EDGE_THICKNESS,
+        MIN_Y=-settings.SCREEN_EDGE_THICKNESS,
+        MAX_X=settings.WIDTH + settings.SCREEN_EDGE_THICKNESS,
+        MAX_Y=settings.HEIGHT + settings.SCREEN_EDGE_THICKNESS,
+        LOOPED_WIDTH=looped_width,
+        LOOPED_HEIGHT=looped_height,
+        HALF_LOOPED_WIDTH=looped_width / 2.0,
+        HALF_LOOPED_HEIGHT=looped_height / 2.0,
+        SFX_ENABLED=settings.SOUNDS_ENABLED and settings.PLAY_SFX,
+    )
+
+
 def load_settings_from_settings(settings_obj):
     """
     Loads settings from another settings object.
@@ -392,6 +565,18 @@ def load_settings_from_json(json_filepath):
     default=None,
     help="Path to AI brain to use when playing the game.",
 )
+@click.option(
+    "--game-replay",
+    type=click.Path(exists=True),
+    default=None,
+    help="Path to a replay to play back instead of the AI brain.",
+)
+@click.option(
+    "--render-frame-format",
+    type=click.Choice([Settings.PNG, Settings.RAW]),
+    default=None,
+    help="Format to write frames in when rendering games offline.",
+)
 @click.option(
     "--num-threads",
     type=int,
@@ -446,6 +631,30 @@ def load_settings_from_json(json_filepath):
     default=None,
     help="Number of simulations to run during evaluation.",
 )
+@click.option(
+    "--simulation-engine",
+    type=click.Choice([Settings.OBJECT, Settings.ARRAY, Settings.BATCH]),
+    default=None,
+    help="Engine to use when running headless simulations.",
+)
+@click.option(
+    "--simulation-timestep",
+    type=int,
+    default=None,
+    help="Number of frames of game time each simulation step covers.",
+)
+@click.option(
+    "--max-simulation-frames",
+    type=int,
+    default=None,
+    help="Max # frames to run each simulation for (0 means no limit).",
+)
+@click.option(
+    "--max-simulation-time",
+    type=float,
+    default=None,
+    help="Max seconds to run each simulation for (0 means no limit).",
+)
 @click.option(
     "--fitness-score-weight",
     type=float,
@@ -484,7 +693,7 @@ def load_settings_from_json(json_filepath):
 )
 @click.option(
     "--sensor-id",
-    type=click.Choice([Settings.NDIR]),
+    type=click.Choice([Settings.NDIR, Settings.RAYCAST]),
     default=None,
     help="Which sensor to use.",
 )
@@ -506,6 +715,12 @@ def load_settings_from_json(json_filepath):
     default=None,
     help="Number of sensor angle regions to use.",
 )
+@click.option(
+    "--sensor-grid-cell-size",
+    type=int,
+    default=None,
+    help="Size of the ray cast sensor's occupancy grid cells.",
+)
 @click.option(
     "--num-hidden-layers",
     type=int,
@@ -532,6 +747,12 @@ def load_settings_from_json(json_filepath):
     default=None,
     help="Activation threshold value for output layer.",
 )
+@click.option(
+    "--use-float32-inference",
+    type=click.Choice(["true", "false"]),
+    default=None,
+    help="Whether to run the networks with single precision floats.",
+)
 @click.option(
     "--crossover-mechanism",
     type=click.Choice([Settings.RANDOM, Settings.SPLIT]),
@@ -10,14 +10,14 @@ class Simple_Brain(AI_Brain):
     def __init__(self):
         super(Simple_Brain, self).__init__()
 
-    def sense(self, player, asteroids, bullets):
+    def sense(self, player, asteroids, bullets, config):
         """
         Checks the state of the world, and returns a feature
         matrix to be used as input to the AI update function.
         """
-        return sense_n_dir(0, player, asteroids, 0)
+        return sense_n_dir(0, player, asteroids, 0, config)
 
-    def think(self, player, bullets, sensor_data):
+    def think(self, player, bullets, sensor_data, config):
         """
         Runs the AI algorithm on sensor_data and
         outputs a decision vector in response.
@@ -26,7 +26,7 @@ class Simple_Brain(AI_Brain):
         """
         return [True, False, True, True]
 
-    def crossover(self, other_brain):
+    def crossover(self, other_brain, rng=None):
         """
         Combines the network of this AI brain with that of the
         other, exchanging network weights and or structure, and
@@ -37,7 +37,7 @@ class Simple_Brain(AI_Brain):
         """
         return Simple_Brain()
 
-    def mutate(self, mutation_rate):
+    def mutate(self, mutation_rate, rng=None):
         """
         Mutates the network at the specified rate.
 
@@ -6,6 +6,8 @@ Usage: python start.py [--help]
 
 from ai.ai_app import AI_App
 from ai.experiment import run_experiment
+from ai.replay import Replay
+from ai.replay_app import Replay_App
 from ai.utils import algorithm_id_to_ai_brain_class
 from asteroids.app import App
 from settings import get_settings, load_settings_from_cli
@@ -25,6 +27,8 @@ if __name__ == "__main__":
 
         if settings.PLAYER_MODE == settings.HUMAN:
             App().start_game(seed=seed)
+        elif settings.GAME_REPLAY is not None:
+            Replay_App().start_game(Replay.load(settings.GAME_REPLAY))
         else:
             ai_brain_class = algorithm_id_to_ai_brain_class(
                 settings.ALGORITHM_ID
@@ -0,0 +1,90 @@
+"""
+Tests that the object, array and batch simulation engines play
+out the same seeded games exactly alike.
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+from ai.ai_app import AI_App
+from nn.nn_brain import NN_Brain
+from settings import Settings, load_settings_from_dict
+from simple.simple_brain import Simple_Brain
+
+# Trained brain simulated by the tests
+BRAIN_FILENAME = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "examples",
+    "nn-spin-shoot",
+    "example.brn",
+)
+
+# Seeds of the games to simulate with each brain
+SEEDS = list(range(6))
+
+# Number of new (random) NN brains to simulate, and the
+# NumPy seed they're created with, as well as the trained one
+NUM_RANDOM_BRAINS = 2
+RANDOM_BRAINS_SEED = 0
+
+
+class Engine_Parity_Test(unittest.TestCase):
+    """
+    Simulates seeded games of several brains on each engine,
+    and checks the fitnesses are identical.
+    """
+
+    def _load_brains(self):
+        np.random.seed(RANDOM_BRAINS_SEED)
+        brains = [NN_Brain.load(BRAIN_FILENAME), Simple_Brain()]
+        brains.extend(NN_Brain() for i in range(NUM_RANDOM_BRAINS))
+        return brains
+
+    def _get_fitnesses(self, simulation_engine, sensor_id):
+        """
+        Returns the fitness of each brain's game with each seed.
+        """
+        load_settings_from_dict(
+            {
+                "SOUNDS_ENABLED": False,
+                "SIMULATION_ENGINE": simulation_engine,
+                "SENSOR_ID": sensor_id,
+            }
+        )
+        brains = self._load_brains()
+        app = AI_App(use_ui=False)
+        if simulation_engine == Settings.BATCH:
+            results = app.run_simulations(brains, SEEDS)
+            for brain_results in results:
+                self.assertFalse(
+                    any(truncated for (_, truncated) in brain_results)
+                )
+            return [
+                [fitness for (fitness, _) in brain_results]
+                for brain_results in results
+            ]
+        return [
+            [app.run_simulation(brain, seed=seed) for seed in SEEDS]
+            for brain in brains
+        ]
+
+    def _check_engines_match(self, sensor_id):
+        expected_fitnesses = self._get_fitnesses(Settings.OBJECT, sensor_id)
+        for simulation_engine in [Settings.ARRAY, Settings.BATCH]:
+            self.assertEqual(
+                self._get_fitnesses(simulation_engine, sensor_id),
+                expected_fitnesses,
+                "'%s' engine" % simulation_engine,
+            )
+
+    def test_ndir_sensor(self):
+        self._check_engines_match(Settings.NDIR)
+
+    def test_raycast_sensor(self):
+        self._check_engines_match(Settings.RAYCAST)
+
+
+if __name__ == "__main__":
+    unittest.main()
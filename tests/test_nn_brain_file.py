@@ -0,0 +1,149 @@
+"""
+Tests that NN brains survive saving and loading, in both the binary
+and JSON brain file formats.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+from nn.nn_brain import BRAIN_FILE_VERSION, NN_Brain, convert_brain_files
+from settings import load_settings_from_dict
+
+# Legacy (JSON format) brain included with the examples
+EXAMPLE_BRAIN_FILENAME = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "examples",
+    "nn-spin-shoot",
+    "example.brn",
+)
+
+# Offsets of the version and weight type code in binary brain files
+VERSION_OFFSET = 4
+WEIGHT_TYPE_OFFSET = 5
+
+
+class NN_Brain_File_Test(unittest.TestCase):
+    """
+    Saves and loads NN brains, and checks the loaded
+    brains match and the files are validated.
+    """
+
+    def setUp(self):
+        load_settings_from_dict({})
+        self._dirname = tempfile.mkdtemp()
+        self._brain = NN_Brain()
+        self._brain.fitness = 123.5
+
+    def tearDown(self):
+        shutil.rmtree(self._dirname)
+
+    def _get_filename(self, name):
+        return os.path.join(self._dirname, name)
+
+    def _assert_brains_equal(self, brain, other_brain):
+        self.assertEqual(brain.fitness, other_brain.fitness)
+        self.assertEqual(
+            brain.network.get_shape(), other_brain.network.get_shape()
+        )
+        np.testing.assert_array_equal(
+            brain.network.get_genome(), other_brain.network.get_genome()
+        )
+
+    def _corrupt_byte(self, filename, offset, value):
+        with open(filename, "r+b") as brain_file:
+            brain_file.seek(offset)
+            brain_file.write(struct.pack("<B", value))
+
+    def test_binary_round_trip(self):
+        filename = self._get_filename("brain.brn")
+        self._brain.save(filename)
+        self._assert_brains_equal(NN_Brain.load(filename), self._brain)
+
+    def test_float32_round_trip(self):
+        filename = self._get_filename("brain.brn")
+        self._brain.save(filename, weight_type=np.float32)
+        loaded_brain = NN_Brain.load(filename)
+        np.testing.assert_array_equal(
+            loaded_brain.network.get_genome(),
+            self._brain.network.get_genome().astype(np.float32),
+        )
+        self.assertEqual(loaded_brain.network.get_genome().dtype, np.float64)
+
+    def test_json_round_trip(self):
+        filename = self._get_filename("brain.brn")
+        self._brain.save(filename, use_json=True)
+        self._assert_brains_equal(NN_Brain.load(filename), self._brain)
+
+    def test_legacy_json_alongside_binary(self):
+        json_brain = NN_Brain.load(EXAMPLE_BRAIN_FILENAME)
+        filename = self._get_filename("example.brn")
+        shutil.copy(EXAMPLE_BRAIN_FILENAME, filename)
+        convert_brain_files([filename])
+        with open(filename, "rb") as brain_file:
+            self.assertNotEqual(brain_file.read(1), b"{")
+        self._assert_brains_equal(NN_Brain.load(filename), json_brain)
+        self._assert_brains_equal(
+            NN_Brain.load(EXAMPLE_BRAIN_FILENAME), json_brain
+        )
+
+    def test_mutating_loaded_brain_leaves_file_unchanged(self):
+        filename = self._get_filename("brain.brn")
+        self._brain.save(filename)
+        with open(filename, "rb") as brain_file:
+            saved_data = brain_file.read()
+
+        loaded_brain = NN_Brain.load(filename)
+        loaded_brain.mutate(1.0)
+        self.assertFalse(
+            np.array_equal(
+                loaded_brain.network.get_genome(),
+                self._brain.network.get_genome(),
+            )
+        )
+        with open(filename, "rb") as brain_file:
+            self.assertEqual(brain_file.read(), saved_data)
+        self._assert_brains_equal(NN_Brain.load(filename), self._brain)
+
+    def test_saving_over_loaded_brain(self):
+        filename = self._get_filename("brain.brn")
+        self._brain.save(filename)
+        loaded_brain = NN_Brain.load(filename)
+        NN_Brain().save(filename)
+        self._assert_brains_equal(loaded_brain, self._brain)
+
+    def test_unsupported_version(self):
+        filename = self._get_filename("brain.brn")
+        self._brain.save(filename)
+        self._corrupt_byte(filename, VERSION_OFFSET, BRAIN_FILE_VERSION + 1)
+        with self.assertRaises(ValueError):
+            NN_Brain.load(filename)
+
+    def test_unsupported_weight_type(self):
+        filename = self._get_filename("brain.brn")
+        self._brain.save(filename)
+        self._corrupt_byte(filename, WEIGHT_TYPE_OFFSET, 255)
+        with self.assertRaises(ValueError):
+            NN_Brain.load(filename)
+
+    def test_truncated_file(self):
+        filename = self._get_filename("brain.brn")
+        self._brain.save(filename)
+        with open(filename, "r+b") as brain_file:
+            brain_file.truncate(os.path.getsize(filename) - 8)
+        with self.assertRaises(ValueError):
+            NN_Brain.load(filename)
+
+    def test_unsupported_save_weight_type(self):
+        with self.assertRaises(ValueError):
+            self._brain.save(
+                self._get_filename("brain.brn"), weight_type=np.int32
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
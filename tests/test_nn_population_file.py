@@ -0,0 +1,137 @@
+"""
+Tests that NN generations' brains survive saving and loading,
+whether saved together in a population file or one per file.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+from ai.generation import Generation
+from nn.neural_network import Neural_Network
+from nn.nn_brain import NN_Brain
+from nn.nn_generation import (
+    POPULATION_FILE_VERSION,
+    POPULATION_FILENAME,
+    NN_Generation,
+)
+from settings import load_settings_from_dict
+
+# Number of brains in the generations saved by the tests
+NUM_BRAINS = 6
+
+# Offset of the version in population files
+VERSION_OFFSET = 4
+
+
+class NN_Population_File_Test(unittest.TestCase):
+    """
+    Saves and loads generations of NN brains, and checks the
+    loaded brains match and the files are validated.
+    """
+
+    def setUp(self):
+        load_settings_from_dict({})
+        self._dirname = tempfile.mkdtemp()
+        self._generation_dirname = os.path.join(self._dirname, "gen-000")
+        self._brains = []
+        for i in range(NUM_BRAINS):
+            brain = NN_Brain()
+            brain.fitness = 10.0 * i + 0.25
+            self._brains.append(brain)
+        self._generation = NN_Generation(0, [], brains=self._brains)
+
+    def tearDown(self):
+        shutil.rmtree(self._dirname)
+
+    def _assert_brains_equal(self, brains, other_brains):
+        self.assertEqual(len(brains), len(other_brains))
+        for brain, other_brain in zip(brains, other_brains):
+            self.assertEqual(brain.fitness, other_brain.fitness)
+            self.assertEqual(
+                brain.network.get_shape(), other_brain.network.get_shape()
+            )
+            np.testing.assert_array_equal(
+                brain.network.get_genome(), other_brain.network.get_genome()
+            )
+
+    def _get_population_filename(self):
+        return os.path.join(self._generation_dirname, POPULATION_FILENAME)
+
+    def test_round_trip(self):
+        self._generation.save(self._generation_dirname)
+        self.assertTrue(os.path.exists(self._get_population_filename()))
+        self._assert_brains_equal(
+            NN_Generation.load_brains(self._generation_dirname), self._brains
+        )
+
+    def test_generation_round_trip(self):
+        self._generation.save(self._generation_dirname)
+        loaded_generation = NN_Generation.load(self._generation_dirname, [])
+        self._assert_brains_equal(loaded_generation._brains, self._brains)
+
+    def test_mutating_loaded_brain_leaves_file_unchanged(self):
+        self._generation.save(self._generation_dirname)
+        with open(self._get_population_filename(), "rb") as population_file:
+            saved_data = population_file.read()
+
+        loaded_brains = NN_Generation.load_brains(self._generation_dirname)
+        loaded_brains[0].mutate(1.0)
+        self._assert_brains_equal(loaded_brains[1:], self._brains[1:])
+        with open(self._get_population_filename(), "rb") as population_file:
+            self.assertEqual(population_file.read(), saved_data)
+
+    def test_one_brain_per_file(self):
+        os.mkdir(self._generation_dirname)
+        Generation._save_brains(self._generation, self._generation_dirname)
+        self.assertFalse(os.path.exists(self._get_population_filename()))
+
+        # Each brain is loaded from its own file, in directory order
+        loaded_brains = NN_Generation.load_brains(self._generation_dirname)
+        loaded_brains.sort(key=lambda brain: brain.fitness)
+        self._assert_brains_equal(loaded_brains, self._brains)
+
+    def test_different_shapes(self):
+        weight_matrices = [np.ones((9, 5)), np.ones((6, 4))]
+        odd_brain = NN_Brain(Neural_Network(weight_matrices))
+        odd_brain.fitness = 1000.0
+        brains = self._brains + [odd_brain]
+        NN_Generation(0, [], brains=brains).save(self._generation_dirname)
+        self.assertFalse(os.path.exists(self._get_population_filename()))
+
+        loaded_brains = NN_Generation.load_brains(self._generation_dirname)
+        loaded_brains.sort(key=lambda brain: brain.fitness)
+        self._assert_brains_equal(loaded_brains, brains)
+
+    def test_not_a_population_file(self):
+        self._generation.save(self._generation_dirname)
+        with open(self._get_population_filename(), "r+b") as population_file:
+            population_file.write(b"ABRN")
+        with self.assertRaises(ValueError):
+            NN_Generation.load_brains(self._generation_dirname)
+
+    def test_unsupported_version(self):
+        self._generation.save(self._generation_dirname)
+        with open(self._get_population_filename(), "r+b") as population_file:
+            population_file.seek(VERSION_OFFSET)
+            population_file.write(
+                struct.pack("<B", POPULATION_FILE_VERSION + 1)
+            )
+        with self.assertRaises(ValueError):
+            NN_Generation.load_brains(self._generation_dirname)
+
+    def test_truncated_file(self):
+        self._generation.save(self._generation_dirname)
+        filename = self._get_population_filename()
+        with open(filename, "r+b") as population_file:
+            population_file.truncate(os.path.getsize(filename) - 8)
+        with self.assertRaises(ValueError):
+            NN_Generation.load_brains(self._generation_dirname)
+
+
+if __name__ == "__main__":
+    unittest.main()
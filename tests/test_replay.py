@@ -0,0 +1,111 @@
+"""
+Tests that replays of AI games survive saving and loading,
+and play back to the same fitness as the recorded games.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from ai.ai_app import AI_App
+from ai.replay import REPLAY_FILE_VERSION, Replay
+from ai.replay_app import REPLAY_FILE_EXTENSION, Replay_App
+from nn.nn_brain import NN_Brain
+from settings import Settings, load_settings_from_dict
+
+# Brain whose games are recorded by the tests
+BRAIN_FILENAME = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "examples",
+    "nn-spin-shoot",
+    "example.brn",
+)
+
+# Seeds of the games to record
+SEEDS = [1, 2, 3]
+
+# Offset of the version in replay files
+VERSION_OFFSET = 4
+
+
+class Replay_Test(unittest.TestCase):
+    """
+    Records games of an AI brain, saves and loads the replays,
+    and checks they play back to the recorded fitnesses.
+    """
+
+    def setUp(self):
+        self._dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dirname)
+
+    def _get_filename(self, seed):
+        return os.path.join(
+            self._dirname, "seed-%d%s" % (seed, REPLAY_FILE_EXTENSION)
+        )
+
+    def _check_replayed_fitnesses(self, simulation_engine):
+        load_settings_from_dict(
+            {"SOUNDS_ENABLED": False, "SIMULATION_ENGINE": simulation_engine}
+        )
+        ai_brain = NN_Brain.load(BRAIN_FILENAME)
+        app = AI_App(use_ui=False)
+        fitnesses = []
+        for seed in SEEDS:
+            fitnesses.append(app.run_simulation(ai_brain, seed=seed))
+            app.get_replay().save(self._get_filename(seed))
+
+        replay_app = Replay_App(use_ui=False)
+        for seed, fitness in zip(SEEDS, fitnesses):
+            replay = Replay.load(self._get_filename(seed))
+            self.assertEqual(replay.seed, seed)
+            self.assertEqual(replay_app.run_simulation(replay), fitness)
+
+    def test_object_engine(self):
+        self._check_replayed_fitnesses(Settings.OBJECT)
+
+    def test_array_engine(self):
+        self._check_replayed_fitnesses(Settings.ARRAY)
+
+    def test_round_trip(self):
+        for decisions in [b"", b"\x01", b"\x0f\x00\x05", bytes(range(16))]:
+            filename = self._get_filename(len(decisions))
+            Replay(-7, decisions).save(filename)
+            replay = Replay.load(filename)
+            self.assertEqual(replay.seed, -7)
+            self.assertEqual(replay.decisions, decisions)
+
+    def test_not_a_replay_file(self):
+        filename = self._get_filename(0)
+        with open(filename, "wb") as replay_file:
+            replay_file.write(b"ABRN" + bytes(32))
+        with self.assertRaises(ValueError):
+            Replay.load(filename)
+
+    def test_unsupported_version(self):
+        filename = self._get_filename(0)
+        Replay(0, b"\x01\x02").save(filename)
+        with open(filename, "r+b") as replay_file:
+            replay_file.seek(VERSION_OFFSET)
+            replay_file.write(struct.pack("<B", REPLAY_FILE_VERSION + 1))
+        with self.assertRaises(ValueError):
+            Replay.load(filename)
+
+    def test_truncated_file(self):
+        filename = self._get_filename(0)
+        Replay(0, b"\x01\x02\x03").save(filename)
+        with open(filename, "r+b") as replay_file:
+            replay_file.truncate(os.path.getsize(filename) - 1)
+        with self.assertRaises(ValueError):
+            Replay.load(filename)
+
+    def test_unseeded_game(self):
+        with self.assertRaises(ValueError):
+            Replay(None, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
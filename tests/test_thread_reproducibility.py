@@ -0,0 +1,96 @@
+"""
+Tests that games simulated concurrently in several threads, all
+with the same AI brain, play out exactly as they do sequentially.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+from ai.ai_app import AI_App
+from nn.nn_brain import NN_Brain
+from settings import Settings, load_settings_from_dict
+
+# Brain simulated by the tests
+BRAIN_FILENAME = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "examples",
+    "nn-spin-shoot",
+    "example.brn",
+)
+
+# Seeds of the games to simulate
+SEEDS = list(range(16))
+
+# Number of threads to simulate the games in
+NUM_THREADS = 8
+
+# Thread switch interval (in seconds) used while simulating, short
+# enough that the threads' frames are thoroughly interleaved
+SWITCH_INTERVAL = 1e-5
+
+
+class Thread_Reproducibility_Test(unittest.TestCase):
+    """
+    Simulates the same brain in concurrent threads (each with its
+    own AI_App) and checks the fitnesses match sequential runs.
+    """
+
+    def _check_threaded_fitnesses(self, simulation_engine, sensor_id):
+        load_settings_from_dict(
+            {
+                "SOUNDS_ENABLED": False,
+                "SIMULATION_ENGINE": simulation_engine,
+                "SENSOR_ID": sensor_id,
+            }
+        )
+        ai_brain = NN_Brain.load(BRAIN_FILENAME)
+        app = AI_App(use_ui=False)
+        expected_fitnesses = [
+            app.run_simulation(ai_brain, seed=seed) for seed in SEEDS
+        ]
+
+        # Each thread runs every NUM_THREADS'th seed with its own app
+        fitnesses = [None] * len(SEEDS)
+        errors = []
+
+        def run_thread(thread_idx):
+            try:
+                thread_app = AI_App(use_ui=False)
+                for i in range(thread_idx, len(SEEDS), NUM_THREADS):
+                    fitnesses[i] = thread_app.run_simulation(
+                        ai_brain, seed=SEEDS[i]
+                    )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=run_thread, args=(i,))
+            for i in range(NUM_THREADS)
+        ]
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(SWITCH_INTERVAL)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(fitnesses, expected_fitnesses)
+
+    def test_object_engine(self):
+        self._check_threaded_fitnesses(Settings.OBJECT, Settings.NDIR)
+
+    def test_array_engine(self):
+        self._check_threaded_fitnesses(Settings.ARRAY, Settings.NDIR)
+
+    def test_raycast_sensor(self):
+        self._check_threaded_fitnesses(Settings.OBJECT, Settings.RAYCAST)
+
+
+if __name__ == "__main__":
+    unittest.main()